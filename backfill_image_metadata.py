@@ -0,0 +1,259 @@
+"""Backfill cover dimensions and placeholders from the Cloudinary URL cache.
+
+Dry-run is the default. Execution first describes every cached managed cover
+that has no metadata yet, then rewrites quarters whose records can be filled
+from the cache. Quarters keep their generated_at, since their content is
+unchanged apart from the new image fields.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import logging
+import time
+from dataclasses import dataclass
+
+from models import Anime
+from services.cache_repository import CacheRepository
+from services.cloudinary_urls import CLOUDINARY_HOST
+from services.data_repository import (
+    QUARTER_FILE_PATTERN,
+    DataQualityPolicy,
+    DataRepository,
+)
+from services.errors import CrawlerError, DataContractError
+from services.http_client import SafeImageDownloader
+from services.image_placeholder import (
+    ImageMetadata,
+    cached_image_metadata,
+    describe_image,
+    metadata_key,
+)
+from services.original_store import OriginalImageStore
+from services.retention import cloudinary_public_id_from_url
+from services.settings import CrawlerSettings, ProjectPaths
+
+CONFIRMATION_PHRASE = "BACKFILL_IMAGE_METADATA"
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class QuarterMetadataPlan:
+    year: str
+    season: str
+    records: list[Anime]
+    filled_count: int
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Dry-run or execute cover metadata backfill from the cache"
+    )
+    parser.add_argument("--execute", action="store_true")
+    parser.add_argument("--confirm", default="")
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=0,
+        help="Describe at most this many covers per run (default: no limit)",
+    )
+    parser.add_argument(
+        "--delay-seconds",
+        type=float,
+        default=0.2,
+        help="Polite delay between Cloudinary downloads (default: 0.2)",
+    )
+    return parser.parse_args()
+
+
+def covers_missing_metadata(cache: CacheRepository) -> dict[str, str]:
+    """Return public ID to delivery URL for cached covers without metadata."""
+
+    missing: dict[str, str] = {}
+    for url in sorted(set(cache.snapshot().values())):
+        public_id = cloudinary_public_id_from_url(url)
+        if public_id is None or public_id in missing:
+            continue
+        if cached_image_metadata(cache, url) is None:
+            missing[public_id] = url
+    return missing
+
+
+def describe_cached_covers(
+    cache: CacheRepository,
+    downloader: SafeImageDownloader,
+    covers: dict[str, str],
+    *,
+    max_pixels: int,
+    delay_seconds: float,
+    originals: OriginalImageStore | None = None,
+) -> tuple[int, list[str]]:
+    """Describe covers, caching each result as it is produced.
+
+    Raw uploads are named by the SHA-256 of their bytes, so a locally kept
+    original is used instead of a download when one exists. Returns the
+    number described and the failures, which are left for a later run rather
+    than aborting the whole backfill.
+    """
+
+    described = 0
+    downloads = 0
+    failures: list[str] = []
+    for public_id, url in covers.items():
+        digest = public_id.removeprefix("anime_covers/")
+        content = originals.get(digest) if originals else None
+        try:
+            if content is None:
+                if downloads and delay_seconds:
+                    time.sleep(delay_seconds)
+                downloads += 1
+                content = downloader.download(url).content
+            metadata = describe_image(content, max_pixels)
+        except CrawlerError as exc:
+            failures.append(f"{public_id}: {exc}")
+            continue
+        cache.set(metadata_key(public_id), metadata.cache_value())
+        described += 1
+    return described, failures
+
+
+def _with_metadata(record: Anime, metadata: ImageMetadata) -> Anime:
+    return Anime.model_validate(
+        {
+            **record.model_dump(mode="json"),
+            "image_width": metadata.width,
+            "image_height": metadata.height,
+            "image_placeholder": metadata.placeholder,
+        }
+    )
+
+
+def plan_quarter_updates(
+    repository: DataRepository,
+    cache: CacheRepository,
+) -> list[QuarterMetadataPlan]:
+    plans: list[QuarterMetadataPlan] = []
+    for path in repository.validate_all():
+        match = QUARTER_FILE_PATTERN.fullmatch(path.name)
+        if not match:
+            continue
+        year, season = match.groups()
+        dataset = repository.load_path(path)
+        filled = 0
+        records: list[Anime] = []
+        for record in dataset.anime_list:
+            metadata = cached_image_metadata(cache, record.anime_image_url)
+            if metadata is None:
+                records.append(record)
+                continue
+            updated = _with_metadata(record, metadata)
+            filled += updated != record
+            records.append(updated)
+        if filled:
+            plans.append(
+                QuarterMetadataPlan(
+                    year=year,
+                    season=season,
+                    records=records,
+                    filled_count=filled,
+                )
+            )
+    return plans
+
+
+def apply_quarter_updates(
+    repository: DataRepository,
+    plans: list[QuarterMetadataPlan],
+) -> None:
+    for plan in plans:
+        dataset = repository.load_quarter(plan.year, plan.season)
+        if dataset is None or dataset.source_url is None or dataset.quality is None:
+            raise DataContractError(
+                f"{plan.year}_{plan.season} changed while the backfill was running"
+            )
+        repository.write_quarter(
+            year=plan.year,
+            season=plan.season,
+            records=plan.records,
+            source_url=dataset.source_url,
+            source_count=dataset.quality.source_count,
+            parse_failure_count=dataset.quality.parse_failure_count,
+            generated_at=dataset.generated_at,
+        )
+
+
+def main() -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    )
+    args = parse_args()
+    if args.limit < 0:
+        raise DataContractError("--limit may not be negative")
+    if args.delay_seconds < 0:
+        raise DataContractError("--delay-seconds may not be negative")
+    settings = CrawlerSettings.from_environment()
+    paths = ProjectPaths.from_environment()
+    cache = CacheRepository(paths.cache_file)
+    repository = DataRepository(
+        paths.data_dir,
+        DataQualityPolicy(
+            minimum_count_ratio=settings.minimum_count_ratio,
+            maximum_parse_failure_ratio=settings.maximum_parse_failure_ratio,
+            maximum_fallback_id_ratio=settings.maximum_fallback_id_ratio,
+        ),
+    )
+    covers = covers_missing_metadata(cache)
+    if args.limit:
+        covers = dict(list(covers.items())[: args.limit])
+    logger.info("Cached covers without metadata to describe: %s", len(covers))
+
+    if not args.execute:
+        plans = plan_quarter_updates(repository, cache)
+        logger.info(
+            "Quarters fillable from the current cache: %s (%s records)",
+            len(plans),
+            sum(plan.filled_count for plan in plans),
+        )
+        logger.info(
+            "DRY RUN ONLY. Re-run with --execute --confirm %s after review.",
+            CONFIRMATION_PHRASE,
+        )
+        return 0
+    if args.confirm != CONFIRMATION_PHRASE:
+        raise DataContractError(f"Execution requires --confirm {CONFIRMATION_PHRASE}")
+
+    # Only stored Cloudinary covers are fetched, never the original sources.
+    downloader = SafeImageDownloader(
+        dataclasses.replace(settings, image_allowed_hosts=(CLOUDINARY_HOST,))
+    )
+    try:
+        described, failures = describe_cached_covers(
+            cache,
+            downloader,
+            covers,
+            max_pixels=settings.image_max_pixels,
+            delay_seconds=args.delay_seconds,
+            originals=OriginalImageStore.from_settings(settings, paths),
+        )
+    finally:
+        downloader.close()
+        cache.save_if_changed()
+    for failure in failures:
+        logger.warning("Cover metadata not backfilled: %s", failure)
+
+    plans = plan_quarter_updates(repository, cache)
+    apply_quarter_updates(repository, plans)
+    logger.info(
+        "Described %s covers (%s failed); filled %s records in %s quarters",
+        described,
+        len(failures),
+        sum(plan.filled_count for plan in plans),
+        len(plans),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,245 @@
+"""Compare cache load time and resident memory across representations.
+
+``strings`` reproduces a plain ``dict[str, str]`` with a public ID to key-set
+index, which is what the repository held before compact entries. ``compact``
+loads the same JSON into ``CacheRepository``, which defers its index to first
+use, and ``packed`` loads it from a packed snapshot. Timings are the best of ``--repeat`` loads; resident bytes
+are what tracemalloc still sees allocated once a load returns.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from services.atomic_io import atomic_write_json
+from services.cache_repository import CacheRepository
+from services.retention import cloudinary_public_id_from_url
+
+DEFAULT_CACHE_FILE = Path(__file__).resolve().parent.parent / "cloudinary_cache.json"
+DEFAULT_SYNTHETIC_SIZES = (2000, 20000)
+DELIVERY_PREFIX = (
+    "https://res.cloudinary.com/bench/image/upload/f_auto,q_auto:best/v1/anime_covers/"
+)
+REPRESENTATIONS = ("strings", "compact", "packed")
+
+
+@dataclass(frozen=True)
+class CacheCorpus:
+    name: str
+    entries: dict[str, str]
+
+
+@dataclass(frozen=True)
+class CacheBenchmarkResult:
+    corpus: str
+    representation: str
+    entries: int
+    repeat: int
+    best_load_seconds: float
+    resident_bytes: int
+
+
+def synthetic_cache(entry_count: int) -> dict[str, str]:
+    """Return a cache shaped like the committed one.
+
+    Most entries are legacy ``cloudinary_<md5>`` content mappings; every
+    seventh is a ``source_<sha256>`` alias of an existing upload.
+    """
+    entries: dict[str, str] = {}
+    for index in range(entry_count):
+        if index % 7 == 6:
+            source = hashlib.sha256(f"source-{index}".encode()).hexdigest()
+            digest = hashlib.md5(f"cover-{index - 1}".encode()).hexdigest()
+            entries[f"source_{source}"] = DELIVERY_PREFIX + digest
+        else:
+            digest = hashlib.md5(f"cover-{index}".encode()).hexdigest()
+            entries[f"cloudinary_{digest}"] = DELIVERY_PREFIX + digest
+    return entries
+
+
+def load_corpora(
+    cache_file: Path | None,
+    synthetic_sizes: Sequence[int],
+) -> list[CacheCorpus]:
+    corpora = []
+    if cache_file is not None and cache_file.exists():
+        corpora.append(
+            CacheCorpus(cache_file.name, CacheRepository(cache_file).snapshot())
+        )
+    corpora.extend(
+        CacheCorpus(f"synthetic_{size}", synthetic_cache(size))
+        for size in synthetic_sizes
+    )
+    return corpora
+
+
+def load_strings(path: Path) -> tuple[dict[str, str], dict[str, set[str]]]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    index: dict[str, set[str]] = {}
+    for key, value in data.items():
+        public_id = cloudinary_public_id_from_url(value)
+        if public_id is not None:
+            index.setdefault(public_id, set()).add(key)
+    return data, index
+
+
+def _measure(
+    corpus: CacheCorpus,
+    representation: str,
+    repeat: int,
+    load: Callable[[], object],
+) -> CacheBenchmarkResult:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        load()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        loaded = load()
+        resident, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del loaded
+
+    return CacheBenchmarkResult(
+        corpus=corpus.name,
+        representation=representation,
+        entries=len(corpus.entries),
+        repeat=repeat,
+        best_load_seconds=best,
+        resident_bytes=resident,
+    )
+
+
+def benchmark_corpus(corpus: CacheCorpus, *, repeat: int) -> list[CacheBenchmarkResult]:
+    with tempfile.TemporaryDirectory(prefix="cache-benchmark-") as directory:
+        path = Path(directory) / "cloudinary_cache.json"
+        packed_path = Path(directory) / "cloudinary_cache.packed"
+        atomic_write_json(path, corpus.entries)
+        CacheRepository(path, packed_path=packed_path).compact()
+        loaders: dict[str, Callable[[], object]] = {
+            "strings": lambda: load_strings(path),
+            "compact": lambda: CacheRepository(path),
+            "packed": lambda: CacheRepository(path, packed_path=packed_path),
+        }
+        return [
+            _measure(corpus, representation, repeat, loaders[representation])
+            for representation in REPRESENTATIONS
+        ]
+
+
+def run_benchmarks(
+    corpora: Sequence[CacheCorpus],
+    *,
+    repeat: int,
+) -> list[CacheBenchmarkResult]:
+    return [
+        result
+        for corpus in corpora
+        for result in benchmark_corpus(corpus, repeat=repeat)
+    ]
+
+
+def _baseline(
+    results: Sequence[CacheBenchmarkResult], result: CacheBenchmarkResult
+) -> CacheBenchmarkResult:
+    return next(
+        row
+        for row in results
+        if row.corpus == result.corpus and row.representation == "strings"
+    )
+
+
+def results_document(results: Sequence[CacheBenchmarkResult]) -> dict[str, object]:
+    rows = []
+    for result in results:
+        baseline = _baseline(results, result)
+        rows.append(
+            {
+                **asdict(result),
+                "load_speedup": baseline.best_load_seconds
+                / max(result.best_load_seconds, 1e-9),
+                "memory_reduction": baseline.resident_bytes
+                / max(result.resident_bytes, 1),
+            }
+        )
+    return {
+        "benchmark": "cache",
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": rows,
+    }
+
+
+def _print_table(results: Sequence[CacheBenchmarkResult]) -> None:
+    print(
+        f"{'corpus':<24} {'representation':<14} {'entries':>8} {'load ms':>9} "
+        f"{'speedup':>8} {'KiB':>9} {'smaller':>8}"
+    )
+    for result in results:
+        baseline = _baseline(results, result)
+        print(
+            f"{result.corpus:<24} {result.representation:<14} {result.entries:>8} "
+            f"{result.best_load_seconds * 1000:>9.2f} "
+            f"{baseline.best_load_seconds / max(result.best_load_seconds, 1e-9):>8.1f} "
+            f"{result.resident_bytes / 1024:>9.1f} "
+            f"{baseline.resident_bytes / max(result.resident_bytes, 1):>8.1f}"
+        )
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=DEFAULT_CACHE_FILE,
+        help="cache JSON to include (default: the committed cache)",
+    )
+    parser.add_argument(
+        "--synthetic",
+        type=_positive_int,
+        nargs="*",
+        default=list(DEFAULT_SYNTHETIC_SIZES),
+        help="entry counts of generated caches; pass no values to skip them",
+    )
+    parser.add_argument("--repeat", type=_positive_int, default=5)
+    parser.add_argument("--output", type=Path, help="write JSON results here")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    corpora = load_corpora(args.cache, args.synthetic)
+    if not corpora:
+        print(f"No cache corpora: {args.cache} is missing", file=sys.stderr)
+        return 1
+    results = run_benchmarks(corpora, repeat=args.repeat)
+    _print_table(results)
+    if args.output:
+        atomic_write_json(args.output, results_document(results))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
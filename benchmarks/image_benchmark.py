@@ -0,0 +1,171 @@
+"""Compare header-only image checks with a full Pillow verify.
+
+Point ``--corpus`` at a directory of downloaded covers to measure the real
+mix; without one, generated covers in every allowed format are used. Timings
+are the best of ``--repeat`` runs of each path over the same bytes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import platform
+import sys
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from PIL import Image
+
+from services.atomic_io import atomic_write_json
+from services.image_sniff import check_image_header, image_format
+from services.image_store import verify_image
+
+MAX_PIXELS = 40_000_000
+# Typical list thumbnail and full-size cover dimensions on the source site.
+SYNTHETIC_SIZES = ((225, 320), (1000, 1414))
+SYNTHETIC_FORMATS = ("PNG", "JPEG", "GIF", "WEBP", "AVIF")
+
+
+@dataclass(frozen=True)
+class CorpusImage:
+    name: str
+    content_type: str
+    content: bytes
+
+
+@dataclass(frozen=True)
+class ImageBenchmarkResult:
+    image: str
+    content_type: str
+    size_bytes: int
+    repeat: int
+    header_microseconds: float
+    pillow_microseconds: float
+    header_settled: bool
+
+    @property
+    def speedup(self) -> float:
+        return self.pillow_microseconds / max(self.header_microseconds, 1e-9)
+
+
+def synthetic_covers() -> list[CorpusImage]:
+    images = []
+    for width, height in SYNTHETIC_SIZES:
+        cover = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+        for pillow_format in SYNTHETIC_FORMATS:
+            buffer = io.BytesIO()
+            cover.save(buffer, format=pillow_format)
+            extension = pillow_format.lower()
+            images.append(
+                CorpusImage(
+                    f"synthetic_{width}x{height}.{extension}",
+                    f"image/{extension}",
+                    buffer.getvalue(),
+                )
+            )
+    return images
+
+
+def load_corpus(directory: Path) -> list[CorpusImage]:
+    images = []
+    for path in sorted(directory.iterdir()):
+        if not path.is_file():
+            continue
+        content = path.read_bytes()
+        detected = image_format(content)
+        if detected is not None:
+            images.append(CorpusImage(path.name, f"image/{detected}", content))
+    return images
+
+
+def _best_microseconds(operation: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - started)
+    return best * 1_000_000
+
+
+def benchmark_image(image: CorpusImage, *, repeat: int) -> ImageBenchmarkResult:
+    header = check_image_header(image.content, image.content_type, MAX_PIXELS)
+    return ImageBenchmarkResult(
+        image=image.name,
+        content_type=image.content_type,
+        size_bytes=len(image.content),
+        repeat=repeat,
+        header_microseconds=_best_microseconds(
+            lambda: check_image_header(image.content, image.content_type, MAX_PIXELS),
+            repeat,
+        ),
+        pillow_microseconds=_best_microseconds(
+            lambda: verify_image(image.content, MAX_PIXELS),
+            repeat,
+        ),
+        header_settled=header is not None,
+    )
+
+
+def results_document(results: Sequence[ImageBenchmarkResult]) -> dict[str, object]:
+    return {
+        "benchmark": "image_verify",
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [
+            {**asdict(result), "speedup": result.speedup} for result in results
+        ],
+    }
+
+
+def _print_table(results: Sequence[ImageBenchmarkResult]) -> None:
+    print(
+        f"{'image':<36} {'KiB':>8} {'header us':>10} {'pillow us':>10} "
+        f"{'speedup':>8} {'settled':>8}"
+    )
+    for result in results:
+        print(
+            f"{result.image:<36} {result.size_bytes / 1024:>8.1f} "
+            f"{result.header_microseconds:>10.1f} "
+            f"{result.pillow_microseconds:>10.1f} "
+            f"{result.speedup:>8.1f} {str(result.header_settled):>8}"
+        )
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--corpus",
+        type=Path,
+        help="directory of downloaded cover images; defaults to generated covers",
+    )
+    parser.add_argument("--repeat", type=_positive_int, default=20)
+    parser.add_argument("--output", type=Path, help="write JSON results here")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    images = load_corpus(args.corpus) if args.corpus else synthetic_covers()
+    if not images:
+        print(f"No supported images found in {args.corpus}", file=sys.stderr)
+        return 1
+    results = [benchmark_image(image, repeat=args.repeat) for image in images]
+    _print_table(results)
+    if args.output:
+        atomic_write_json(args.output, results_document(results))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
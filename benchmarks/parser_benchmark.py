@@ -0,0 +1,296 @@
+"""Offline parser micro-benchmarks over recorded and synthetic quarter pages.
+
+Timings are the best of ``--repeat`` runs; peak memory comes from one extra
+run under tracemalloc so tracing overhead never pollutes the timings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from models import Anime, AnimeCandidate
+from services.anime_service import parse_date_time
+from services.atomic_io import atomic_write_json
+from services.errors import ItemParseError
+from services.parser import (
+    _broadcast_details,
+    _select_cards,
+    extract_item_html,
+    iter_streamed_cards,
+    parse_anime_item,
+)
+
+DEFAULT_FIXTURE_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+DEFAULT_SYNTHETIC_SIZES = (1000, 5000)
+WEEKDAYS = ("一", "二", "三", "四", "五", "六", "日", "天")
+
+SYNTHETIC_CARD = """
+      <div class="clear-both acgs-anime-block CV-search anime-type-new" \
+acgs-bangumi-anime-id="anime-{index}" weektoday="{weekday}" weekairtime="{airtime}">
+        <div class="anime_cover">
+          <div class="overflow-hidden anime_cover_image">
+            <img class="img-fit-cover" loading="lazy" \
+acgs-img-data-url="https://static.acgsecrets.hk/img/bench/{index}.jpg" \
+src="data:image/gif;base64,placeholder">
+          </div>
+        </div>
+        <div class="anime_content">
+          <h3 class="entity_localized_name">測試動畫 {index}</h3>
+          <div class="anime_onair">
+            <div class="time_today main_time">{schedule}</div>
+          </div>
+          <div class="anime_story">第 {index} 部的第一段<br>第二段{story}</div>
+        </div>
+      </div>"""
+
+
+@dataclass(frozen=True)
+class BenchmarkPage:
+    name: str
+    html: str
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    page: str
+    stage: str
+    cards: int
+    repeat: int
+    best_seconds: float
+    per_card_microseconds: float
+    peak_memory_bytes: int
+
+
+def synthetic_page(card_count: int) -> str:
+    """Return a deterministic quarter page with ``card_count`` valid cards.
+
+    Every fourth card has no schedule text so the weektoday/weekairtime
+    fallbacks are exercised alongside the main schedule regexes.
+    """
+    cards = []
+    for index in range(card_count):
+        weekday = WEEKDAYS[index % len(WEEKDAYS)]
+        hour, minute = 18 + index % 10, index % 60
+        schedule = (
+            ""
+            if index % 4 == 3
+            else f"4月{1 + index % 28}日起／每週{weekday}／{hour}時{minute}分"
+        )
+        cards.append(
+            SYNTHETIC_CARD.format(
+                index=10_000 + index,
+                weekday=weekday,
+                airtime=f"{hour:02d}{minute:02d}",
+                schedule=schedule,
+                story="。" * (index % 200),
+            )
+        )
+    return (
+        '<!doctype html>\n<html lang="zh-Hant">\n  <body>\n'
+        '    <div id="acgs-anime-list">'
+        + "".join(cards)
+        + "\n    </div>\n  </body>\n</html>\n"
+    )
+
+
+def load_pages(
+    fixture_dir: Path,
+    synthetic_sizes: Sequence[int],
+) -> list[BenchmarkPage]:
+    pages = [
+        BenchmarkPage(path.stem, path.read_text(encoding="utf-8"))
+        for path in sorted(fixture_dir.glob("acgsecrets_*.html"))
+    ]
+    pages.extend(
+        BenchmarkPage(f"synthetic_{size}", synthetic_page(size))
+        for size in synthetic_sizes
+    )
+    return pages
+
+
+def _stored_record(candidate: AnimeCandidate) -> Anime:
+    digest = hashlib.md5(candidate.source_image_url.encode("utf-8")).hexdigest()
+    return Anime(
+        bangumi_id=candidate.bangumi_id,
+        anime_name=candidate.anime_name,
+        anime_image_url=(
+            "https://res.cloudinary.com/bench/image/upload/"
+            f"v1/anime_covers/{digest}.webp"
+        ),
+        premiere_date=candidate.premiere_date,
+        premiere_time=candidate.premiere_time,
+        story=candidate.story,
+    )
+
+
+def _parse_items(item_html: Sequence[str]) -> list[AnimeCandidate]:
+    candidates = []
+    for html in item_html:
+        try:
+            candidates.append(parse_anime_item(html))
+        except ItemParseError:
+            continue
+    return candidates
+
+
+def _stream_cards(body: bytes) -> list[object]:
+    chunk_size = 64 * 1024
+    return list(
+        iter_streamed_cards(
+            body[start : start + chunk_size]
+            for start in range(0, len(body), chunk_size)
+        )
+    )
+
+
+def _measure(
+    page: BenchmarkPage,
+    stage: str,
+    cards: int,
+    repeat: int,
+    operation: Callable[[], object],
+) -> BenchmarkResult:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        operation()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        page=page.name,
+        stage=stage,
+        cards=cards,
+        repeat=repeat,
+        best_seconds=best,
+        per_card_microseconds=best / cards * 1_000_000 if cards else 0.0,
+        peak_memory_bytes=peak,
+    )
+
+
+def benchmark_page(page: BenchmarkPage, *, repeat: int) -> list[BenchmarkResult]:
+    item_html = extract_item_html(page.html)
+    cards = _select_cards(page.html)
+    records = [_stored_record(candidate) for candidate in _parse_items(item_html)]
+    count = len(item_html)
+    body = page.html.encode("utf-8")
+
+    return [
+        _measure(
+            page,
+            "extract_item_html",
+            count,
+            repeat,
+            lambda: extract_item_html(page.html),
+        ),
+        _measure(
+            page,
+            "parse_anime_item",
+            count,
+            repeat,
+            lambda: _parse_items(item_html),
+        ),
+        _measure(
+            page,
+            "iter_streamed_cards",
+            count,
+            repeat,
+            lambda: _stream_cards(body),
+        ),
+        _measure(
+            page,
+            "_broadcast_details",
+            len(cards),
+            repeat,
+            lambda: [_broadcast_details(card) for card in cards],
+        ),
+        _measure(
+            page,
+            "parse_date_time",
+            len(records),
+            repeat,
+            lambda: sorted(records, key=parse_date_time),
+        ),
+    ]
+
+
+def run_benchmarks(
+    pages: Sequence[BenchmarkPage],
+    *,
+    repeat: int,
+) -> list[BenchmarkResult]:
+    return [result for page in pages for result in benchmark_page(page, repeat=repeat)]
+
+
+def results_document(results: Sequence[BenchmarkResult]) -> dict[str, object]:
+    return {
+        "benchmark": "parser",
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [asdict(result) for result in results],
+    }
+
+
+def _print_table(results: Sequence[BenchmarkResult]) -> None:
+    print(f"{'page':<32} {'stage':<20} {'cards':>6} {'us/card':>10} {'peak KiB':>10}")
+    for result in results:
+        print(
+            f"{result.page:<32} {result.stage:<20} {result.cards:>6} "
+            f"{result.per_card_microseconds:>10.1f} "
+            f"{result.peak_memory_bytes / 1024:>10.1f}"
+        )
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument(
+        "--synthetic",
+        type=_positive_int,
+        nargs="*",
+        default=list(DEFAULT_SYNTHETIC_SIZES),
+        help="card counts of generated pages; pass no values to skip them",
+    )
+    parser.add_argument("--repeat", type=_positive_int, default=5)
+    parser.add_argument("--output", type=Path, help="write JSON results here")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    pages = load_pages(args.fixtures, args.synthetic)
+    if not pages:
+        print(f"No benchmark pages found in {args.fixtures}", file=sys.stderr)
+        return 1
+    results = run_benchmarks(pages, repeat=args.repeat)
+    _print_table(results)
+    if args.output:
+        atomic_write_json(args.output, results_document(results))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,9 +10,12 @@ import shutil
 import tempfile
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from dotenv import load_dotenv
 from jinja2 import (
@@ -25,10 +28,14 @@ from jinja2 import (
 from config import Config
 from models import TAIPEI_TZ
 from services.atomic_io import atomic_write_text
+from services.cloudinary_urls import responsive_image_config
 from services.data_repository import DataQualityPolicy, DataRepository
-from services.errors import SourceNotFoundError
+from services.errors import DataContractError, SourceNotFoundError
 from services.settings import CrawlerSettings, ProjectPaths
 
+if TYPE_CHECKING:
+    from services.anime_service import AnimeCrawlerService
+
 logger = logging.getLogger(__name__)
 START_YEAR_ON_EMPTY = 2018
 SEASONS = ("冬", "春", "夏", "秋")
@@ -42,6 +49,7 @@ class CrawlSummary:
     changed_quarters: int
     total_records: int
     parse_failures: int
+    unchanged_quarters: int = 0
 
 
 def configure_runtime() -> None:
@@ -198,6 +206,7 @@ def render_index(
         years=sorted_years,
         available_data=available_data,
         available_data_json=json.dumps(available_data, ensure_ascii=False),
+        image_variants_json=json.dumps(responsive_image_config()),
         build_version=compute_build_version(paths),
     )
     output_path = paths.output_dir / "index.html"
@@ -212,48 +221,118 @@ def crawl_quarters(
 ) -> CrawlSummary:
     from services.anime_service import AnimeCrawlerService
 
-    crawler = AnimeCrawlerService.from_environment()
     has_existing_data = any(paths.data_dir.glob("*.json"))
     full_crawl = not has_existing_data
-    processed_quarters = 0
-    changed_quarters = 0
-    total_records = 0
-    total_parse_failures = 0
-
+    quarters: list[tuple[str, str]] = []
     for year, season in target_quarters(now, full_crawl=full_crawl):
-        year_number = int(year)
         output_path = repository.quarter_path(year, season)
-        historical = not is_future_quarter(year_number, season, now)
+        historical = not is_future_quarter(int(year), season, now)
         if full_crawl and historical and output_path.exists():
             logger.info("Existing historical quarter retained: %s %s", year, season)
             continue
+        quarters.append((year, season))
 
-        try:
-            result = crawler.fetch_quarter(year, season)
-            write_result = repository.write_quarter(
-                year=year,
-                season=season,
-                records=result.anime_list,
-                source_url=result.source_url,
-                source_count=result.source_count,
-                parse_failure_count=result.parse_failure_count,
-            )
-            logger.info(
-                "%s %s validated: %s records, %s parse failures, changed=%s",
+    with closing(AnimeCrawlerService.from_environment()) as crawler:
+        return _crawl_scheduled_quarters(crawler, repository, quarters, now)
+
+
+def _file_sha256(path: Path) -> str | None:
+    if not path.exists():
+        return None
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _crawl_scheduled_quarters(
+    crawler: AnimeCrawlerService,
+    repository: DataRepository,
+    quarters: list[tuple[str, str]],
+    now: datetime,
+) -> CrawlSummary:
+    """Fetch quarters concurrently, then validate and write them in target order.
+
+    Only source fetches and image work overlap. Results are consumed in the
+    original quarter order on this thread, so logs, writes, and the summary
+    match a sequential crawl.
+    """
+    processed_quarters = 0
+    changed_quarters = 0
+    unchanged_quarters = 0
+    total_records = 0
+    total_parse_failures = 0
+
+    with ThreadPoolExecutor(
+        max_workers=crawler.settings.quarter_workers,
+        thread_name_prefix="quarter-worker",
+    ) as executor:
+        futures = [
+            (
                 year,
                 season,
-                len(result.anime_list),
-                result.parse_failure_count,
-                write_result.changed,
+                executor.submit(
+                    crawler.fetch_quarter,
+                    year,
+                    season,
+                    current_data_sha256=_file_sha256(
+                        repository.quarter_path(year, season)
+                    ),
+                ),
             )
-            processed_quarters += 1
-            changed_quarters += int(write_result.changed)
-            total_records += len(result.anime_list)
-            total_parse_failures += result.parse_failure_count
-        except SourceNotFoundError as exc:
-            if is_future_quarter(year_number, season, now):
-                logger.info("Future quarter not published yet: %s", exc)
-                continue
+            for year, season in quarters
+        ]
+        try:
+            for year, season, future in futures:
+                try:
+                    result = future.result()
+                except SourceNotFoundError as exc:
+                    if is_future_quarter(int(year), season, now):
+                        logger.info("Future quarter not published yet: %s", exc)
+                        continue
+                    raise
+
+                if result.unchanged:
+                    existing = repository.load_quarter(year, season)
+                    if existing is None:
+                        raise DataContractError(
+                            f"{year} {season} was reported unchanged without data"
+                        )
+                    logger.info(
+                        "%s %s skipped unchanged: %s existing records retained",
+                        year,
+                        season,
+                        len(existing.anime_list),
+                    )
+                    processed_quarters += 1
+                    unchanged_quarters += 1
+                    total_records += len(existing.anime_list)
+                    total_parse_failures += (
+                        existing.quality.parse_failure_count if existing.quality else 0
+                    )
+                    continue
+
+                write_result = repository.write_quarter(
+                    year=year,
+                    season=season,
+                    records=result.anime_list,
+                    source_url=result.source_url,
+                    source_count=result.source_count,
+                    parse_failure_count=result.parse_failure_count,
+                )
+                logger.info(
+                    "%s %s validated: %s records, %s parse failures, changed=%s",
+                    year,
+                    season,
+                    len(result.anime_list),
+                    result.parse_failure_count,
+                    write_result.changed,
+                )
+                crawler.record_written_quarter(result, write_result.path)
+                processed_quarters += 1
+                changed_quarters += int(write_result.changed)
+                total_records += len(result.anime_list)
+                total_parse_failures += result.parse_failure_count
+        except BaseException:
+            for _, _, future in futures:
+                future.cancel()
             raise
 
     return CrawlSummary(
@@ -261,22 +340,34 @@ def crawl_quarters(
         changed_quarters=changed_quarters,
         total_records=total_records,
         parse_failures=total_parse_failures,
+        unchanged_quarters=unchanged_quarters,
     )
 
 
 def write_crawl_summary_outputs(summary: CrawlSummary) -> None:
-    output_path = os.getenv("GITHUB_OUTPUT", "").strip()
-    if not output_path:
-        return
     values = {
         "processed_quarters": summary.processed_quarters,
         "changed_quarters": summary.changed_quarters,
+        "unchanged_quarters": summary.unchanged_quarters,
         "record_count": summary.total_records,
         "parse_failures": summary.parse_failures,
     }
-    with Path(output_path).open("a", encoding="utf-8", newline="\n") as output:
-        for name, value in values.items():
-            output.write(f"{name}={value}\n")
+    output_path = os.getenv("GITHUB_OUTPUT", "").strip()
+    if output_path:
+        with Path(output_path).open("a", encoding="utf-8", newline="\n") as output:
+            for name, value in values.items():
+                output.write(f"{name}={value}\n")
+    summary_path = os.getenv("GITHUB_STEP_SUMMARY", "").strip()
+    if summary_path:
+        with Path(summary_path).open("a", encoding="utf-8", newline="\n") as output:
+            output.write("## Crawl summary\n\n")
+            output.write(f"- Processed quarters: {summary.processed_quarters}\n")
+            output.write(f"- Changed quarters: {summary.changed_quarters}\n")
+            output.write(
+                f"- Unchanged quarters skipped: {summary.unchanged_quarters}\n"
+            )
+            output.write(f"- Records: {summary.total_records}\n")
+            output.write(f"- Parse failures: {summary.parse_failures}\n\n")
 
 
 def generate_static_files() -> None:
@@ -8,7 +8,7 @@ from typing import Literal
 from urllib.parse import urlsplit
 from zoneinfo import ZoneInfo
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 TAIPEI_TZ = ZoneInfo("Asia/Taipei")
 BANGUMI_ID_PATTERN = re.compile(r"(?:anime-[0-9]+|fallback-[0-9a-f]{64})\Z")
@@ -21,6 +21,11 @@ CLOUDINARY_DELIVERY_PATH_PATTERN = re.compile(
     r"anime_covers/[0-9a-f]{32}(?:[0-9a-f]{32})?"
     r"(?:\.[A-Za-z0-9]+)?\Z"
 )
+# Inline LQIP: a tiny base64 WebP that the card paints before the cover loads.
+IMAGE_PLACEHOLDER_PATTERN = re.compile(r"data:image/webp;base64,[A-Za-z0-9+/]+={0,2}\Z")
+IMAGE_PLACEHOLDER_MAX_LENGTH = 2048
+# Version 2 adds optional cover dimensions and placeholders to each record.
+SCHEMA_VERSION = 2
 BroadcastDay = Literal["一", "二", "三", "四", "五", "六", "日", "無首播日期"]
 
 
@@ -62,6 +67,15 @@ class Anime(BaseModel):
     premiere_date: BroadcastDay = "無首播日期"
     premiere_time: str = "無首播時間"
     story: str = "暫無簡介"
+    image_width: int | None = Field(default=None, ge=1)
+    image_height: int | None = Field(default=None, ge=1)
+    image_placeholder: str | None = Field(
+        default=None, max_length=IMAGE_PLACEHOLDER_MAX_LENGTH
+    )
+
+    @property
+    def has_image_metadata(self) -> bool:
+        return self.image_width is not None
 
     @field_validator("bangumi_id", mode="before")
     @classmethod
@@ -102,6 +116,26 @@ class Anime(BaseModel):
     def normalize_story(cls, value: object) -> str:
         return str(value).strip() if value else "暫無簡介"
 
+    @field_validator("image_placeholder")
+    @classmethod
+    def validate_placeholder(cls, value: str | None) -> str | None:
+        if value is not None and not IMAGE_PLACEHOLDER_PATTERN.fullmatch(value):
+            raise ValueError("image_placeholder must be a base64 WebP data URI")
+        return value
+
+    @model_validator(mode="after")
+    def require_complete_image_metadata(self) -> Anime:
+        present = {
+            self.image_width is not None,
+            self.image_height is not None,
+            self.image_placeholder is not None,
+        }
+        if len(present) != 1:
+            raise ValueError(
+                "image_width, image_height, and image_placeholder must be set together"
+            )
+        return self
+
     @field_validator("premiere_date", mode="before")
     @classmethod
     def normalize_date(cls, value: object) -> str:
@@ -183,12 +217,13 @@ class QuarterDataset(BaseModel):
     """Versioned data envelope.
 
     The optional defaults keep historical two-field JSON files readable. Every
-    new write includes all fields.
+    new write includes all fields and uses schema_version 2, whose records may
+    carry cover dimensions and a placeholder.
     """
 
     model_config = ConfigDict(extra="forbid")
 
-    schema_version: Literal[1] = 1
+    schema_version: Literal[1, 2] = 1
     anime_list: list[Anime]
     generated_at: datetime
     source_url: str | None = None
@@ -201,6 +236,14 @@ class QuarterDataset(BaseModel):
             return value.replace(tzinfo=TAIPEI_TZ)
         return value.astimezone(TAIPEI_TZ)
 
+    @model_validator(mode="after")
+    def require_version_for_image_metadata(self) -> QuarterDataset:
+        if self.schema_version < 2 and any(
+            record.has_image_metadata for record in self.anime_list
+        ):
+            raise ValueError("Image metadata requires schema_version 2")
+        return self
+
     @field_validator("source_url")
     @classmethod
     def validate_source_url(cls, value: str | None) -> str | None:
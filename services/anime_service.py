@@ -7,21 +7,33 @@ system failure into a public data record.
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from collections.abc import Iterable
+from concurrent.futures import Future, as_completed, wait
+from dataclasses import dataclass, replace
+from pathlib import Path
 
 from dotenv import load_dotenv
 
 from config import Config
-from models import Anime
-from services.cache_repository import CacheRepository
-from services.errors import CrawlerError, ItemParseError
-from services.http_client import SourceClient
+from models import Anime, AnimeCandidate
+from services.async_crawler import AsyncQuarterCrawler
+from services.cache_repository import CacheCheckpoints, CacheRepository, CacheStore
+from services.errors import CrawlerError, ItemParseError, SourceFetchError
+from services.http_client import SourceClient, SourceDocument, SourceStream
 from services.image_store import CloudinaryImageStore
-from services.parser import extract_item_html, parse_anime_item
+from services.original_store import OriginalImageStore
+from services.parser import (
+    StreamingCardParser,
+    iter_streamed_cards,
+    parse_fingerprinted_document,
+)
 from services.settings import CrawlerSettings, ProjectPaths
+from services.source_state import SourceFingerprint, SourceStateRepository
+from services.sqlite_cache import SqliteCacheRepository
+from services.stage_executor import StageExecutor
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -42,6 +54,8 @@ class CrawlResult:
     source_count: int
     anime_list: list[Anime]
     failures: tuple[ItemFailure, ...]
+    fingerprint: SourceFingerprint | None = None
+    unchanged: bool = False
 
     @property
     def parse_failure_count(self) -> int:
@@ -78,31 +92,134 @@ class AnimeCrawlerService:
         settings: CrawlerSettings,
         source_client: SourceClient,
         image_store: CloudinaryImageStore,
-        cache: CacheRepository,
+        cache: CacheStore,
+        stages: StageExecutor | None = None,
     ) -> None:
         self.settings = settings
         self.source_client = source_client
         self.image_store = image_store
         self.cache = cache
+        self._cache_checkpoints = CacheCheckpoints(
+            every_items=settings.cache_checkpoint_items,
+            every_seconds=settings.cache_checkpoint_seconds,
+        )
+        # CPU-bound stages may run in a process pool; network I/O never does.
+        self.stages = stages or StageExecutor()
+        self._async_engine = AsyncQuarterCrawler(self)
+
+    def __enter__(self) -> AnimeCrawlerService:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Compact the cache, then stop the image pipeline and HTTP sessions."""
+        try:
+            # Journaled checkpoints must reach the committed snapshot by exit.
+            self.cache.compact()
+            logger.info(
+                "Cache checkpoints during crawl: %s",
+                self._cache_checkpoints.checkpoints,
+            )
+            stats = self.image_store.session_stats()
+            logger.info(
+                "Image sessions: created=%s leases=%s connections=%s "
+                "requests=%s reused=%s",
+                stats.sessions_created,
+                stats.leases,
+                stats.connections_opened,
+                stats.requests_sent,
+                stats.reused_requests,
+            )
+            flights = self.image_store.single_flight_stats()
+            logger.info(
+                "Image downloads: leaders=%s waits=%s hits=%s",
+                flights.leaders,
+                flights.waits,
+                flights.hits,
+            )
+            pipeline = self.image_store.pipeline_stats()
+            logger.info(
+                "Image pipeline: downloads=%s uploads=%s peak_inflight_bytes=%s",
+                pipeline.downloads,
+                pipeline.uploads,
+                pipeline.peak_inflight_bytes,
+            )
+            quota = self.image_store.quota_stats()
+            logger.info(
+                "Cloudinary quota: refreshes=%s uploads=%s bytes=%s estimated=%s",
+                quota.refreshes,
+                quota.uploads,
+                quota.uploaded_bytes,
+                "n/a"
+                if quota.estimated_percent is None
+                else f"{quota.estimated_percent:.2f}%",
+            )
+            originals = self.image_store.original_stats()
+            if originals is not None:
+                logger.info(
+                    "Original store: hits=%s misses=%s writes=%s evictions=%s bytes=%s",
+                    originals.hits,
+                    originals.misses,
+                    originals.writes,
+                    originals.evictions,
+                    originals.stored_bytes,
+                )
+        finally:
+            self.stages.close()
+            self.image_store.close()
+            self.source_client.close()
 
     @classmethod
     def from_environment(cls) -> AnimeCrawlerService:
         settings = CrawlerSettings.from_environment()
         paths = ProjectPaths.from_environment()
-        cache = CacheRepository(paths.cache_file)
+        cache: CacheStore = (
+            SqliteCacheRepository.from_paths(paths)
+            if settings.cache_backend == "sqlite"
+            else CacheRepository.from_settings(settings, paths)
+        )
+        stages = StageExecutor.from_settings(settings)
+        source_state = (
+            SourceStateRepository(paths.source_state_file)
+            if settings.source_conditional_fetch
+            else None
+        )
         return cls(
             settings=settings,
-            source_client=SourceClient(settings),
-            image_store=CloudinaryImageStore(settings, cache),
+            source_client=SourceClient(settings, state=source_state),
+            image_store=CloudinaryImageStore(
+                settings,
+                cache,
+                stages=stages,
+                originals=OriginalImageStore.from_settings(settings, paths),
+            ),
             cache=cache,
+            stages=stages,
         )
 
-    def _process_item(self, item_html: str) -> Anime:
-        candidate = parse_anime_item(item_html)
-        image_url = self.image_store.store(
+    def _submit_item(self, candidate: AnimeCandidate) -> Future[Anime]:
+        """Queue the candidate's cover and build its record once it is stored."""
+
+        record: Future[Anime] = Future()
+
+        def finish(image: Future[str]) -> None:
+            if not record.set_running_or_notify_cancel():
+                return
+            try:
+                record.set_result(self._anime_record(candidate, image.result()))
+            except BaseException as exc:
+                record.set_exception(exc)
+
+        self.image_store.submit(
             candidate.source_image_url,
             candidate.anime_name,
-        )
+        ).add_done_callback(finish)
+        return record
+
+    def _anime_record(self, candidate: AnimeCandidate, image_url: str) -> Anime:
+        metadata = self.image_store.image_metadata(image_url)
         return Anime(
             bangumi_id=candidate.bangumi_id,
             anime_name=candidate.anime_name,
@@ -110,54 +227,168 @@ class AnimeCrawlerService:
             premiere_date=candidate.premiere_date,
             premiere_time=candidate.premiere_time,
             story=candidate.story,
+            image_width=metadata.width if metadata else None,
+            image_height=metadata.height if metadata else None,
+            image_placeholder=metadata.placeholder if metadata else None,
         )
 
-    def fetch_quarter(self, year: str, season: str) -> CrawlResult:
+    def fetch_quarter(
+        self,
+        year: str,
+        season: str,
+        *,
+        current_data_sha256: str | None = None,
+    ) -> CrawlResult:
+        """Crawl one quarter.
+
+        ``current_data_sha256`` is the digest of the quarter's existing JSON.
+        When the source still matches the fingerprint recorded with that file,
+        the result is marked unchanged and no card, image, or write work runs.
+        """
+
+        if self.settings.crawler_engine == "asyncio":
+            return self._async_engine.fetch_quarter(
+                year,
+                season,
+                current_data_sha256=current_data_sha256,
+            )
+        document = self.source_client.fetch_quarter_document(
+            year,
+            season,
+            current_data_sha256=current_data_sha256,
+            stream=self.settings.source_streaming,
+        )
+        source_url = document.url
+        if document.unchanged:
+            return self._unchanged_result(year, season, source_url, "source")
+        if document.stream is not None:
+            return self._fetch_streamed_quarter(year, season, document.stream)
+        fingerprint, candidates = self._parse_source_document(document)
+        if candidates is None:
+            return self._unchanged_result(year, season, source_url, "card set")
+
         self.image_store.assert_quota_available()
-        source_url, document_html = self.source_client.fetch_quarter_html(year, season)
-        item_html_list = extract_item_html(document_html)
+        records, failures = self._process_candidates(candidates, year, season)
+        return self._crawl_result(
+            year,
+            season,
+            source_url,
+            len(candidates),
+            records,
+            failures,
+            fingerprint,
+        )
+
+    def _parse_source_document(
+        self,
+        document: SourceDocument,
+    ) -> tuple[SourceFingerprint, list[AnimeCandidate | ItemParseError] | None]:
+        """Add the semantic digests and parse the cards in one "parse" stage.
+
+        The cards are None when a digest matches the last crawl.
+        """
+
+        if document.html is None or document.fingerprint is None:
+            raise SourceFetchError(f"Source returned no document: {document.url}")
+        known = document.known
+        known_digests = (known.document_sha256, known.card_set_sha256) if known else ()
+        parsed = self.stages.run(
+            "parse",
+            parse_fingerprinted_document,
+            document.html,
+            backend=self.settings.parser_backend,
+            known_digests={digest for digest in known_digests if digest},
+        )
+        fingerprint = replace(
+            document.fingerprint,
+            document_sha256=parsed.document_sha256,
+            card_set_sha256=parsed.card_set_sha256,
+        )
+        return fingerprint, parsed.cards
+
+    def _fetch_streamed_quarter(
+        self,
+        year: str,
+        season: str,
+        stream: SourceStream,
+    ) -> CrawlResult:
+        """Start item work for each card while the page is still arriving."""
+
+        parser = StreamingCardParser()
+        try:
+            self.image_store.assert_quota_available()
+            records, failures = self._process_candidates(
+                iter_streamed_cards(stream.iter_bytes(), parser),
+                year,
+                season,
+            )
+        finally:
+            stream.close()
+        return self._crawl_result(
+            year,
+            season,
+            stream.url,
+            parser.card_count,
+            records,
+            failures,
+            stream.fingerprint(card_set_sha256=parser.card_set_sha256),
+        )
+
+    def _process_candidates(
+        self,
+        candidates: Iterable[AnimeCandidate | ItemParseError],
+        year: str,
+        season: str,
+    ) -> tuple[list[Anime], list[ItemFailure]]:
+        """Submit each valid candidate as soon as ``candidates`` yields it.
+
+        Covers go straight to the image pipeline, so no thread waits on an
+        upload; the pipeline's full download queue is the only backpressure.
+        """
+
         records: list[Anime] = []
         failures: list[ItemFailure] = []
-
+        futures: dict[Future[Anime], int] = {}
         try:
-            with ThreadPoolExecutor(
-                max_workers=self.settings.max_workers,
-                thread_name_prefix="anime-worker",
-            ) as executor:
-                futures = {
-                    executor.submit(self._process_item, item_html): index
-                    for index, item_html in enumerate(item_html_list)
-                }
-                for future in as_completed(futures):
-                    index = futures[future]
-                    try:
-                        records.append(future.result())
-                    except ItemParseError as exc:
-                        failures.append(
-                            ItemFailure(
-                                index=index,
-                                error_type=type(exc).__name__,
-                                message=str(exc)[:500],
-                            )
-                        )
-                        logger.warning(
-                            "Anime item %s could not be parsed for %s %s: %s",
-                            index,
-                            year,
-                            season,
-                            exc,
-                        )
-                    except Exception:
-                        logger.exception(
-                            "System failure while processing anime item %s for %s %s",
-                            index,
-                            year,
-                            season,
-                        )
-                        raise
+            for index, candidate in enumerate(candidates):
+                if isinstance(candidate, ItemParseError):
+                    failures.append(self._item_failure(index, candidate, year, season))
+                else:
+                    futures[self._submit_item(candidate)] = index
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    records.append(future.result())
+                except ItemParseError as exc:
+                    failures.append(self._item_failure(index, exc, year, season))
+                except Exception:
+                    logger.exception(
+                        "System failure while processing anime item %s for %s %s",
+                        index,
+                        year,
+                        season,
+                    )
+                    raise
+                if self._cache_checkpoints.record_item():
+                    self.cache.save_if_changed()
+        except BaseException:
+            # Queued covers still finish; wait so none lands after the save.
+            wait(futures)
+            raise
         finally:
             self.cache.save_if_changed()
+        return records, failures
 
+    @staticmethod
+    def _crawl_result(
+        year: str,
+        season: str,
+        source_url: str,
+        source_count: int,
+        records: list[Anime],
+        failures: list[ItemFailure],
+        fingerprint: SourceFingerprint,
+    ) -> CrawlResult:
         if not records:
             summary = failures[0].message if failures else "no cards were parsed"
             raise CrawlerError(f"{year} {season} produced no valid records: {summary}")
@@ -167,9 +398,64 @@ class AnimeCrawlerService:
             year=str(year),
             season=season,
             source_url=source_url,
-            source_count=len(item_html_list),
+            source_count=source_count,
             anime_list=records,
             failures=tuple(sorted(failures, key=lambda failure: failure.index)),
+            fingerprint=fingerprint,
+        )
+
+    @staticmethod
+    def _item_failure(
+        index: int,
+        exc: ItemParseError,
+        year: str,
+        season: str,
+    ) -> ItemFailure:
+        logger.warning(
+            "Anime item %s could not be parsed for %s %s: %s",
+            index,
+            year,
+            season,
+            exc,
+        )
+        return ItemFailure(
+            index=index,
+            error_type=type(exc).__name__,
+            message=str(exc)[:500],
+        )
+
+    @staticmethod
+    def _unchanged_result(
+        year: str,
+        season: str,
+        source_url: str,
+        matched: str,
+    ) -> CrawlResult:
+        logger.info(
+            "%s %s %s matches the last successful crawl; items skipped",
+            year,
+            season,
+            matched,
+        )
+        return CrawlResult(
+            year=str(year),
+            season=season,
+            source_url=source_url,
+            source_count=0,
+            anime_list=[],
+            failures=(),
+            unchanged=True,
+        )
+
+    def record_written_quarter(self, result: CrawlResult, data_path: Path) -> None:
+        """Remember the source fingerprint once its quarter data is on disk."""
+
+        if result.fingerprint is None:
+            return
+        self.source_client.remember(
+            result.source_url,
+            result.fingerprint,
+            data_sha256=hashlib.sha256(data_path.read_bytes()).hexdigest(),
         )
 
 
@@ -185,8 +471,11 @@ def fetch_anime_data(
     """
 
     del cache
-    result = AnimeCrawlerService.from_environment().fetch_quarter(year, season)
-    return [anime.model_dump(mode="json") for anime in result.anime_list]
+    with AnimeCrawlerService.from_environment() as crawler:
+        result = crawler.fetch_quarter(year, season)
+    return [
+        anime.model_dump(mode="json", exclude_none=True) for anime in result.anime_list
+    ]
 
 
 def get_current_season(month: int) -> str:
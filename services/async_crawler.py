@@ -0,0 +1,417 @@
+"""Asyncio crawl engine, selectable with ``CRAWLER_ENGINE=asyncio``.
+
+It crawls one quarter on an event loop with the same source handling, SSRF
+checks, cache keys, and upload path as the threaded service, and returns an
+identical CrawlResult. Downloads are coroutines, so hundreds can be in flight
+without a thread each. The blocking Cloudinary SDK and CPU stages run through
+``asyncio.to_thread``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from typing import TYPE_CHECKING
+from urllib.parse import urljoin
+
+from models import Anime, AnimeCandidate
+from services.async_http import (
+    AsyncHttpClient,
+    AsyncHttpError,
+    AsyncResponse,
+    ResponseHeaders,
+    ResponseTooLargeError,
+)
+from services.dns_cache import DnsCache, check_resolved_addresses
+from services.errors import ImageStoreError, ItemParseError, SourceFetchError
+from services.http_client import (
+    RETRY_STATUSES,
+    DownloadedImage,
+    SourceDocument,
+    check_image_url,
+    checked_image_headers,
+)
+from services.image_pipeline import ByteBudget
+
+if TYPE_CHECKING:
+    from services.anime_service import AnimeCrawlerService, CrawlResult, ItemFailure
+
+logger = logging.getLogger(__name__)
+
+Resolver = Callable[[str], Awaitable[Sequence[str]]]
+
+SOURCE_ACCEPT = "text/html,application/xhtml+xml"
+IMAGE_ACCEPT = "image/avif,image/webp,image/png,image/jpeg,image/gif"
+# Mirrors create_retry_session: three retries, urllib3 backoff of 0.75s.
+RETRY_DELAYS = (0.0, 1.5, 3.0)
+MAX_SOURCE_REDIRECTS = 5
+# How often a download waiting for image budget checks it again.
+BUDGET_POLL_SECONDS = 0.01
+# urllib3's Retry.DEFAULT_BACKOFF_MAX; a larger Retry-After is not honoured.
+MAX_RETRY_AFTER_SECONDS = 120.0
+
+
+class AsyncQuarterCrawler:
+    """Run AnimeCrawlerService's quarter crawl on an asyncio event loop."""
+
+    def __init__(
+        self,
+        service: AnimeCrawlerService,
+        *,
+        http: AsyncHttpClient | None = None,
+        resolve: Resolver | None = None,
+        dns: DnsCache | None = None,
+    ) -> None:
+        self.service = service
+        self._http = http
+        self._resolve = resolve or self._resolve_cached
+        self._dns = dns
+
+    @property
+    def http(self) -> AsyncHttpClient:
+        if self._http is None:
+            self._http = AsyncHttpClient(
+                user_agent=self.service.settings.source_user_agent
+            )
+        return self._http
+
+    @property
+    def dns(self) -> DnsCache:
+        # Share the image downloader's cache so both engines see one answer.
+        if self._dns is None:
+            self._dns = self.service.image_store.downloader.dns
+        return self._dns
+
+    async def _resolve_cached(self, host: str) -> Sequence[str]:
+        return await asyncio.to_thread(self.dns.resolve, host)
+
+    def fetch_quarter(
+        self,
+        year: str,
+        season: str,
+        *,
+        current_data_sha256: str | None = None,
+    ) -> CrawlResult:
+        """Crawl one quarter on a fresh event loop owned by the calling thread."""
+
+        return asyncio.run(
+            self.crawl(year, season, current_data_sha256=current_data_sha256)
+        )
+
+    async def crawl(
+        self,
+        year: str,
+        season: str,
+        *,
+        current_data_sha256: str | None = None,
+    ) -> CrawlResult:
+        service = self.service
+        document = await self._fetch_document(year, season, current_data_sha256)
+        if document.unchanged:
+            return service._unchanged_result(year, season, document.url, "source")
+        fingerprint, candidates = await asyncio.to_thread(
+            service._parse_source_document, document
+        )
+        if candidates is None:
+            return service._unchanged_result(year, season, document.url, "card set")
+
+        await asyncio.to_thread(service.image_store.assert_quota_available)
+        records, failures = await self._process_candidates(candidates, year, season)
+        return service._crawl_result(
+            year,
+            season,
+            document.url,
+            len(candidates),
+            records,
+            failures,
+            fingerprint,
+        )
+
+    async def _get(
+        self,
+        url: str,
+        *,
+        timeout: float,
+        headers: Mapping[str, str],
+        max_bytes: int | None = None,
+        addresses: Sequence[str] = (),
+        on_headers: Callable[[int, ResponseHeaders], Awaitable[None]] | None = None,
+    ) -> AsyncResponse:
+        for attempt, delay in enumerate((*RETRY_DELAYS, None)):
+            try:
+                response = await self.http.get(
+                    url,
+                    timeout=timeout,
+                    headers=headers,
+                    max_bytes=max_bytes,
+                    addresses=addresses,
+                    on_headers=on_headers,
+                )
+            except ResponseTooLargeError:
+                raise
+            except AsyncHttpError:
+                if delay is None:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or delay is None:
+                    return response
+                retry_after = response.headers.get("retry-after") or ""
+                if retry_after.isdigit():
+                    delay = min(float(retry_after), MAX_RETRY_AFTER_SECONDS)
+            logger.debug("Retrying %s (attempt %s) in %ss", url, attempt + 2, delay)
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    async def _fetch_document(
+        self,
+        year: str,
+        season: str,
+        current_data_sha256: str | None,
+    ) -> SourceDocument:
+        client = self.service.source_client
+        url, known, headers = client.prepare_request(year, season, current_data_sha256)
+        current_url = url
+        try:
+            for _ in range(MAX_SOURCE_REDIRECTS + 1):
+                response = await self._get(
+                    current_url,
+                    timeout=self.service.settings.request_timeout_seconds,
+                    headers={"Accept": SOURCE_ACCEPT, **headers},
+                )
+                location = response.headers.get("location")
+                if not (response.is_redirect and location):
+                    break
+                current_url = urljoin(current_url, location)
+            else:
+                raise SourceFetchError(f"Source exceeded the redirect limit: {url}")
+        except AsyncHttpError as exc:
+            raise SourceFetchError(f"Unable to fetch {url}: {exc}") from exc
+
+        status = response.status_code
+        has_body = 200 <= status < 400 and status != 304
+        return client.document_from_response(
+            url,
+            known,
+            headers,
+            status_code=status,
+            text=response.body.decode("utf-8", errors="replace") if has_body else "",
+            response_headers=response.headers,
+        )
+
+    async def _download(
+        self,
+        url: str,
+        held: _HeldBytes | None = None,
+        *,
+        max_redirects: int = 3,
+    ) -> DownloadedImage:
+        """Download one image; ``held`` reserves its bytes once headers arrive."""
+
+        settings = self.service.settings
+        current_url = url
+        content_type = ""
+
+        async def check_headers(status: int, headers: ResponseHeaders) -> None:
+            nonlocal content_type
+            if 200 <= status < 300:
+                try:
+                    content_type = checked_image_headers(
+                        headers,
+                        settings.image_max_bytes,
+                    )
+                except ValueError as exc:
+                    raise ImageStoreError(f"Invalid image response: {exc}") from exc
+                if held is not None:
+                    await held.hold(_expected_size(headers, settings.image_max_bytes))
+
+        for redirect_number in range(max_redirects + 1):
+            host = check_image_url(current_url, settings.image_allowed_hosts)
+            addresses = await self._resolve(host)
+            check_resolved_addresses(host, addresses)
+            try:
+                response = await self._get(
+                    current_url,
+                    timeout=settings.image_timeout_seconds,
+                    headers={"Accept": IMAGE_ACCEPT},
+                    max_bytes=settings.image_max_bytes,
+                    # Connect only to the addresses that were just validated
+                    # so a second DNS answer cannot redirect the request.
+                    addresses=addresses,
+                    on_headers=check_headers,
+                )
+            except ResponseTooLargeError as exc:
+                raise ImageStoreError(
+                    "Image exceeds the configured size limit"
+                ) from exc
+            except AsyncHttpError as exc:
+                if isinstance(exc.__cause__, ValueError):
+                    raise ImageStoreError(f"Invalid image response: {exc}") from exc
+                raise ImageStoreError(
+                    f"Unable to download approved image URL: {exc}"
+                ) from exc
+
+            if response.is_redirect:
+                location = response.headers.get("location")
+                if not location:
+                    raise ImageStoreError("Image redirect omitted the Location header")
+                if redirect_number >= max_redirects:
+                    raise ImageStoreError("Image exceeded the redirect limit")
+                current_url = urljoin(current_url, location)
+                continue
+            if response.status_code >= 400:
+                raise ImageStoreError(
+                    f"Invalid image response: HTTP {response.status_code}"
+                )
+            if not response.body:
+                raise ImageStoreError("Image response was empty")
+            return DownloadedImage(
+                content=response.body,
+                content_type=content_type,
+                final_url=current_url,
+            )
+
+        raise ImageStoreError("Image redirect handling failed")
+
+    async def _process_item(
+        self,
+        candidate: AnimeCandidate,
+        downloads: asyncio.Semaphore,
+    ) -> Anime:
+        image_store = self.service.image_store
+        source_url = candidate.source_image_url
+        image_url = image_store.cached_url(source_url)
+
+        async def download_and_store() -> str:
+            cached = image_store.cached_url(source_url)
+            if cached:
+                return cached
+            held = _HeldBytes(
+                image_store.pipeline.budget, image_store.pipeline.max_item_bytes
+            )
+            try:
+                downloaded = await asyncio.to_thread(
+                    image_store.stored_original, source_url
+                )
+                if downloaded is None:
+                    async with downloads:
+                        downloaded = await self._download(source_url, held)
+                # Keep only the real size reserved until the upload ends.
+                await held.hold(len(downloaded.content))
+                return await asyncio.to_thread(
+                    image_store.store_downloaded,
+                    source_url,
+                    candidate.anime_name,
+                    downloaded,
+                )
+            finally:
+                held.release()
+
+        if image_url is None:
+            image_url = await image_store.downloads.do_async(
+                image_store.source_key(source_url),
+                download_and_store,
+            )
+        return self.service._anime_record(candidate, image_url)
+
+    async def _process_candidates(
+        self,
+        candidates: Sequence[AnimeCandidate | ItemParseError],
+        year: str,
+        season: str,
+    ) -> tuple[list[Anime], list[ItemFailure]]:
+        service = self.service
+        downloads = asyncio.Semaphore(service.settings.async_image_concurrency)
+        records: list[Anime] = []
+        failures: list[ItemFailure] = []
+        tasks: dict[asyncio.Task[Anime], int] = {}
+        try:
+            for index, candidate in enumerate(candidates):
+                if isinstance(candidate, ItemParseError):
+                    failures.append(
+                        service._item_failure(index, candidate, year, season)
+                    )
+                else:
+                    task = asyncio.create_task(self._process_item(candidate, downloads))
+                    tasks[task] = index
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    index = tasks[task]
+                    try:
+                        records.append(task.result())
+                    except ItemParseError as exc:
+                        failures.append(service._item_failure(index, exc, year, season))
+                    except Exception:
+                        logger.exception(
+                            "System failure while processing anime item %s for %s %s",
+                            index,
+                            year,
+                            season,
+                        )
+                        raise
+                    if service._cache_checkpoints.record_item():
+                        # A full JSON rewrite must not stall the event loop.
+                        await asyncio.to_thread(service.cache.save_if_changed)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            service.cache.save_if_changed()
+        return records, failures
+
+
+def _expected_size(headers: ResponseHeaders, max_bytes: int) -> int:
+    """Body size promised by an identity Content-Length, else ``max_bytes``."""
+
+    length = headers.get("content-length")
+    encoding = headers.get("content-encoding", "identity").strip().lower()
+    if length and encoding == "identity":
+        return min(int(length), max_bytes)
+    return max_bytes
+
+
+class _HeldBytes:
+    """One item's reservation on the pipeline byte budget.
+
+    Reserving from Content-Length instead of ``max_item_bytes`` lets many
+    small covers share the budget; only chunked or encoded bodies hold the
+    full per-item limit until they finish.
+    """
+
+    def __init__(self, budget: ByteBudget, max_item_bytes: int) -> None:
+        self.budget = budget
+        self.max_item_bytes = max_item_bytes
+        self.reserved = 0
+
+    async def hold(self, size: int) -> None:
+        """Grow or shrink the reservation to ``size`` bytes."""
+
+        size = min(size, self.max_item_bytes)
+        if size > self.reserved:
+            self.reserved += await _reserve(self.budget, size - self.reserved)
+        else:
+            self.budget.release(self.reserved - size)
+            self.reserved = size
+
+    def release(self) -> None:
+        self.budget.release(self.reserved)
+        self.reserved = 0
+
+
+async def _reserve(budget: ByteBudget, size: int) -> int:
+    """Reserve image bytes without parking an executor thread on the budget.
+
+    Holders need executor threads to finish their uploads, so blocking
+    waiters there could starve them; polling keeps the wait on the loop.
+    """
+
+    while not (reserved := budget.try_acquire(size)):
+        await asyncio.sleep(BUDGET_POLL_SECONDS)
+    return reserved
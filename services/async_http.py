@@ -0,0 +1,231 @@
+"""Minimal asyncio HTTP/1.1 GET client for the asyncio crawl engine.
+
+Only what the crawler needs is implemented: one request per connection,
+Content-Length, chunked, and read-to-close bodies, gzip/deflate decoding, a
+body size limit enforced while reading, and connections pinned to addresses
+the caller has already validated.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ssl
+import zlib
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+from requests.utils import requote_uri
+
+OpenConnection = Callable[
+    ..., Awaitable[tuple[asyncio.StreamReader, asyncio.StreamWriter]]
+]
+
+MAX_HEADER_BYTES = 64 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class AsyncHttpError(Exception):
+    """Transport or protocol failure; callers map it to a typed crawler error."""
+
+
+class ResponseTooLargeError(AsyncHttpError):
+    pass
+
+
+class ResponseHeaders(dict[str, str]):
+    """Response headers with case-insensitive ``get``; keys are stored lower-case."""
+
+    def get(self, key: str, default: str | None = None) -> str | None:  # type: ignore[override]
+        return super().get(key.lower(), default)
+
+
+@dataclass(frozen=True)
+class AsyncResponse:
+    status_code: int
+    headers: ResponseHeaders
+    body: bytes
+
+    @property
+    def is_redirect(self) -> bool:
+        return self.status_code in {301, 302, 303, 307, 308}
+
+
+class AsyncHttpClient:
+    """Issue bounded GET requests without holding a thread per request."""
+
+    def __init__(
+        self,
+        *,
+        user_agent: str,
+        open_connection: OpenConnection = asyncio.open_connection,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        self.user_agent = user_agent
+        self._open_connection = open_connection
+        self._ssl_context = ssl_context or ssl.create_default_context()
+
+    async def get(
+        self,
+        url: str,
+        *,
+        timeout: float,
+        headers: Mapping[str, str] | None = None,
+        max_bytes: int | None = None,
+        addresses: Sequence[str] = (),
+        on_headers: Callable[[int, ResponseHeaders], Awaitable[None]] | None = None,
+    ) -> AsyncResponse:
+        """Fetch ``url``, dialing ``addresses`` instead of resolving its host.
+
+        Addresses are tried in order until one accepts the connection.
+
+        ``on_headers`` is awaited before the body is read so a caller can
+        reject a response by its headers, or size it, without downloading it.
+        """
+
+        # Quote spaces and non-ASCII path characters exactly as requests does.
+        parts = urlsplit(requote_uri(url))
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise AsyncHttpError(f"Unsupported URL: {url}")
+        secure = parts.scheme == "https"
+        port = parts.port or (443 if secure else 80)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request_headers = {
+            "Host": parts.netloc.rsplit("@", 1)[-1],
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "close",
+            **(headers or {}),
+        }
+        request = f"GET {target} HTTP/1.1\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in request_headers.items()
+        )
+
+        try:
+            async with asyncio.timeout(timeout):
+                reader, writer = await self._connect(
+                    addresses or (parts.hostname,),
+                    port,
+                    ssl=self._ssl_context if secure else None,
+                    server_hostname=parts.hostname if secure else None,
+                )
+                try:
+                    writer.write(request.encode("latin-1") + b"\r\n")
+                    await writer.drain()
+                    status_code, response_headers = await _read_head(reader)
+                    if on_headers is not None:
+                        await on_headers(status_code, response_headers)
+                    body = await _read_body(reader, response_headers, max_bytes)
+                finally:
+                    writer.close()
+        except AsyncHttpError:
+            raise
+        except TimeoutError as exc:
+            raise AsyncHttpError(f"Timed out after {timeout}s: {url}") from exc
+        except (OSError, EOFError, asyncio.LimitOverrunError, ValueError) as exc:
+            raise AsyncHttpError(f"{type(exc).__name__}: {exc}") from exc
+
+        return AsyncResponse(
+            status_code=status_code,
+            headers=response_headers,
+            body=_decoded(body, response_headers.get("content-encoding"), max_bytes),
+        )
+
+    async def _connect(
+        self,
+        hosts: Sequence[str],
+        port: int,
+        **options: Any,
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        for host in hosts[:-1]:
+            try:
+                return await self._open_connection(
+                    host, port, limit=MAX_HEADER_BYTES, **options
+                )
+            except OSError:
+                continue
+        return await self._open_connection(
+            hosts[-1], port, limit=MAX_HEADER_BYTES, **options
+        )
+
+
+async def _read_head(reader: asyncio.StreamReader) -> tuple[int, ResponseHeaders]:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError as exc:
+        raise AsyncHttpError("Response headers are too large") from exc
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    version, _, rest = status_line.partition(" ")
+    if not version.startswith("HTTP/1."):
+        raise AsyncHttpError(f"Malformed status line: {status_line!r}")
+    status_text = rest.partition(" ")[0]
+    if not status_text.isdigit():
+        raise AsyncHttpError(f"Malformed status line: {status_line!r}")
+    headers = ResponseHeaders()
+    for line in header_lines:
+        if not line:
+            continue
+        name, separator, value = line.partition(":")
+        if not separator:
+            raise AsyncHttpError(f"Malformed header line: {line!r}")
+        key = name.strip().lower()
+        headers[key] = (
+            f"{headers[key]}, {value.strip()}" if key in headers else value.strip()
+        )
+    return int(status_text), headers
+
+
+def _check_size(size: int, max_bytes: int | None) -> None:
+    if max_bytes is not None and size > max_bytes:
+        raise ResponseTooLargeError("Response exceeds the configured size limit")
+
+
+async def _read_body(
+    reader: asyncio.StreamReader,
+    headers: ResponseHeaders,
+    max_bytes: int | None,
+) -> bytes:
+    body = bytearray()
+    if "chunked" in (headers.get("transfer-encoding") or "").lower():
+        while True:
+            size_line = await reader.readuntil(b"\r\n")
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                while (await reader.readuntil(b"\r\n")) != b"\r\n":
+                    pass
+                return bytes(body)
+            _check_size(len(body) + size, max_bytes)
+            body += await reader.readexactly(size)
+            if await reader.readexactly(2) != b"\r\n":
+                raise AsyncHttpError("Malformed chunked body")
+
+    content_length = headers.get("content-length")
+    if content_length is not None:
+        size = int(content_length)
+        if size < 0:
+            raise AsyncHttpError(f"Invalid Content-Length: {content_length}")
+        _check_size(size, max_bytes)
+        return await reader.readexactly(size)
+
+    while chunk := await reader.read(READ_CHUNK_BYTES):
+        _check_size(len(body) + len(chunk), max_bytes)
+        body += chunk
+    return bytes(body)
+
+
+def _decoded(body: bytes, encoding: str | None, max_bytes: int | None) -> bytes:
+    encoding = (encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return body
+    if encoding not in {"gzip", "deflate"}:
+        raise AsyncHttpError(f"Unsupported Content-Encoding: {encoding}")
+    # 32 + MAX_WBITS auto-detects the gzip or zlib header.
+    decompressor = zlib.decompressobj(32 + zlib.MAX_WBITS)
+    limit = 0 if max_bytes is None else max_bytes + 1
+    try:
+        decoded = decompressor.decompress(body, limit)
+    except zlib.error as exc:
+        raise AsyncHttpError(f"Invalid {encoding} body: {exc}") from exc
+    _check_size(len(decoded), max_bytes)
+    return decoded + decompressor.flush()
@@ -9,14 +9,12 @@ from pathlib import Path
 from typing import Any
 
 
-def atomic_write_text(path: Path, content: str) -> None:
+def atomic_write_bytes(path: Path, content: bytes) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     temporary_path: Path | None = None
     try:
         with tempfile.NamedTemporaryFile(
-            mode="w",
-            encoding="utf-8",
-            newline="\n",
+            mode="wb",
             dir=path.parent,
             prefix=f".{path.name}.",
             suffix=".tmp",
@@ -32,6 +30,11 @@ def atomic_write_text(path: Path, content: str) -> None:
             temporary_path.unlink()
 
 
+def atomic_write_text(path: Path, content: str) -> None:
+    # Encoding directly keeps "\n" line endings on every platform.
+    atomic_write_bytes(path, content.encode("utf-8"))
+
+
 def atomic_write_json(path: Path, data: Any) -> None:
     content = json.dumps(data, ensure_ascii=False, indent=2) + "\n"
     atomic_write_text(path, content)
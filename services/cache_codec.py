@@ -0,0 +1,73 @@
+"""Compact in-memory encoding for cache keys, URLs, and public IDs.
+
+Almost every cache string is a shared prefix, a lowercase MD5 or SHA-256 hex
+digest, and an optional file extension. Such strings are stored as one small
+``bytes`` object: a byte indexing an interned ``(prefix, suffix)`` table,
+followed by the raw digest. Anything else stays a ``str``. Packing is
+lossless and deterministic for a given table, so packed values can be used
+directly as dictionary keys.
+"""
+
+from __future__ import annotations
+
+import re
+
+Packed = bytes | str
+MAX_AFFIXES = 256
+_HEX_PATTERN = re.compile(r"[0-9a-f]+")
+_EXTENSION_PATTERN = re.compile(r"\.[a-z0-9]{1,5}")
+
+
+def _split(text: str) -> tuple[str, str, str] | None:
+    """Split ``text`` into prefix, trailing hex digest, and extension."""
+
+    stem, suffix = text, ""
+    dot = text.rfind(".", max(0, len(text) - 6))
+    if dot != -1 and _EXTENSION_PATTERN.fullmatch(text, dot):
+        stem, suffix = text[:dot], text[dot:]
+    for length in (64, 32):
+        digest = stem[-length:]
+        if len(digest) == length and _HEX_PATTERN.fullmatch(digest):
+            return stem[:-length], digest, suffix
+    return None
+
+
+class CompactStrings:
+    """Pack and unpack strings against an append-only affix table."""
+
+    def __init__(self, affixes: list[tuple[str, str]] | None = None) -> None:
+        self.affixes: list[tuple[str, str]] = []
+        self._indexes: dict[tuple[str, str], int] = {}
+        for prefix, suffix in affixes or ():
+            self._intern(prefix, suffix)
+
+    def _intern(self, prefix: str, suffix: str) -> int:
+        index = len(self.affixes)
+        self.affixes.append((prefix, suffix))
+        self._indexes[(prefix, suffix)] = index
+        return index
+
+    def pack(self, text: str, *, add: bool = True) -> Packed:
+        """Return the compact form of ``text``.
+
+        With ``add=False`` the table is left unchanged, which is enough for
+        lookups: a string whose affixes are not interned was never packed.
+        """
+
+        parts = _split(text)
+        if parts is None:
+            return text
+        prefix, digest, suffix = parts
+        affixes = (prefix, suffix)
+        index = self._indexes.get(affixes)
+        if index is None:
+            if not add or len(self.affixes) >= MAX_AFFIXES:
+                return text
+            index = self._intern(*affixes)
+        return bytes((index,)) + bytes.fromhex(digest)
+
+    def unpack(self, value: Packed) -> str:
+        if isinstance(value, str):
+            return value
+        prefix, suffix = self.affixes[value[0]]
+        return prefix + value[1:].hex() + suffix
@@ -1,22 +1,185 @@
-"""Thread-safe, atomic repository for Cloudinary URL mappings."""
+"""Thread-safe, atomic repository for Cloudinary URL mappings.
+
+Entries are held in memory in the compact form from ``services.cache_codec``
+and only expanded back to full strings when they leave the repository.
+
+The committed ``cloudinary_cache.json`` is always the canonical snapshot. In
+journaled mode a checkpoint appends only the changed entries to a sibling
+``.journal`` file, one JSON array per line (``["set", key, value]`` or
+``["remove", key]``), and compaction folds the journal back into the
+snapshot. Every load replays a leftover journal, so a crash between
+compactions loses nothing that was checkpointed. Replay is idempotent: a
+crash after the snapshot is replaced but before the journal is removed only
+re-applies changes the snapshot already holds.
+
+An optional packed snapshot under ``.crawler-state`` stores the compact
+entries and public ID index with ``marshal``, tagged with the SHA-256 of the
+JSON it mirrors. Loading it skips JSON parsing and URL re-parsing; any
+mismatch falls back to the JSON, which stays authoritative. Only ``compact``
+writes it, at close, so checkpoints never pay for a second file.
+"""
 
 from __future__ import annotations
 
+import hashlib
+import importlib.util
 import json
+import logging
+import marshal
+import os
 import threading
-from collections.abc import Iterable
+import time
+from collections.abc import Callable, Iterable
 from pathlib import Path
+from typing import Protocol
 
-from services.atomic_io import atomic_write_json
+from services.atomic_io import atomic_write_bytes, atomic_write_json
+from services.cache_codec import CompactStrings, Packed
 from services.errors import DataContractError
+from services.settings import CrawlerSettings, ProjectPaths
+
+logger = logging.getLogger(__name__)
+JOURNAL_SUFFIX = ".journal"
+# Marshal data is only valid for the interpreter version that wrote it.
+PACKED_MAGIC = b"ASCPACK1" + importlib.util.MAGIC_NUMBER
+_PACKED_HEADER_LENGTH = len(PACKED_MAGIC) + 64
+
+
+class CacheStore(Protocol):
+    """The cache contract shared by the JSON and SQLite repositories."""
+
+    def get(self, key: str) -> str | None: ...
+
+    def set(self, key: str, value: str) -> None: ...
+
+    def snapshot(self) -> dict[str, str]: ...
+
+    def urls_with_public_ids(self, public_ids: Iterable[str]) -> set[str]: ...
+
+    def remove_urls_with_public_ids(self, public_ids: Iterable[str]) -> int: ...
+
+    def save_if_changed(self) -> bool: ...
+
+    def compact(self) -> bool: ...
+
+
+def _public_id(value: str) -> str | None:
+    from services.retention import cloudinary_public_id_from_url
+
+    return cloudinary_public_id_from_url(value)
+
+
+def cache_journal_path(cache_path: Path) -> Path:
+    return cache_path.with_name(cache_path.name + JOURNAL_SUFFIX)
+
+
+def validated_managed_public_ids(public_ids: Iterable[str]) -> set[str]:
+    from services.retention import is_managed_public_id
+
+    targets = set(public_ids)
+    invalid = sorted(
+        str(public_id) for public_id in targets if not is_managed_public_id(public_id)
+    )
+    if invalid:
+        raise DataContractError(
+            "Cache invalidation requires exact managed Cloudinary public IDs; "
+            f"invalid={invalid[:5]}"
+        )
+    return targets
+
+
+class CacheCheckpoints:
+    """Decide when finished items should checkpoint the cache mid-quarter.
+
+    A checkpoint is due after ``every_items`` finished items or once
+    ``every_seconds`` have passed since the last one; 0 disables a trigger.
+    Counters are shared by every quarter of a run, so concurrent quarters do
+    not each checkpoint on their own schedule.
+    """
+
+    def __init__(
+        self,
+        *,
+        every_items: int,
+        every_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.every_items = every_items
+        self.every_seconds = every_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._items = 0
+        self._last = clock()
+        self.checkpoints = 0
+
+    def record_item(self) -> bool:
+        """Count a finished item and return whether a checkpoint is due."""
+
+        with self._lock:
+            self._items += 1
+            now = self._clock()
+            due = (self.every_items and self._items >= self.every_items) or (
+                self.every_seconds and now - self._last >= self.every_seconds
+            )
+            if not due:
+                return False
+            self._items = 0
+            self._last = now
+            self.checkpoints += 1
+            return True
 
 
 class CacheRepository:
-    def __init__(self, path: Path) -> None:
+    """String-to-string cache with a managed public ID to keys index.
+
+    The index lets retention invalidate or look up the URLs of a handful of
+    public IDs without parsing every cached value; ``set`` keeps it in step.
+    It is built on first use, so a crawl that never asks pays nothing for
+    it at load time.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        journal: bool = False,
+        compact_operations: int = 5000,
+        packed_path: Path | None = None,
+    ) -> None:
         self.path = path
+        self.journal = journal
+        self.compact_operations = compact_operations
+        self.packed_path = packed_path
         self._lock = threading.RLock()
-        self._data = self._load()
-        self._saved_snapshot = dict(self._data)
+        self._codec = CompactStrings()
+        self._data: dict[Packed, Packed] = {}
+        self._keys_by_public_id: dict[Packed, tuple[Packed, ...]] | None = None
+        self._packed_fresh = self._load_packed()
+        if not self._packed_fresh:
+            for key, value in self._load().items():
+                self._store(key, value)
+        # Changed keys since the last checkpoint; None marks a removal.
+        self._pending: dict[str, str | None] = {}
+        self._journal_operations = 0
+        self._journal_size = 0
+        self._replay_journal()
+
+    @classmethod
+    def from_settings(
+        cls, settings: CrawlerSettings, paths: ProjectPaths
+    ) -> CacheRepository:
+        return cls(
+            paths.cache_file,
+            journal=settings.cache_journal,
+            compact_operations=settings.cache_journal_compact_operations,
+            packed_path=(
+                paths.cache_packed_file if settings.cache_packed_snapshot else None
+            ),
+        )
+
+    @property
+    def journal_path(self) -> Path:
+        return cache_journal_path(self.path)
 
     def _load(self) -> dict[str, str]:
         if not self.path.exists():
@@ -34,65 +197,250 @@ class CacheRepository:
             )
         return raw
 
+    def _json_sha256(self) -> bytes:
+        try:
+            return hashlib.sha256(self.path.read_bytes()).digest()
+        except FileNotFoundError:
+            return b""
+
+    def _load_packed(self) -> bool:
+        if self.packed_path is None:
+            return False
+        try:
+            content = self.packed_path.read_bytes()
+        except FileNotFoundError:
+            return False
+        except OSError as exc:
+            logger.warning("Ignoring unreadable %s: %s", self.packed_path, exc)
+            return False
+        header, payload = (
+            content[:_PACKED_HEADER_LENGTH],
+            content[_PACKED_HEADER_LENGTH:],
+        )
+        expected = PACKED_MAGIC + self._json_sha256().ljust(32, b"\0")
+        if (
+            header[: len(expected)] != expected
+            or header[len(expected) :] != hashlib.sha256(payload).digest()
+        ):
+            return False
+        try:
+            affixes, data, index = marshal.loads(payload)
+            codec = CompactStrings([tuple(affix) for affix in affixes])
+        except (EOFError, ValueError, TypeError) as exc:
+            logger.warning("Ignoring invalid %s: %s", self.packed_path, exc)
+            return False
+        self._codec, self._data, self._keys_by_public_id = codec, data, index
+        return True
+
+    def _write_packed(self) -> None:
+        if self.packed_path is None:
+            return
+        payload = marshal.dumps(
+            (self._codec.affixes, self._data, self._public_id_index())
+        )
+        atomic_write_bytes(
+            self.packed_path,
+            PACKED_MAGIC
+            + self._json_sha256().ljust(32, b"\0")
+            + hashlib.sha256(payload).digest()
+            + payload,
+        )
+        self._packed_fresh = True
+
+    def _replay_journal(self) -> None:
+        try:
+            content = self.journal_path.read_bytes()
+        except FileNotFoundError:
+            return
+        except OSError as exc:
+            raise DataContractError(
+                f"Unreadable cache journal {self.journal_path}: {exc}"
+            ) from exc
+        complete, _newline, torn = content.rpartition(b"\n")
+        if torn:
+            # Only the final append can be cut short by a crash.
+            logger.warning(
+                "Ignoring %s torn bytes at the end of %s",
+                len(torn),
+                self.journal_path,
+            )
+        for number, line in enumerate(complete.splitlines(), start=1):
+            try:
+                operation = json.loads(line)
+                self._apply(operation)
+            except (ValueError, TypeError) as exc:
+                raise DataContractError(
+                    f"Invalid cache journal {self.journal_path} line {number}: {exc}"
+                ) from exc
+            self._journal_operations += 1
+        self._journal_size = len(content) - len(torn)
+
+    def _apply(self, operation: object) -> None:
+        match operation:
+            case ["set", str(key), str(value)]:
+                self._store(key, value)
+            case ["remove", str(key)]:
+                self._discard(self._codec.pack(key, add=False))
+            case _:
+                raise TypeError(f"unknown operation {operation!r}")
+
+    def _store(self, key: str, value: str) -> None:
+        packed_key = self._codec.pack(key)
+        previous = self._data.get(packed_key)
+        if previous is not None:
+            self._unindex(packed_key, previous)
+        self._data[packed_key] = self._codec.pack(value)
+        if self._keys_by_public_id is not None:
+            self._index(self._keys_by_public_id, packed_key, value)
+
+    def _index(
+        self,
+        index: dict[Packed, tuple[Packed, ...]],
+        packed_key: Packed,
+        value: str,
+    ) -> None:
+        public_id = _public_id(value)
+        if public_id is not None:
+            packed_id = self._codec.pack(public_id)
+            index[packed_id] = (*index.get(packed_id, ()), packed_key)
+
+    def _public_id_index(self) -> dict[Packed, tuple[Packed, ...]]:
+        if self._keys_by_public_id is None:
+            index: dict[Packed, tuple[Packed, ...]] = {}
+            for packed_key, packed_value in self._data.items():
+                self._index(index, packed_key, self._codec.unpack(packed_value))
+            self._keys_by_public_id = index
+        return self._keys_by_public_id
+
+    def _discard(self, packed_key: Packed) -> None:
+        previous = self._data.pop(packed_key, None)
+        if previous is not None:
+            self._unindex(packed_key, previous)
+
+    def _unindex(self, packed_key: Packed, packed_value: Packed) -> None:
+        index = self._keys_by_public_id
+        if index is None:
+            return
+        public_id = _public_id(self._codec.unpack(packed_value))
+        if public_id is None:
+            return
+        packed_id = self._codec.pack(public_id, add=False)
+        keys = index.get(packed_id, ())
+        remaining = tuple(key for key in keys if key != packed_key)
+        if remaining:
+            index[packed_id] = remaining
+        else:
+            index.pop(packed_id, None)
+
     def get(self, key: str) -> str | None:
         with self._lock:
-            return self._data.get(key)
+            value = self._data.get(self._codec.pack(key, add=False))
+            return None if value is None else self._codec.unpack(value)
 
     def set(self, key: str, value: str) -> None:
         with self._lock:
-            self._data[key] = value
+            if self.get(key) == value:
+                return
+            self._store(key, value)
+            self._pending[key] = value
 
     def snapshot(self) -> dict[str, str]:
         with self._lock:
-            return dict(self._data)
-
-    @staticmethod
-    def _validated_managed_public_ids(public_ids: Iterable[str]) -> set[str]:
-        from services.retention import is_managed_public_id
-
-        targets = set(public_ids)
-        invalid = sorted(
-            str(public_id)
-            for public_id in targets
-            if not is_managed_public_id(public_id)
-        )
-        if invalid:
-            raise DataContractError(
-                "Cache invalidation requires exact managed Cloudinary public IDs; "
-                f"invalid={invalid[:5]}"
-            )
-        return targets
+            unpack = self._codec.unpack
+            return {unpack(key): unpack(value) for key, value in self._data.items()}
 
     def urls_with_public_ids(self, public_ids: Iterable[str]) -> set[str]:
         """Return cached URLs that still reference any requested public ID."""
-        from services.retention import cloudinary_public_id_from_url
 
-        targets = self._validated_managed_public_ids(public_ids)
+        targets = validated_managed_public_ids(public_ids)
         with self._lock:
+            index = self._public_id_index()
             return {
-                value
-                for value in self._data.values()
-                if cloudinary_public_id_from_url(value) in targets
+                self._codec.unpack(self._data[key])
+                for public_id in targets
+                for key in index.get(self._codec.pack(public_id, add=False), ())
             }
 
     def remove_urls_with_public_ids(self, public_ids: Iterable[str]) -> int:
-        from services.retention import cloudinary_public_id_from_url
+        """Remove entries for the given assets, including their image metadata."""
+        from services.image_placeholder import metadata_key
 
-        targets = self._validated_managed_public_ids(public_ids)
+        targets = validated_managed_public_ids(public_ids)
+        removed = 0
         with self._lock:
-            keys = [
-                key
-                for key, value in self._data.items()
-                if cloudinary_public_id_from_url(value) in targets
-            ]
-            for key in keys:
-                del self._data[key]
-            return len(keys)
+            index = self._public_id_index()
+            for public_id in targets:
+                packed_id = self._codec.pack(public_id, add=False)
+                for key in index.pop(packed_id, ()):
+                    del self._data[key]
+                    self._pending[self._codec.unpack(key)] = None
+                    removed += 1
+                meta_key = metadata_key(public_id)
+                packed_meta_key = self._codec.pack(meta_key, add=False)
+                if packed_meta_key in self._data:
+                    self._discard(packed_meta_key)
+                    self._pending[meta_key] = None
+                    removed += 1
+            return removed
 
     def save_if_changed(self) -> bool:
+        """Checkpoint changes since the last save.
+
+        Journaled repositories append the changes and fold the journal in
+        once it holds ``compact_operations`` entries; otherwise the JSON
+        snapshot is rewritten. The packed snapshot is left to ``compact``.
+        """
+
         with self._lock:
-            if self._data == self._saved_snapshot:
+            if not self._pending:
                 return False
-            atomic_write_json(self.path, self._data)
-            self._saved_snapshot = dict(self._data)
+            if not self.journal:
+                return self._fold()
+            self._append_journal()
+            if self._journal_operations >= self.compact_operations:
+                self._fold()
             return True
+
+    def _append_journal(self) -> None:
+        payload = b"".join(
+            json.dumps(
+                ["set", key, value] if value is not None else ["remove", key],
+                ensure_ascii=False,
+            ).encode("utf-8")
+            + b"\n"
+            for key, value in self._pending.items()
+        )
+        with self.journal_path.open("ab") as handle:
+            if handle.tell() != self._journal_size:
+                # Drop a torn tail left by a crash before appending after it.
+                handle.truncate(self._journal_size)
+            handle.write(payload)
+            handle.flush()
+            os.fsync(handle.fileno())
+        self._journal_size += len(payload)
+        self._journal_operations += len(self._pending)
+        self._pending.clear()
+
+    def compact(self) -> bool:
+        """Fold pending changes and the journal into the canonical snapshot.
+
+        This is the close-time save: it also refreshes a stale or missing
+        packed snapshot, even when the JSON itself is already current.
+        """
+
+        with self._lock:
+            folded = self._fold()
+            if not self._packed_fresh:
+                self._write_packed()
+            return folded
+
+    def _fold(self) -> bool:
+        if not self._pending and not self._journal_size:
+            return False
+        atomic_write_json(self.path, self.snapshot())
+        self._pending.clear()
+        self.journal_path.unlink(missing_ok=True)
+        self._journal_operations = 0
+        self._journal_size = 0
+        self._packed_fresh = False
+        return True
@@ -0,0 +1,28 @@
+"""Width-bounded delivery variants of stored Cloudinary cover URLs.
+
+Stored URLs keep the ``f_auto,q_auto:best`` original. Variants chain a
+``c_limit,w_<n>`` step in front of it, so Cloudinary never upscales and the
+format and quality choices still apply. The grid is rendered by Alpine, so
+``static/js/cloudinary.js`` builds the variant URLs in the browser; the
+build only hands it the widths below through ``#app-config``.
+"""
+
+from __future__ import annotations
+
+CLOUDINARY_HOST = "res.cloudinary.com"
+# Card boxes are 320px tall and covers are roughly 2:3 portraits, so a card
+# shows about 215-240 CSS pixels of width; the ladder covers 1x to 3x screens.
+CARD_IMAGE_WIDTHS = (160, 240, 320, 480, 720)
+CARD_IMAGE_SIZES = "240px"
+# Share-list thumbnails are 50px squares; 100px keeps them sharp at 2x.
+THUMBNAIL_WIDTH = 100
+
+
+def responsive_image_config() -> dict[str, object]:
+    """Variant settings the frontend reads from ``#app-config``."""
+
+    return {
+        "cardWidths": list(CARD_IMAGE_WIDTHS),
+        "cardSizes": CARD_IMAGE_SIZES,
+        "thumbnailWidth": THUMBNAIL_WIDTH,
+    }
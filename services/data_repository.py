@@ -11,7 +11,7 @@ from pathlib import Path
 
 from pydantic import ValidationError
 
-from models import TAIPEI_TZ, Anime, DataQuality, QuarterDataset
+from models import SCHEMA_VERSION, TAIPEI_TZ, Anime, DataQuality, QuarterDataset
 from services.atomic_io import atomic_write_json
 from services.errors import DataContractError
 
@@ -168,6 +168,7 @@ class DataRepository:
 
         try:
             dataset = QuarterDataset(
+                schema_version=SCHEMA_VERSION,
                 anime_list=validated_records,
                 generated_at=generated_at or datetime.now(TAIPEI_TZ),
                 source_url=source_url,
@@ -177,7 +178,8 @@ class DataRepository:
             raise DataContractError(
                 f"Quarter dataset does not satisfy the data contract: {exc}"
             ) from exc
-        atomic_write_json(path, dataset.model_dump(mode="json"))
+        # Records without image metadata keep the version 1 record shape.
+        atomic_write_json(path, dataset.model_dump(mode="json", exclude_none=True))
         return WriteResult(
             path=path,
             changed=True,
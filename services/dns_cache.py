@@ -0,0 +1,140 @@
+"""Validated DNS resolution for image hosts, cached for a bounded time."""
+
+from __future__ import annotations
+
+import ipaddress
+import socket
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from services.errors import ImageStoreError
+from services.settings import CrawlerSettings
+from services.single_flight import SingleFlight
+
+
+def check_resolved_addresses(host: str, addresses: Sequence[str]) -> None:
+    """Reject a host unless every address it resolved to is public."""
+
+    if not addresses:
+        raise ImageStoreError(f"Image host did not resolve: {host}")
+    for address in addresses:
+        ip = ipaddress.ip_address(address)
+        if (
+            ip.is_private
+            or ip.is_loopback
+            or ip.is_link_local
+            or ip.is_multicast
+            or ip.is_reserved
+            or ip.is_unspecified
+        ):
+            raise ImageStoreError(f"Image host resolved to a blocked address: {ip}")
+
+
+def resolve_host(host: str) -> tuple[str, ...]:
+    """Return the addresses getaddrinfo reports for ``host``, in its order."""
+
+    addresses = socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
+    return tuple(dict.fromkeys(str(address[4][0]) for address in addresses))
+
+
+@dataclass(frozen=True)
+class DnsCacheStats:
+    hits: int
+    misses: int
+    negative_hits: int
+
+
+@dataclass(frozen=True)
+class _Entry:
+    addresses: tuple[str, ...]
+    expires_at: float
+
+
+class DnsCache:
+    """Thread-safe host resolution cache with TTL and negative caching.
+
+    Successful lookups are kept for ``ttl_seconds`` and failed ones for
+    ``negative_ttl_seconds``; zero disables either. Concurrent misses for one
+    host share a single lookup. Every answer, cached or fresh, is checked
+    against the blocked address ranges before it is returned.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 300.0,
+        negative_ttl_seconds: float = 30.0,
+        resolver: Callable[[str], Sequence[str]] = resolve_host,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._resolver = resolver
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+        self._lookups: SingleFlight[tuple[str, ...]] = SingleFlight()
+        self._hits = 0
+        self._misses = 0
+        self._negative_hits = 0
+
+    @classmethod
+    def from_settings(cls, settings: CrawlerSettings) -> DnsCache:
+        return cls(
+            ttl_seconds=settings.dns_cache_ttl_seconds,
+            negative_ttl_seconds=settings.dns_negative_ttl_seconds,
+        )
+
+    def stats(self) -> DnsCacheStats:
+        with self._lock:
+            return DnsCacheStats(self._hits, self._misses, self._negative_hits)
+
+    def resolve(self, host: str) -> tuple[str, ...]:
+        """Return the validated public addresses of ``host``.
+
+        Raises ImageStoreError when the host does not resolve or any of its
+        addresses is blocked.
+        """
+
+        host = host.lower()
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None and entry.expires_at <= self._clock():
+                del self._entries[host]
+                entry = None
+            if entry is not None:
+                if entry.addresses:
+                    self._hits += 1
+                else:
+                    self._negative_hits += 1
+        if entry is None:
+            addresses = self._lookups.do(host, lambda: self._lookup(host))
+        elif not entry.addresses:
+            raise ImageStoreError(f"Unable to resolve image host: {host}")
+        else:
+            addresses = entry.addresses
+        check_resolved_addresses(host, addresses)
+        return addresses
+
+    def _lookup(self, host: str) -> tuple[str, ...]:
+        with self._lock:
+            self._misses += 1
+        try:
+            addresses = tuple(self._resolver(host))
+        except OSError as exc:
+            self._remember(host, (), self.negative_ttl_seconds)
+            raise ImageStoreError(f"Unable to resolve image host: {host}") from exc
+        if addresses:
+            self._remember(host, addresses, self.ttl_seconds)
+        return addresses
+
+    def _remember(self, host: str, addresses: tuple[str, ...], ttl: float) -> None:
+        if ttl > 0:
+            with self._lock:
+                self._entries[host] = _Entry(addresses, self._clock() + ttl)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
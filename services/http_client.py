@@ -2,19 +2,27 @@
 
 from __future__ import annotations
 
-import ipaddress
+import hashlib
 import socket
 import threading
-from dataclasses import dataclass
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Any
 from urllib.parse import urljoin, urlparse
 
 import requests
 from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util import Url
 from urllib3.util.retry import Retry
 
 from config import Config
+from services.dns_cache import DnsCache
 from services.errors import ImageStoreError, SourceFetchError, SourceNotFoundError
 from services.settings import CrawlerSettings
+from services.source_state import SourceFingerprint, SourceStateRepository
 
 RETRY_STATUSES = (429, 500, 502, 503, 504)
 ALLOWED_IMAGE_TYPES = {
@@ -26,7 +34,70 @@ ALLOWED_IMAGE_TYPES = {
 }
 
 
-def create_retry_session(settings: CrawlerSettings) -> requests.Session:
+class _PinnedConnectionMixin:
+    """Dial the addresses the DNS cache validated instead of resolving again.
+
+    urllib3 derives ``host`` (used for SNI and certificate checks) from
+    ``_dns_host``, so each address replaces it only while the socket opens.
+    Addresses are tried in resolver order, like ``socket.create_connection``.
+    A connection to a proxy is left alone: the proxy resolves the target.
+    """
+
+    dns: DnsCache
+    _dns_host: str
+    host: str
+    proxy: Url | None
+
+    def _new_conn(self) -> socket.socket:
+        if self.proxy is not None:
+            return super()._new_conn()  # type: ignore[misc]
+        host_name = self._dns_host
+        addresses = self.dns.resolve(self.host)
+        try:
+            for address in addresses[:-1]:
+                self._dns_host = address
+                try:
+                    return super()._new_conn()  # type: ignore[misc]
+                except ConnectTimeoutError:  # Also NewConnectionError.
+                    continue
+            self._dns_host = addresses[-1]
+            return super()._new_conn()  # type: ignore[misc]
+        finally:
+            self._dns_host = host_name
+
+
+class PinnedAddressAdapter(HTTPAdapter):
+    """HTTPAdapter whose new connections go to addresses from one DnsCache."""
+
+    __attrs__ = [*HTTPAdapter.__attrs__, "dns"]
+
+    def __init__(self, dns: DnsCache, **kwargs: Any) -> None:
+        self.dns = dns
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        pools = {"http": HTTPConnectionPool, "https": HTTPSConnectionPool}
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: type(
+                f"Pinned{pool.__name__}",
+                (pool,),
+                {
+                    "ConnectionCls": type(
+                        f"Pinned{pool.ConnectionCls.__name__}",
+                        (_PinnedConnectionMixin, pool.ConnectionCls),
+                        {"dns": self.dns},
+                    )
+                },
+            )
+            for scheme, pool in pools.items()
+        }
+
+
+def create_retry_session(
+    settings: CrawlerSettings,
+    dns: DnsCache | None = None,
+) -> requests.Session:
     retry = Retry(
         total=3,
         connect=3,
@@ -38,10 +109,15 @@ def create_retry_session(settings: CrawlerSettings) -> requests.Session:
         respect_retry_after_header=True,
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(
-        pool_connections=settings.max_workers,
-        pool_maxsize=settings.max_workers,
-        max_retries=retry,
+    pool_options: dict[str, Any] = {
+        "pool_connections": settings.max_workers,
+        "pool_maxsize": settings.max_workers,
+        "max_retries": retry,
+    }
+    adapter = (
+        HTTPAdapter(**pool_options)
+        if dns is None
+        else PinnedAddressAdapter(dns, **pool_options)
     )
     session = requests.Session()
     session.headers.update(
@@ -55,6 +131,158 @@ def create_retry_session(settings: CrawlerSettings) -> requests.Session:
     return session
 
 
+@dataclass(frozen=True)
+class SessionPoolStats:
+    sessions_created: int
+    leases: int
+    connections_opened: int
+    requests_sent: int
+
+    @property
+    def reused_requests(self) -> int:
+        """Requests that were sent over an already open connection."""
+        return max(self.requests_sent - self.connections_opened, 0)
+
+
+class SessionPool:
+    """Leases long-lived retry sessions to worker threads for a whole run.
+
+    A session is used by one thread at a time and returned afterwards, so its
+    keep-alive connections survive across quarters instead of being rebuilt by
+    every new worker thread. Call close() once when the run is finished.
+    """
+
+    def __init__(
+        self,
+        settings: CrawlerSettings,
+        factory: Callable[[], requests.Session] | None = None,
+    ) -> None:
+        self._factory = factory or (lambda: create_retry_session(settings))
+        self._lock = threading.Lock()
+        self._idle: list[requests.Session] = []
+        self._sessions: list[requests.Session] = []
+        self._leases = 0
+        self._closed = False
+
+    @contextmanager
+    def lease(self) -> Iterator[requests.Session]:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Session pool is closed")
+            self._leases += 1
+            session = self._idle.pop() if self._idle else None
+        if session is None:
+            session = self._factory()
+            with self._lock:
+                self._sessions.append(session)
+        try:
+            yield session
+        finally:
+            with self._lock:
+                if self._closed:
+                    session.close()
+                else:
+                    self._idle.append(session)
+
+    def stats(self) -> SessionPoolStats:
+        connections_opened = 0
+        requests_sent = 0
+        with self._lock:
+            sessions = list(self._sessions)
+            leases = self._leases
+        adapters = {
+            id(adapter): adapter
+            for session in sessions
+            for adapter in getattr(session, "adapters", {}).values()
+        }
+        for adapter in adapters.values():
+            pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+            if pools is None:
+                continue
+            # RecentlyUsedContainer refuses plain iteration; keys() is a copy.
+            for key in pools.keys():  # noqa: SIM118
+                pool = pools.get(key)
+                connections_opened += getattr(pool, "num_connections", 0)
+                requests_sent += getattr(pool, "num_requests", 0)
+        return SessionPoolStats(
+            sessions_created=len(sessions),
+            leases=leases,
+            connections_opened=connections_opened,
+            requests_sent=requests_sent,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for session in idle:
+            session.close()
+
+
+class SourceStream:
+    """A 200 quarter response whose body is read incrementally.
+
+    ``fingerprint()`` is available once ``iter_bytes()`` is exhausted. The
+    body digest covers the raw bytes, which equals the buffered digest for
+    the UTF-8 pages the source serves.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, url: str, response: requests.Response) -> None:
+        self.url = url
+        self.response = response
+        self._body_sha256 = hashlib.sha256()
+        self._has_content = False
+        self._complete = False
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        try:
+            for chunk in self.response.iter_content(chunk_size=self.chunk_size):
+                self._body_sha256.update(chunk)
+                self._has_content = self._has_content or bool(chunk.strip())
+                yield chunk
+        except requests.RequestException as exc:
+            raise SourceFetchError(f"Unable to read {self.url}: {exc}") from exc
+        if not self._has_content:
+            raise SourceFetchError(f"Source returned an empty document: {self.url}")
+        self._complete = True
+
+    def fingerprint(self, *, card_set_sha256: str | None = None) -> SourceFingerprint:
+        if not self._complete:
+            raise RuntimeError("Source stream has not been read to the end")
+        return SourceFingerprint(
+            body_sha256=self._body_sha256.hexdigest(),
+            etag=self.response.headers.get("ETag"),
+            last_modified=self.response.headers.get("Last-Modified"),
+            card_set_sha256=card_set_sha256,
+        )
+
+    def close(self) -> None:
+        self.response.close()
+
+
+@dataclass(frozen=True)
+class SourceDocument:
+    """One quarter page, or the proof that it matches the last crawl.
+
+    ``html`` is None after an HTTP 304 or when the body is left in
+    ``stream``. ``unchanged`` is also set when a full 200 response has the
+    same body digest as the recorded fingerprint. ``known`` is the recorded
+    fingerprint that was eligible for reuse.
+    """
+
+    url: str
+    html: str | None
+    fingerprint: SourceFingerprint | None
+    unchanged: bool
+    known: SourceFingerprint | None = None
+    stream: SourceStream | None = None
+
+
 class SourceClient:
     """Fetches one seasonal source page and surfaces typed failures."""
 
@@ -62,9 +290,18 @@ class SourceClient:
         self,
         settings: CrawlerSettings,
         session: requests.Session | None = None,
+        state: SourceStateRepository | None = None,
     ) -> None:
         self.settings = settings
         self.session = session or create_retry_session(settings)
+        self.state = state
+
+    def close(self) -> None:
+        try:
+            if self.state is not None:
+                self.state.save_if_changed()
+        finally:
+            self.session.close()
 
     def season_url(self, year: str, season: str) -> str:
         if season not in Config.SEASON_TO_MONTH:
@@ -75,83 +312,287 @@ class SourceClient:
         return f"{self.settings.source_base_url}/{year}{month:02d}/"
 
     def fetch_quarter_html(self, year: str, season: str) -> tuple[str, str]:
-        url = self.season_url(year, season)
+        document = self.fetch_quarter_document(year, season)
+        if document.html is None:
+            raise SourceFetchError(f"Source returned no document: {document.url}")
+        return document.url, document.html
+
+    def fetch_quarter_document(
+        self,
+        year: str,
+        season: str,
+        *,
+        current_data_sha256: str | None = None,
+        stream: bool = False,
+    ) -> SourceDocument:
+        """Fetch a quarter, revalidating only when its data file is unchanged.
+
+        Stored validators are sent only when ``current_data_sha256`` matches the
+        data file recorded with them; otherwise the page is fetched in full.
+        With ``stream`` the body of a page that has no usable fingerprint is
+        left unread in ``SourceDocument.stream``; pages that could still match
+        the last crawl are buffered so they can be compared whole.
+        """
+
+        url, known, headers = self.prepare_request(year, season, current_data_sha256)
+        streaming = stream and known is None
         try:
             response = self.session.get(
                 url,
                 timeout=self.settings.request_timeout_seconds,
+                headers=headers or None,
+                stream=streaming,
             )
         except requests.RequestException as exc:
             raise SourceFetchError(f"Unable to fetch {url}: {exc}") from exc
 
-        if response.status_code == 404:
-            raise SourceNotFoundError(f"Source season does not exist yet: {url}")
-        if not response.ok:
-            raise SourceFetchError(
-                f"Source returned HTTP {response.status_code}: {url}"
+        if streaming and response.ok and response.status_code != 304:
+            return SourceDocument(
+                url=url,
+                html=None,
+                fingerprint=None,
+                unchanged=False,
+                stream=SourceStream(url, response),
             )
+        has_body = response.ok and response.status_code != 304
+        try:
+            if has_body:
+                response.encoding = "utf-8"
+            return self.document_from_response(
+                url,
+                known,
+                headers,
+                status_code=response.status_code,
+                text=response.text if has_body else "",
+                response_headers=response.headers,
+            )
+        finally:
+            if not has_body:
+                response.close()
 
-        response.encoding = "utf-8"
-        if not response.text.strip():
+    def prepare_request(
+        self,
+        year: str,
+        season: str,
+        current_data_sha256: str | None,
+    ) -> tuple[str, SourceFingerprint | None, dict[str, str]]:
+        """Return the quarter URL, its reusable fingerprint, and request headers."""
+
+        url = self.season_url(year, season)
+        known = self._known_fingerprint(url, current_data_sha256)
+        headers: dict[str, str] = {}
+        if known and known.etag:
+            headers["If-None-Match"] = known.etag
+        if known and known.last_modified:
+            headers["If-Modified-Since"] = known.last_modified
+        return url, known, headers
+
+    @staticmethod
+    def document_from_response(
+        url: str,
+        known: SourceFingerprint | None,
+        headers: Mapping[str, str],
+        *,
+        status_code: int,
+        text: str,
+        response_headers: Mapping[str, str],
+    ) -> SourceDocument:
+        """Turn one buffered quarter response into a document or typed error."""
+
+        if status_code == 304:
+            if not headers or known is None:
+                raise SourceFetchError(
+                    f"Source returned HTTP 304 to an unconditional request: {url}"
+                )
+            return SourceDocument(
+                url=url,
+                html=None,
+                fingerprint=known,
+                unchanged=True,
+                known=known,
+            )
+        if status_code == 404:
+            raise SourceNotFoundError(f"Source season does not exist yet: {url}")
+        if not 200 <= status_code < 400:
+            raise SourceFetchError(f"Source returned HTTP {status_code}: {url}")
+
+        if not text.strip():
             raise SourceFetchError(f"Source returned an empty document: {url}")
-        return url, response.text
+        fingerprint = SourceFingerprint(
+            body_sha256=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            etag=response_headers.get("ETag"),
+            last_modified=response_headers.get("Last-Modified"),
+        )
+        return SourceDocument(
+            url=url,
+            html=text,
+            fingerprint=fingerprint,
+            unchanged=(
+                known is not None and known.body_sha256 == fingerprint.body_sha256
+            ),
+            known=known,
+        )
+
+    def _known_fingerprint(
+        self,
+        url: str,
+        current_data_sha256: str | None,
+    ) -> SourceFingerprint | None:
+        if self.state is None or current_data_sha256 is None:
+            return None
+        known = self.state.get(url)
+        if known is None or known.data_sha256 != current_data_sha256:
+            return None
+        return known
+
+    def remember(
+        self,
+        url: str,
+        fingerprint: SourceFingerprint,
+        *,
+        data_sha256: str,
+    ) -> None:
+        """Record a fingerprint after its quarter data was written successfully."""
+
+        if self.state is not None:
+            self.state.record(url, replace(fingerprint, data_sha256=data_sha256))
 
 
 @dataclass(frozen=True)
 class DownloadedImage:
-    content: bytes
+    """Downloaded image bytes plus the digests computed while they streamed in.
+
+    ``content`` may be a memoryview over the download buffer. The digests are
+    optional so callers that fetched the bytes some other way can leave them
+    to the image store.
+    """
+
+    content: bytes | memoryview
     content_type: str
     final_url: str
+    sha256: str | None = None
+    md5: str | None = None
+
+
+class ImageBuffer:
+    """Collect an image body in one buffer and hash it chunk by chunk.
+
+    The buffer is preallocated from Content-Length when the server sends one,
+    so each byte is written once; without it the buffer grows as chunks
+    arrive. ``finish`` hands the bytes out as a memoryview, not a copy.
+    """
+
+    def __init__(self, max_bytes: int, expected_size: int | None = None) -> None:
+        self.max_bytes = max_bytes
+        self._data = bytearray(min(expected_size or 0, max_bytes))
+        self._size = 0
+        self._sha256 = hashlib.sha256()
+        self._md5 = hashlib.md5(usedforsecurity=False)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def append(self, chunk: bytes) -> None:
+        end = self._size + len(chunk)
+        if end > self.max_bytes:
+            raise ImageStoreError("Image exceeds the configured size limit")
+        if end <= len(self._data):
+            self._data[self._size : end] = chunk
+        else:
+            del self._data[self._size :]
+            self._data += chunk
+        self._size = end
+        self._sha256.update(chunk)
+        self._md5.update(chunk)
+
+    def finish(self, content_type: str, final_url: str) -> DownloadedImage:
+        # A body shorter than its Content-Length leaves unused capacity.
+        del self._data[self._size :]
+        return DownloadedImage(
+            content=memoryview(self._data),
+            content_type=content_type,
+            final_url=final_url,
+            sha256=self._sha256.hexdigest(),
+            md5=self._md5.hexdigest(),
+        )
+
+
+def check_image_url(url: str, allowed_hosts: Sequence[str]) -> str:
+    """Reject image URLs outside HTTPS on approved hosts; return the host."""
+
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if parsed.scheme != "https" or not host:
+        raise ImageStoreError("Image URL must use HTTPS")
+    if parsed.username or parsed.password:
+        raise ImageStoreError("Image URL may not contain credentials")
+    if parsed.port not in (None, 443):
+        raise ImageStoreError("Image URL may only use the default HTTPS port")
+    if host not in allowed_hosts:
+        raise ImageStoreError(f"Image host is not allowed: {host}")
+    return host
+
+
+def checked_image_headers(headers: Mapping[str, str], max_bytes: int) -> str:
+    """Validate image response headers and return the bare Content-Type.
+
+    A malformed Content-Length raises ValueError for the caller to wrap.
+    """
+
+    content_type = headers.get("Content-Type", "")
+    content_type = content_type.split(";", 1)[0].strip().lower()
+    if content_type not in ALLOWED_IMAGE_TYPES:
+        raise ImageStoreError(
+            f"Image response has an unsupported Content-Type: {content_type}"
+        )
+    content_length = headers.get("Content-Length")
+    if content_length and int(content_length) > max_bytes:
+        raise ImageStoreError("Image exceeds the configured size limit")
+    return content_type
 
 
 class SafeImageDownloader:
-    """Downloads only bounded raster images from approved public hosts."""
+    """Downloads only bounded raster images from approved public hosts.
+
+    Host checks and connections share one DnsCache, so each request connects
+    to an address that passed the blocked-range check.
+    """
 
-    def __init__(self, settings: CrawlerSettings) -> None:
+    def __init__(
+        self,
+        settings: CrawlerSettings,
+        sessions: SessionPool | None = None,
+        dns: DnsCache | None = None,
+    ) -> None:
         self.settings = settings
-        self._thread_local = threading.local()
+        self.dns = dns or DnsCache.from_settings(settings)
+        self.sessions = sessions or SessionPool(
+            settings,
+            factory=lambda: create_retry_session(settings, self.dns),
+        )
 
-    def _session(self) -> requests.Session:
-        session = getattr(self._thread_local, "session", None)
-        if session is None:
-            session = create_retry_session(self.settings)
-            self._thread_local.session = session
-        return session
+    def close(self) -> None:
+        self.sessions.close()
 
     def _validate_url(self, url: str) -> None:
-        parsed = urlparse(url)
-        host = (parsed.hostname or "").lower()
-        if parsed.scheme != "https" or not host:
-            raise ImageStoreError("Image URL must use HTTPS")
-        if parsed.username or parsed.password:
-            raise ImageStoreError("Image URL may not contain credentials")
-        if parsed.port not in (None, 443):
-            raise ImageStoreError("Image URL may only use the default HTTPS port")
-        if host not in self.settings.image_allowed_hosts:
-            raise ImageStoreError(f"Image host is not allowed: {host}")
-
-        try:
-            addresses = socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
-        except OSError as exc:
-            raise ImageStoreError(f"Unable to resolve image host: {host}") from exc
-
-        if not addresses:
-            raise ImageStoreError(f"Image host did not resolve: {host}")
-        for address in addresses:
-            ip = ipaddress.ip_address(address[4][0])
-            if (
-                ip.is_private
-                or ip.is_loopback
-                or ip.is_link_local
-                or ip.is_multicast
-                or ip.is_reserved
-                or ip.is_unspecified
-            ):
-                raise ImageStoreError(f"Image host resolved to a blocked address: {ip}")
+        self.dns.resolve(check_image_url(url, self.settings.image_allowed_hosts))
 
     def download(self, url: str, *, max_redirects: int = 3) -> DownloadedImage:
+        with self.sessions.lease() as session:
+            return self._download(session, url, max_redirects=max_redirects)
+
+    def _download(
+        self,
+        session: requests.Session,
+        url: str,
+        *,
+        max_redirects: int,
+    ) -> DownloadedImage:
         current_url = url
-        session = self._session()
 
         for redirect_number in range(max_redirects + 1):
             self._validate_url(current_url)
@@ -182,43 +623,26 @@ class SafeImageDownloader:
 
             try:
                 response.raise_for_status()
-                content_type = response.headers.get("Content-Type", "")
-                content_type = content_type.split(";", 1)[0].strip().lower()
-                if content_type not in ALLOWED_IMAGE_TYPES:
-                    raise ImageStoreError(
-                        f"Image response has an unsupported Content-Type: {content_type}"
-                    )
+                content_type = checked_image_headers(
+                    response.headers,
+                    self.settings.image_max_bytes,
+                )
 
                 content_length = response.headers.get("Content-Length")
-                if (
-                    content_length
-                    and int(content_length) > self.settings.image_max_bytes
-                ):
-                    raise ImageStoreError("Image exceeds the configured size limit")
-
-                chunks: list[bytes] = []
-                total = 0
+                buffer = ImageBuffer(
+                    self.settings.image_max_bytes,
+                    int(content_length) if content_length else None,
+                )
                 for chunk in response.iter_content(chunk_size=64 * 1024):
-                    if not chunk:
-                        continue
-                    total += len(chunk)
-                    if total > self.settings.image_max_bytes:
-                        raise ImageStoreError("Image exceeds the configured size limit")
-                    chunks.append(chunk)
+                    if chunk:
+                        buffer.append(chunk)
             except (requests.RequestException, ValueError) as exc:
-                if isinstance(exc, ImageStoreError):
-                    raise
                 raise ImageStoreError(f"Invalid image response: {exc}") from exc
             finally:
                 response.close()
 
-            content = b"".join(chunks)
-            if not content:
+            if not buffer:
                 raise ImageStoreError("Image response was empty")
-            return DownloadedImage(
-                content=content,
-                content_type=content_type,
-                final_url=current_url,
-            )
+            return buffer.finish(content_type, current_url)
 
         raise ImageStoreError("Image redirect handling failed")
@@ -0,0 +1,62 @@
+"""Optional pre-upload downscale and re-encode of cover images."""
+
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps
+
+from services.errors import ImageStoreError
+
+
+@dataclass(frozen=True)
+class NormalizeProfile:
+    """Longest-edge cap plus target format and quality for uploaded covers."""
+
+    max_edge: int
+    format: str
+    quality: int
+
+    @property
+    def key(self) -> str:
+        """Stable tag that joins the original digest in content-address keys."""
+        return f"{self.format}-q{self.quality}-e{self.max_edge}"
+
+
+def normalize_image(content: bytes | memoryview, profile: NormalizeProfile) -> bytes:
+    """Return ``content`` downscaled to the profile's edge and re-encoded.
+
+    Images are never enlarged. Animated images and re-encodes that would not
+    shrink an already small enough image are returned unchanged.
+    """
+
+    original = bytes(content)
+    try:
+        with Image.open(io.BytesIO(original)) as image:
+            if getattr(image, "is_animated", False):
+                return original
+            resized = max(image.size) > profile.max_edge
+            converted = ImageOps.exif_transpose(image)
+            converted.thumbnail(
+                (profile.max_edge, profile.max_edge),
+                Image.Resampling.LANCZOS,
+            )
+            has_alpha = converted.mode in {"RGBA", "LA", "PA"} or (
+                converted.mode == "P" and "transparency" in converted.info
+            )
+            if profile.format == "jpeg" or not has_alpha:
+                converted = converted.convert("RGB")
+            else:
+                converted = converted.convert("RGBA")
+            buffer = io.BytesIO()
+            converted.save(
+                buffer, format=profile.format.upper(), quality=profile.quality
+            )
+    except (Image.DecompressionBombError, OSError, SyntaxError, ValueError) as exc:
+        raise ImageStoreError(f"Unable to normalize image: {exc}") from exc
+
+    encoded = buffer.getvalue()
+    if not resized and len(encoded) >= len(original):
+        return original
+    return encoded
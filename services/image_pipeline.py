@@ -0,0 +1,244 @@
+"""Download, verify, and upload stages joined by bounded queues.
+
+Each stage has its own worker threads, so a slow Cloudinary upload no longer
+holds a thread that could be downloading the next cover. A full queue blocks
+the stage that feeds it, and a byte budget caps the image bytes held between
+the start of a download and the end of its upload.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+_Downloaded = TypeVar("_Downloaded")
+_Verified = TypeVar("_Verified")
+
+
+class ByteBudget:
+    """Counting semaphore over bytes with a high-water mark.
+
+    A request larger than the whole budget is clamped to it, so one oversized
+    reservation waits for an empty budget instead of deadlocking.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._in_use = 0
+        self._peak = 0
+        self._condition = threading.Condition()
+
+    @property
+    def peak(self) -> int:
+        with self._condition:
+            return self._peak
+
+    def acquire(self, size: int) -> int:
+        """Block until ``size`` bytes fit and return the amount reserved."""
+
+        size = min(size, self.capacity)
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_use + size <= self.capacity)
+            self._in_use += size
+            self._peak = max(self._peak, self._in_use)
+        return size
+
+    def try_acquire(self, size: int) -> int:
+        """Reserve ``size`` bytes only if they fit now; return 0 otherwise."""
+
+        size = min(size, self.capacity)
+        with self._condition:
+            if self._in_use + size > self.capacity:
+                return 0
+            self._in_use += size
+            self._peak = max(self._peak, self._in_use)
+        return size
+
+    def release(self, size: int) -> None:
+        if size <= 0:
+            return
+        with self._condition:
+            self._in_use -= size
+            self._condition.notify_all()
+
+
+@dataclass(frozen=True)
+class ImagePipelineStats:
+    downloads: int
+    uploads: int
+    peak_inflight_bytes: int
+
+
+class _Job(Generic[_Downloaded, _Verified]):
+    def __init__(self, source_url: str, anime_name: str) -> None:
+        self.source_url = source_url
+        self.anime_name = anime_name
+        self.future: Future[str] = Future()
+        self.reserved = 0
+        self.downloaded: _Downloaded | None = None
+        self.verified: _Verified | None = None
+
+
+class ImagePipeline(Generic[_Downloaded, _Verified]):
+    """Run ``download`` → ``verify`` → ``upload`` on separate worker pools.
+
+    ``submit`` returns a Future for the stored URL. ``size`` reports how many
+    bytes a download holds; each download reserves ``max_item_bytes`` up
+    front, keeps only its real size once it finishes, and releases it when
+    its upload completes or any stage fails. Workers start on first use.
+    """
+
+    def __init__(
+        self,
+        *,
+        download: Callable[[str], _Downloaded],
+        verify: Callable[[_Downloaded], _Verified],
+        upload: Callable[[str, str, _Downloaded, _Verified], str],
+        size: Callable[[_Downloaded], int],
+        download_workers: int,
+        verify_workers: int,
+        upload_workers: int,
+        max_inflight_bytes: int,
+        max_item_bytes: int,
+    ) -> None:
+        self._download = download
+        self._verify = verify
+        self._upload = upload
+        self._size = size
+        self.max_item_bytes = max_item_bytes
+        self.budget = ByteBudget(max_inflight_bytes)
+        self._workers = (download_workers, verify_workers, upload_workers)
+        # Also taken by uploads of bytes fetched outside the download stage.
+        self._upload_slots = threading.BoundedSemaphore(upload_workers)
+        # Each queue holds at most two jobs per worker that consumes it.
+        self._queues: tuple[queue.Queue[_Job | None], ...] = tuple(
+            queue.Queue(maxsize=2 * workers) for workers in self._workers
+        )
+        self._threads: list[list[threading.Thread]] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._downloads = 0
+        self._uploads = 0
+
+    def stats(self) -> ImagePipelineStats:
+        with self._lock:
+            return ImagePipelineStats(
+                downloads=self._downloads,
+                uploads=self._uploads,
+                peak_inflight_bytes=self.budget.peak,
+            )
+
+    def submit(self, source_url: str, anime_name: str) -> Future[str]:
+        job: _Job[_Downloaded, _Verified] = _Job(source_url, anime_name)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Image pipeline is closed")
+            if not self._threads:
+                self._start()
+        self._queues[0].put(job)
+        return job.future
+
+    def store(self, source_url: str, anime_name: str) -> str:
+        return self.submit(source_url, anime_name).result()
+
+    def _start(self) -> None:
+        stages = (
+            ("download", self._download_job),
+            ("verify", self._verify_job),
+            ("upload", self._upload_job),
+        )
+        for number, ((name, stage), workers) in enumerate(
+            zip(stages, self._workers, strict=True)
+        ):
+            threads = [
+                threading.Thread(
+                    target=self._work,
+                    args=(number, stage),
+                    name=f"image-{name}-{index}",
+                    daemon=True,
+                )
+                for index in range(workers)
+            ]
+            for thread in threads:
+                thread.start()
+            self._threads.append(threads)
+
+    def _work(
+        self,
+        number: int,
+        stage: Callable[[_Job[_Downloaded, _Verified]], None],
+    ) -> None:
+        inbox = self._queues[number]
+        while (job := inbox.get()) is not None:
+            try:
+                stage(job)
+            except BaseException as exc:
+                self.budget.release(job.reserved)
+                job.reserved = 0
+                job.downloaded = None
+                job.future.set_exception(exc)
+
+    def _download_job(self, job: _Job[_Downloaded, _Verified]) -> None:
+        job.reserved = self.budget.acquire(self.max_item_bytes)
+        job.downloaded = self._download(job.source_url)
+        size = min(self._size(job.downloaded), job.reserved)
+        self.budget.release(job.reserved - size)
+        job.reserved = size
+        with self._lock:
+            self._downloads += 1
+        self._queues[1].put(job)
+
+    def _verify_job(self, job: _Job[_Downloaded, _Verified]) -> None:
+        assert job.downloaded is not None
+        job.verified = self._verify(job.downloaded)
+        self._queues[2].put(job)
+
+    def _upload_job(self, job: _Job[_Downloaded, _Verified]) -> None:
+        assert job.downloaded is not None and job.verified is not None
+        with self._upload_slots:
+            url = self._upload(
+                job.source_url, job.anime_name, job.downloaded, job.verified
+            )
+        # Drop the bytes before the budget is returned.
+        job.downloaded = None
+        self.budget.release(job.reserved)
+        job.reserved = 0
+        with self._lock:
+            self._uploads += 1
+        job.future.set_result(url)
+
+    def upload_downloaded(
+        self,
+        source_url: str,
+        anime_name: str,
+        downloaded: _Downloaded,
+    ) -> str:
+        """Verify and upload bytes fetched outside the download stage.
+
+        The caller reserves the bytes from ``budget``; the upload shares the
+        upload stage's concurrency cap.
+        """
+
+        verified = self._verify(downloaded)
+        with self._upload_slots:
+            url = self._upload(source_url, anime_name, downloaded, verified)
+        with self._lock:
+            self._uploads += 1
+        return url
+
+    def close(self) -> None:
+        """Finish queued jobs, then stop every stage in pipeline order."""
+
+        with self._lock:
+            self._closed = True
+            stages, self._threads = self._threads, []
+        # ``stages`` is empty when no job was ever submitted.
+        for inbox, threads in zip(self._queues, stages, strict=False):
+            for _ in threads:
+                inbox.put(None)
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,110 @@
+"""Intrinsic dimensions and inline blur placeholders for stored covers."""
+
+from __future__ import annotations
+
+import base64
+import io
+from dataclasses import dataclass
+
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError
+
+from models import IMAGE_PLACEHOLDER_MAX_LENGTH, IMAGE_PLACEHOLDER_PATTERN
+from services.cache_repository import CacheStore
+from services.errors import ImageStoreError
+from services.image_sniff import check_pixel_count
+
+METADATA_KEY_PREFIX = "image_meta_"
+# Longest placeholder edge; the browser's smooth upscale supplies the blur.
+PLACEHOLDER_EDGE = 16
+PLACEHOLDER_QUALITY = 40
+# Transparent covers are flattened onto the card background colour.
+PLACEHOLDER_BACKGROUND = (37, 37, 37)
+
+
+@dataclass(frozen=True)
+class ImageMetadata:
+    width: int
+    height: int
+    placeholder: str
+
+    def cache_value(self) -> str:
+        return f"{self.width}x{self.height} {self.placeholder}"
+
+    @classmethod
+    def from_cache_value(cls, value: str | None) -> ImageMetadata | None:
+        """Parse a cached entry, returning None for missing or malformed values."""
+
+        if not value:
+            return None
+        size, _, placeholder = value.partition(" ")
+        width, _, height = size.partition("x")
+        if not (
+            width.isdigit()
+            and height.isdigit()
+            and int(width) > 0
+            and int(height) > 0
+            and len(placeholder) <= IMAGE_PLACEHOLDER_MAX_LENGTH
+            and IMAGE_PLACEHOLDER_PATTERN.fullmatch(placeholder)
+        ):
+            return None
+        return cls(int(width), int(height), placeholder)
+
+
+def metadata_key(public_id: str) -> str:
+    return METADATA_KEY_PREFIX + public_id
+
+
+def cached_image_metadata(cache: CacheStore, image_url: str) -> ImageMetadata | None:
+    """Return the metadata cached for the managed asset behind ``image_url``."""
+    from services.retention import cloudinary_public_id_from_url
+
+    public_id = cloudinary_public_id_from_url(image_url)
+    if public_id is None:
+        return None
+    return ImageMetadata.from_cache_value(cache.get(metadata_key(public_id)))
+
+
+def describe_image(content: bytes | memoryview, max_pixels: int) -> ImageMetadata:
+    """Return display dimensions and a tiny WebP data URI for an image.
+
+    Dimensions follow EXIF orientation, as browsers do.
+    """
+
+    try:
+        with Image.open(io.BytesIO(bytes(content))) as image:
+            check_pixel_count(*image.size, max_pixels)
+            width, height = _display_size(image)
+            # JPEG can decode straight at a reduced scale.
+            image.draft("RGB", (PLACEHOLDER_EDGE * 4, PLACEHOLDER_EDGE * 4))
+            oriented = ImageOps.exif_transpose(image)
+            oriented.thumbnail(
+                (PLACEHOLDER_EDGE, PLACEHOLDER_EDGE), Image.Resampling.BOX
+            )
+            preview = Image.new("RGB", oriented.size, PLACEHOLDER_BACKGROUND)
+            rgba = oriented.convert("RGBA")
+            preview.paste(rgba, mask=rgba)
+            buffer = io.BytesIO()
+            preview.save(buffer, format="WEBP", quality=PLACEHOLDER_QUALITY)
+    except ImageStoreError:
+        raise
+    except (
+        Image.DecompressionBombError,
+        UnidentifiedImageError,
+        OSError,
+        SyntaxError,
+        ValueError,
+    ) as exc:
+        raise ImageStoreError(f"Unable to describe image: {exc}") from exc
+
+    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return ImageMetadata(width, height, f"data:image/webp;base64,{encoded}")
+
+
+def _display_size(image: Image.Image) -> tuple[int, int]:
+    """Size after EXIF rotation; read before ``draft`` shrinks the image."""
+
+    width, height = image.size
+    orientation = image.getexif().get(ExifTags.Base.Orientation, 1)
+    if orientation in {5, 6, 7, 8}:
+        return height, width
+    return width, height
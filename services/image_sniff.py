@@ -0,0 +1,210 @@
+"""Read image format and dimensions from file headers without decoding.
+
+Only the container headers of the formats in ALLOWED_IMAGE_TYPES are parsed.
+``sniff_image`` returns None whenever it cannot be sure, and callers then fall
+back to a full Pillow verify.
+"""
+
+from __future__ import annotations
+
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from services.errors import ImageStoreError
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Start-of-frame markers that carry dimensions; C4, C8, and CC are not frames.
+JPEG_SOF_MARKERS = frozenset(
+    {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+)
+AVIF_BRANDS = frozenset({b"avif", b"avis"})
+
+
+@dataclass(frozen=True)
+class ImageHeader:
+    format: str
+    width: int
+    height: int
+
+
+def image_format(content: bytes | memoryview) -> str | None:
+    """Return the format named by the magic bytes, or None if unrecognised."""
+
+    head = bytes(content[:32])
+    if head.startswith(PNG_SIGNATURE):
+        return "png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head[:6] in {b"GIF87a", b"GIF89a"}:
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[4:8] == b"ftyp" and _avif_brand(content):
+        return "avif"
+    return None
+
+
+def sniff_image(content: bytes | memoryview) -> ImageHeader | None:
+    """Return format and dimensions from the header, or None when unsure."""
+
+    view = memoryview(content).cast("B")
+    image_type = image_format(view)
+    try:
+        size = _READERS[image_type](view) if image_type else None
+    except (struct.error, IndexError, ValueError):
+        return None
+    if size is None or min(size) < 1:
+        return None
+    return ImageHeader(image_type, *size)  # type: ignore[arg-type]
+
+
+def check_pixel_count(width: int, height: int, max_pixels: int) -> None:
+    pixel_count = width * height
+    if pixel_count > max_pixels:
+        raise ImageStoreError(
+            "Downloaded image dimensions "
+            f"{width}x{height} ({pixel_count} pixels) exceed the "
+            f"{max_pixels} pixel safety limit"
+        )
+
+
+def check_image_header(
+    content: bytes | memoryview,
+    content_type: str,
+    max_pixels: int,
+) -> ImageHeader | None:
+    """Reject mislabelled or oversized images using only their headers.
+
+    Returns the header when it settles format and size, or None when a full
+    decode is needed to judge the content.
+    """
+
+    image_type = image_format(content)
+    if image_type is not None and f"image/{image_type}" != content_type:
+        raise ImageStoreError(
+            f"Image content is {image_type} but was served as {content_type}"
+        )
+    header = sniff_image(content)
+    if header is not None:
+        check_pixel_count(header.width, header.height, max_pixels)
+    return header
+
+
+def _png_size(view: memoryview) -> tuple[int, int] | None:
+    if bytes(view[12:16]) != b"IHDR":
+        return None
+    return struct.unpack(">II", view[16:24])
+
+
+def _gif_size(view: memoryview) -> tuple[int, int]:
+    return struct.unpack("<HH", view[6:10])
+
+
+def _jpeg_size(view: memoryview) -> tuple[int, int] | None:
+    position = 2
+    while position + 4 <= len(view):
+        if view[position] != 0xFF:
+            return None
+        marker = view[position + 1]
+        if marker == 0xFF:
+            # Fill bytes may pad before a marker.
+            position += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            position += 2
+            continue
+        if marker in {0xD9, 0xDA}:
+            # End of image or start of scan before any frame header.
+            return None
+        (length,) = struct.unpack(">H", view[position + 2 : position + 4])
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", view[position + 5 : position + 9])
+            return width, height
+        position += 2 + length
+    return None
+
+
+def _webp_size(view: memoryview) -> tuple[int, int] | None:
+    chunk = bytes(view[12:16])
+    if chunk == b"VP8 ":
+        if bytes(view[23:26]) != b"\x9d\x01\x2a":
+            return None
+        width, height = struct.unpack("<HH", view[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        if view[20] != 0x2F:
+            return None
+        (bits,) = struct.unpack("<I", view[21:25])
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(view[24:27], "little") + 1
+        height = int.from_bytes(view[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def _boxes(view: memoryview, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    """Yield (type, payload start, box end) for ISO BMFF boxes in a range."""
+
+    position = start
+    while position + 8 <= end:
+        size, box_type = struct.unpack(">I4s", view[position : position + 8])
+        header = 8
+        if size == 1:
+            (size,) = struct.unpack(">Q", view[position + 8 : position + 16])
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header or position + size > end:
+            return
+        yield box_type, position + header, position + size
+        position += size
+
+
+def _avif_brand(content: bytes | memoryview) -> bool:
+    view = memoryview(content).cast("B")
+    try:
+        for box_type, start, end in _boxes(view, 0, min(len(view), 4096)):
+            if box_type == b"ftyp":
+                brands = {bytes(view[start : start + 4])} | {
+                    bytes(view[offset : offset + 4])
+                    for offset in range(start + 8, end - 3, 4)
+                }
+                return bool(brands & AVIF_BRANDS)
+            return False
+    except struct.error:
+        return False
+    return False
+
+
+def _avif_size(view: memoryview) -> tuple[int, int] | None:
+    """Return the largest ``ispe`` extent; grids and alpha planes add more."""
+
+    sizes: list[tuple[int, int]] = []
+    path = (b"meta", b"iprp", b"ipco", b"ispe")
+
+    def walk(start: int, end: int, depth: int) -> None:
+        for box_type, payload, box_end in _boxes(view, start, end):
+            if box_type != path[depth]:
+                continue
+            if box_type == b"ispe":
+                # Full box: version and flags precede the extents.
+                sizes.append(struct.unpack(">II", view[payload + 4 : payload + 12]))
+            else:
+                # ``meta`` is a full box too; its children start after 4 bytes.
+                walk(
+                    payload + 4 if box_type == b"meta" else payload, box_end, depth + 1
+                )
+
+    walk(0, len(view), 0)
+    return max(sizes, key=lambda size: size[0] * size[1]) if sizes else None
+
+
+_READERS = {
+    "png": _png_size,
+    "gif": _gif_size,
+    "jpeg": _jpeg_size,
+    "webp": _webp_size,
+    "avif": _avif_size,
+}
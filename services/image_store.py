@@ -5,6 +5,8 @@ from __future__ import annotations
 import hashlib
 import io
 import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
 
 import cloudinary
 import cloudinary.api
@@ -12,18 +14,121 @@ import cloudinary.uploader
 import cloudinary.utils
 from PIL import Image, UnidentifiedImageError
 
-from services.cache_repository import CacheRepository
-from services.errors import ImageStoreError, QuotaExceededError
-from services.http_client import SafeImageDownloader
+from services.cache_repository import CacheStore
+from services.errors import ImageStoreError
+from services.http_client import (
+    DownloadedImage,
+    SafeImageDownloader,
+    SessionPoolStats,
+)
+from services.image_normalize import NormalizeProfile, normalize_image
+from services.image_pipeline import ImagePipeline, ImagePipelineStats
+from services.image_placeholder import (
+    ImageMetadata,
+    cached_image_metadata,
+    describe_image,
+    metadata_key,
+)
+from services.image_sniff import check_image_header, check_pixel_count
+from services.original_store import OriginalImageStore, OriginalStoreStats
+from services.quota_budget import QuotaBudget, QuotaStats
 from services.settings import CrawlerSettings, required_cloudinary_credentials
+from services.single_flight import SingleFlight, SingleFlightStats
+from services.stage_executor import StageExecutor
+
+
+@dataclass(frozen=True)
+class ImageDigests:
+    sha256: str
+    md5: str
+
+
+class _BufferReader(io.RawIOBase):
+    """Read-only seekable file over a buffer, so PIL can parse it in place."""
+
+    def __init__(self, content: bytes | memoryview) -> None:
+        self._view = memoryview(content).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+        self._position = offset
+        return offset
+
+    def readinto(self, target: bytearray | memoryview) -> int:  # type: ignore[override]
+        chunk = self._view[self._position : self._position + len(target)]
+        target[: len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+
+def verify_image(content: bytes | memoryview, max_pixels: int) -> None:
+    """Reject content that is not an image within the pixel safety limit.
+
+    The content is read through a view rather than copied into a BytesIO.
+    """
+
+    try:
+        with Image.open(_BufferReader(content)) as image:
+            check_pixel_count(*image.size, max_pixels)
+            image.verify()
+    except ImageStoreError:
+        raise
+    except (
+        Image.DecompressionBombError,
+        UnidentifiedImageError,
+        OSError,
+        # Pillow reports broken chunks, such as a bad PNG CRC, as SyntaxError.
+        SyntaxError,
+    ) as exc:
+        raise ImageStoreError("Downloaded content is not a valid image") from exc
+
+
+def image_digests(content: bytes | memoryview) -> ImageDigests:
+    return ImageDigests(
+        sha256=hashlib.sha256(content).hexdigest(),
+        md5=hashlib.md5(content, usedforsecurity=False).hexdigest(),
+    )
+
+
+def _resolved(url: str) -> Future[str]:
+    future: Future[str] = Future()
+    future.set_result(url)
+    return future
+
+
+def full_verify_sampled(sha256_digest: str, rate: float) -> bool:
+    """Pick a deterministic ``rate`` share of images for a full Pillow verify.
+
+    Sampling by digest means a given image is always either checked or not,
+    so reruns behave the same.
+    """
+
+    return int(sha256_digest[:8], 16) < rate * 0x1_0000_0000
 
 
 class CloudinaryImageStore:
     def __init__(
         self,
         settings: CrawlerSettings,
-        cache: CacheRepository,
+        cache: CacheStore,
         downloader: SafeImageDownloader | None = None,
+        stages: StageExecutor | None = None,
+        originals: OriginalImageStore | None = None,
     ) -> None:
         credentials = required_cloudinary_credentials()
         cloudinary.config(
@@ -36,81 +141,212 @@ class CloudinaryImageStore:
         self.settings = settings
         self.cache = cache
         self.downloader = downloader or SafeImageDownloader(settings)
+        self.stages = stages or StageExecutor()
+        # Verified originals kept on disk are checked before the source host.
+        self.originals = originals
+        # Concurrent stores of one source URL share a single download.
+        self.downloads: SingleFlight[str] = SingleFlight()
+        self.pipeline: ImagePipeline[DownloadedImage, ImageDigests] = ImagePipeline(
+            download=self._fetch_original,
+            verify=self._verify_downloaded,
+            upload=self._upload_verified,
+            size=lambda downloaded: len(downloaded.content),
+            download_workers=settings.image_download_workers,
+            verify_workers=settings.cpu_workers,
+            upload_workers=settings.image_upload_workers,
+            max_inflight_bytes=settings.image_inflight_max_bytes,
+            max_item_bytes=settings.image_max_bytes,
+        )
+        self.normalize_profile = (
+            NormalizeProfile(
+                max_edge=settings.image_max_edge,
+                format=settings.image_encode_format,
+                quality=settings.image_encode_quality,
+            )
+            if settings.image_normalize
+            else None
+        )
+        self.quota = QuotaBudget(
+            lambda: cloudinary.api.usage(),
+            limit_percent=settings.cloudinary_quota_limit_percent,
+            refresh_after_uploads=settings.cloudinary_quota_refresh_uploads,
+        )
         self._key_locks: dict[str, threading.Lock] = {}
         self._key_locks_guard = threading.Lock()
 
-    def assert_quota_available(self) -> None:
-        try:
-            usage_data = cloudinary.api.usage()
-        except Exception as exc:
-            raise ImageStoreError(
-                f"Unable to verify Cloudinary quota safely: {exc}"
-            ) from exc
-
-        used_percent = usage_data.get("credits", {}).get("used_percent")
-        if used_percent is None:
-            raise ImageStoreError(
-                "Cloudinary usage response omitted credits.used_percent"
-            )
-        if float(used_percent) >= self.settings.cloudinary_quota_limit_percent:
-            raise QuotaExceededError(
-                "Cloudinary quota is at "
-                f"{float(used_percent):.2f}%; automatic deletion is disabled. "
-                "Run the manual retention dry-run after reviewing references."
-            )
+    def session_stats(self) -> SessionPoolStats:
+        return self.downloader.sessions.stats()
 
-    def _verify_image(self, content: bytes) -> None:
+    def single_flight_stats(self) -> SingleFlightStats:
+        return self.downloads.stats()
+
+    def pipeline_stats(self) -> ImagePipelineStats:
+        return self.pipeline.stats()
+
+    def original_stats(self) -> OriginalStoreStats | None:
+        return self.originals.stats() if self.originals else None
+
+    def close(self) -> None:
         try:
-            with Image.open(io.BytesIO(content)) as image:
-                width, height = image.size
-                pixel_count = width * height
-                if pixel_count > self.settings.image_max_pixels:
-                    raise ImageStoreError(
-                        "Downloaded image dimensions "
-                        f"{width}x{height} ({pixel_count} pixels) exceed the "
-                        f"{self.settings.image_max_pixels} pixel safety limit"
-                    )
-                image.verify()
-        except ImageStoreError:
-            raise
-        except (Image.DecompressionBombError, UnidentifiedImageError, OSError) as exc:
-            raise ImageStoreError("Downloaded content is not a valid image") from exc
+            self.pipeline.close()
+        finally:
+            try:
+                if self.originals:
+                    self.originals.save_if_changed()
+            finally:
+                self.downloader.close()
+
+    def assert_quota_available(self) -> None:
+        """Fail closed when Cloudinary usage is at the configured limit.
+
+        The Admin API is called on the first check of a run and after every
+        ``cloudinary_quota_refresh_uploads`` uploads; other checks use the
+        run's local estimate.
+        """
+
+        self.quota.check()
+
+    def quota_stats(self) -> QuotaStats:
+        return self.quota.stats()
 
     def _lock_for(self, key: str) -> threading.Lock:
         with self._key_locks_guard:
             return self._key_locks.setdefault(key, threading.Lock())
 
+    @staticmethod
+    def source_key(source_url: str) -> str:
+        return "source_" + hashlib.sha256(source_url.encode("utf-8")).hexdigest()
+
+    def cached_url(self, source_url: str) -> str | None:
+        return self.cache.get(self.source_key(source_url)) or None
+
+    def image_metadata(self, image_url: str) -> ImageMetadata | None:
+        """Return cached dimensions and placeholder for a stored cover URL."""
+
+        return cached_image_metadata(self.cache, image_url)
+
+    def stored_original(self, source_url: str) -> DownloadedImage | None:
+        """Return the locally kept original for ``source_url``, if any."""
+
+        return self.originals.get_source(source_url) if self.originals else None
+
+    def _fetch_original(self, source_url: str) -> DownloadedImage:
+        return self.stored_original(source_url) or self.downloader.download(source_url)
+
     def store(self, source_url: str, anime_name: str) -> str:
-        source_key = "source_" + hashlib.sha256(source_url.encode("utf-8")).hexdigest()
-        cached_source = self.cache.get(source_key)
+        return self.submit(source_url, anime_name).result()
+
+    def submit(self, source_url: str, anime_name: str) -> Future[str]:
+        """Return a Future for the stored URL without waiting on the pipeline.
+
+        Cached sources resolve at once; blocks only while the download queue
+        is full.
+        """
+
+        cached_source = self.cached_url(source_url)
         if cached_source:
-            return cached_source
+            return _resolved(cached_source)
 
-        downloaded = self.downloader.download(source_url)
-        self._verify_image(downloaded.content)
+        def start() -> Future[str]:
+            # A previous leader may have finished after the check above.
+            cached = self.cached_url(source_url)
+            if cached:
+                return _resolved(cached)
+            return self.pipeline.submit(source_url, anime_name)
 
-        legacy_md5_key = (
-            "cloudinary_"
-            + hashlib.md5(downloaded.content, usedforsecurity=False).hexdigest()
-        )
-        sha256_digest = hashlib.sha256(downloaded.content).hexdigest()
-        content_key = f"cloudinary_sha256_{sha256_digest}"
+        return self.downloads.submit(self.source_key(source_url), start)
+
+    def store_downloaded(
+        self,
+        source_url: str,
+        anime_name: str,
+        downloaded: DownloadedImage,
+    ) -> str:
+        """Verify, deduplicate, and upload bytes already fetched for source_url.
+
+        Callers hold a reservation on ``pipeline.budget`` for the bytes.
+        """
+
+        return self.pipeline.upload_downloaded(source_url, anime_name, downloaded)
+
+    def _verify_downloaded(self, downloaded: DownloadedImage) -> ImageDigests:
+        """Check headers, and decode with Pillow when unsure or sampled."""
+
+        content = downloaded.content
+        max_pixels = self.settings.image_max_pixels
+        header = check_image_header(content, downloaded.content_type, max_pixels)
+        if downloaded.sha256 and downloaded.md5:
+            # The downloader hashed the bytes as they arrived.
+            digests = ImageDigests(sha256=downloaded.sha256, md5=downloaded.md5)
+        else:
+            digests = image_digests(content)
+        if header is None or full_verify_sampled(
+            digests.sha256, self.settings.image_full_verify_rate
+        ):
+            self.stages.run("image", verify_image, content, max_pixels)
+        return digests
+
+    def _upload_verified(
+        self,
+        source_url: str,
+        anime_name: str,
+        downloaded: DownloadedImage,
+        digests: ImageDigests,
+    ) -> str:
+        source_key = self.source_key(source_url)
+        legacy_md5_key = f"cloudinary_{digests.md5}"
+        raw_key = f"cloudinary_sha256_{digests.sha256}"
+        # Normalized uploads are keyed by the original digest plus the
+        # profile, so the same source bytes still deduplicate.
+        profile = self.normalize_profile
+        if profile is None:
+            content_key = raw_key
+            asset_name = digests.sha256
+        else:
+            content_key = f"{raw_key}_{profile.key}"
+            # Public IDs stay 64 hex characters, the managed-asset contract.
+            asset_name = hashlib.sha256(
+                f"{digests.sha256}_{profile.key}".encode()
+            ).hexdigest()
+
+        if self.originals:
+            self.originals.put(
+                digests.sha256, downloaded.content, source_url=source_url
+            )
 
         with self._lock_for(content_key):
-            cached = self.cache.get(content_key) or self.cache.get(legacy_md5_key)
+            cached = (
+                self.cache.get(content_key)
+                or self.cache.get(raw_key)
+                or self.cache.get(legacy_md5_key)
+            )
             if cached:
                 self.cache.set(source_key, cached)
                 return cached
 
-            public_id = f"anime_covers/{sha256_digest}"
+            # Usually a local estimate; see assert_quota_available.
+            self.quota.check()
+            payload = (
+                downloaded.content
+                if profile is None
+                else self.stages.run(
+                    "image", normalize_image, downloaded.content, profile
+                )
+            )
+            # Describe what Cloudinary will serve, before anything is uploaded.
+            metadata = self.stages.run(
+                "image", describe_image, payload, self.settings.image_max_pixels
+            )
+            public_id = f"anime_covers/{asset_name}"
             try:
                 result = cloudinary.uploader.upload(
-                    downloaded.content,
+                    payload,
                     public_id=public_id,
                     overwrite=False,
                     resource_type="image",
                     type="upload",
                 )
+                self.quota.record_upload(len(payload))
                 if not result.get("public_id"):
                     raise ImageStoreError(
                         "Cloudinary upload response omitted public_id"
@@ -132,6 +368,7 @@ class CloudinaryImageStore:
                 raise ImageStoreError(
                     f"{anime_name}: Cloudinary produced an unexpected URL"
                 )
+            self.cache.set(metadata_key(result["public_id"]), metadata.cache_value())
             self.cache.set(content_key, url)
             self.cache.set(source_key, url)
             return url
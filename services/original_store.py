@@ -0,0 +1,234 @@
+"""On-disk, content-addressed store of verified original cover images.
+
+Like the source fingerprint ledger, this is a disposable local optimization
+under ``.crawler-state``: deleting it only means originals are downloaded
+from the source host again. Files are named by their SHA-256 digest and are
+re-hashed on every read, so a corrupt or edited file is dropped as a miss.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from services.atomic_io import atomic_write_bytes, atomic_write_json
+from services.http_client import DownloadedImage
+from services.image_sniff import image_format
+from services.settings import CrawlerSettings, ProjectPaths
+
+logger = logging.getLogger(__name__)
+INDEX_FILE_NAME = "index.json"
+_DIGEST_LENGTH = 64
+
+
+@dataclass(frozen=True)
+class OriginalStoreStats:
+    hits: int
+    misses: int
+    writes: int
+    evictions: int
+    stored_bytes: int
+
+
+class OriginalImageStore:
+    """SHA-256 keyed image files with a least-recently-used byte budget.
+
+    ``index.json`` maps each source URL to the digest of the bytes it last
+    served. Use order starts from file modification times and is refreshed
+    on every hit, so eviction survives restarts approximately in LRU order.
+    """
+
+    def __init__(self, root: Path, *, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._sizes: OrderedDict[str, int] = self._scan()
+        self._stored_bytes = sum(self._sizes.values())
+        self._sources = self._load_index()
+        self._dirty = False
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+
+    @classmethod
+    def from_settings(
+        cls, settings: CrawlerSettings, paths: ProjectPaths
+    ) -> OriginalImageStore | None:
+        """Return the configured store, or None when it is disabled."""
+
+        if not settings.image_original_store:
+            return None
+        return cls(
+            paths.original_store_dir,
+            max_bytes=settings.image_original_store_max_bytes,
+        )
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / INDEX_FILE_NAME
+
+    def _path(self, sha256_digest: str) -> Path:
+        return self.root / sha256_digest[:2] / sha256_digest
+
+    def _scan(self) -> OrderedDict[str, int]:
+        entries: list[tuple[float, str, int]] = []
+        if self.root.is_dir():
+            for path in self.root.glob("??/*"):
+                if len(path.name) != _DIGEST_LENGTH or not path.is_file():
+                    continue
+                stat = path.stat()
+                entries.append((stat.st_mtime, path.name, stat.st_size))
+        entries.sort()
+        return OrderedDict((name, size) for _mtime, name, size in entries)
+
+    def _load_index(self) -> dict[str, str]:
+        if not self.index_path.exists():
+            return {}
+        try:
+            raw = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if not isinstance(raw, dict):
+                raise TypeError("original store index must be a JSON object")
+            return {str(url): str(digest) for url, digest in raw.items()}
+        except (OSError, ValueError, TypeError) as exc:
+            logger.warning(
+                "Ignoring unreadable original index %s: %s", self.index_path, exc
+            )
+            return {}
+
+    def stats(self) -> OriginalStoreStats:
+        with self._lock:
+            return OriginalStoreStats(
+                hits=self._hits,
+                misses=self._misses,
+                writes=self._writes,
+                evictions=self._evictions,
+                stored_bytes=self._stored_bytes,
+            )
+
+    def get(self, sha256_digest: str) -> bytes | None:
+        """Return the stored bytes for a digest and mark them recently used."""
+
+        with self._lock:
+            if sha256_digest not in self._sizes:
+                self._misses += 1
+                return None
+        # Reads and hashing run unlocked; only the bookkeeping is serialized.
+        path = self._path(sha256_digest)
+        try:
+            content = path.read_bytes()
+        except OSError:
+            content = None
+        if content is None or hashlib.sha256(content).hexdigest() != sha256_digest:
+            logger.warning("Dropping unreadable stored original %s", path)
+            with self._lock:
+                self._forget(sha256_digest)
+                self._misses += 1
+            path.unlink(missing_ok=True)
+            return None
+        with self._lock:
+            if sha256_digest in self._sizes:
+                self._sizes.move_to_end(sha256_digest)
+            self._hits += 1
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return content
+
+    def get_source(self, source_url: str) -> DownloadedImage | None:
+        """Return the original last stored for ``source_url``, if still kept."""
+
+        with self._lock:
+            sha256_digest = self._sources.get(source_url)
+            if sha256_digest is None:
+                self._misses += 1
+                return None
+        content = self.get(sha256_digest)
+        detected = image_format(content) if content is not None else None
+        if detected is None:
+            with self._lock:
+                if content is not None:
+                    self._forget(sha256_digest)
+                if self._sources.get(source_url) == sha256_digest:
+                    del self._sources[source_url]
+                    self._dirty = True
+            if content is not None:
+                self._path(sha256_digest).unlink(missing_ok=True)
+            return None
+        return DownloadedImage(
+            content=content,
+            content_type=f"image/{detected}",
+            final_url=source_url,
+            sha256=sha256_digest,
+            md5=hashlib.md5(content, usedforsecurity=False).hexdigest(),
+        )
+
+    def put(
+        self,
+        sha256_digest: str,
+        content: bytes | memoryview,
+        *,
+        source_url: str | None = None,
+    ) -> None:
+        """Keep verified ``content`` and remember which source served it.
+
+        Content larger than the whole budget is not stored, and a digest
+        whose file already exists is never written again.
+        """
+
+        size = len(content)
+        path = self._path(sha256_digest)
+        with self._lock:
+            if source_url is not None and self._sources.get(source_url) != (
+                sha256_digest
+            ):
+                self._sources[source_url] = sha256_digest
+                self._dirty = True
+            if sha256_digest in self._sizes:
+                self._sizes.move_to_end(sha256_digest)
+                return
+        if size > self.max_bytes:
+            return
+        written = not path.is_file()
+        if written:
+            atomic_write_bytes(path, bytes(content))
+        with self._lock:
+            if sha256_digest in self._sizes:
+                return
+            self._sizes[sha256_digest] = size
+            self._stored_bytes += size
+            self._writes += int(written)
+            evicted = []
+            while self._stored_bytes > self.max_bytes:
+                oldest = next(iter(self._sizes))
+                self._forget(oldest)
+                self._evictions += 1
+                evicted.append(oldest)
+        for digest in evicted:
+            self._path(digest).unlink(missing_ok=True)
+
+    def _forget(self, sha256_digest: str) -> None:
+        self._stored_bytes -= self._sizes.pop(sha256_digest, 0)
+
+    def save_if_changed(self) -> bool:
+        """Persist the source index, dropping entries whose file was evicted."""
+
+        with self._lock:
+            if not self._dirty and all(
+                digest in self._sizes for digest in self._sources.values()
+            ):
+                return False
+            self._sources = {
+                url: digest
+                for url, digest in self._sources.items()
+                if digest in self._sizes
+            }
+            atomic_write_json(self.index_path, dict(sorted(self._sources.items())))
+            self._dirty = False
+            return True
@@ -2,64 +2,206 @@
 
 from __future__ import annotations
 
+import hashlib
 import re
+from collections.abc import Callable, Collection, Iterable, Iterator
+from dataclasses import dataclass
 from urllib.parse import urljoin
 
+import lxml.html
 from bs4 import BeautifulSoup, Tag
+from lxml import etree
 
 from models import AnimeCandidate
 from services.errors import ItemParseError
 
 SOURCE_ORIGIN = "https://acgsecrets.hk"
 CARD_SELECTOR = "div#acgs-anime-list div.acgs-anime-block.CV-search"
+CARD_XPATH = (
+    "//div[@id='acgs-anime-list']//div["
+    "contains(concat(' ', normalize-space(@class), ' '), ' acgs-anime-block ') and "
+    "contains(concat(' ', normalize-space(@class), ' '), ' CV-search ')]"
+)
 
 
-def extract_item_html(document_html: str) -> list[str]:
+def _select_cards(document_html: str) -> list[Tag]:
     soup = BeautifulSoup(document_html, "lxml")
     cards = soup.select(CARD_SELECTOR)
     if not cards:
         raise ItemParseError(
             f"No anime cards matched the expected selector: {CARD_SELECTOR}"
         )
-    return [str(card) for card in cards]
+    return cards
+
+
+def extract_item_html(document_html: str) -> list[str]:
+    return [str(card) for card in _select_cards(document_html)]
+
+
+def parse_document(
+    document_html: str,
+    *,
+    backend: str = "bs4",
+) -> list[AnimeCandidate | ItemParseError]:
+    """Parse every card from one document tree, in source order.
+
+    A card that breaks the contract yields its ItemParseError in place of a
+    candidate so one bad card never hides the others. A document without any
+    card still raises ItemParseError. ``backend`` picks one of
+    PARSER_BACKENDS; "bs4" is the reference implementation.
+    """
+
+    try:
+        parse = PARSER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unsupported parser backend: {backend}") from None
+    return parse(document_html)
+
+
+def _parse_document_bs4(document_html: str) -> list[AnimeCandidate | ItemParseError]:
+    results: list[AnimeCandidate | ItemParseError] = []
+    for card in _select_cards(document_html):
+        try:
+            results.append(_parse_card(card))
+        except ItemParseError as exc:
+            results.append(exc)
+    return results
+
+
+def _canonical_element(element: etree._Element) -> str:
+    """Serialize an element with sorted attributes and trimmed text nodes.
+
+    Trimming matches ``get_text(strip=True)``; inner whitespace is kept because
+    the parser keeps it too.
+    """
+
+    parts: list[str] = []
+    for node in element.iter():
+        if isinstance(node.tag, str) and node.tag not in {"script", "style"}:
+            attributes = "\x1e".join(
+                f"{name}={str(value).strip()}"
+                for name, value in sorted(node.attrib.items())
+            )
+            parts.append(f"<{node.tag}\x1e{attributes}>")
+            parts.append((node.text or "").strip())
+        if node is not element:
+            parts.append((node.tail or "").strip())
+    return "\x1f".join(parts)
+
+
+def fingerprint_document(document_html: str) -> tuple[str, str]:
+    """Return the normalized card-region digest and the order-free card-set digest.
+
+    Markup outside the card list, whitespace around text, comments, scripts,
+    and attribute order do not affect either digest. The card-set digest also ignores card
+    order, which the crawler re-sorts anyway.
+    """
+
+    root = lxml.html.document_fromstring(document_html)
+    return _fingerprint_tree(root, _LXML_CARDS(root))
+
+
+def _fingerprint_tree(
+    root: etree._Element,
+    cards: list[etree._Element],
+) -> tuple[str, str]:
+    card_digests = sorted(
+        hashlib.sha256(_canonical_element(card).encode("utf-8")).hexdigest()
+        for card in cards
+    )
+    document_digest = hashlib.sha256()
+    for container in root.xpath("//div[@id='acgs-anime-list']"):
+        document_digest.update(_canonical_element(container).encode("utf-8"))
+    card_set_digest = hashlib.sha256("\n".join(card_digests).encode("ascii"))
+    return document_digest.hexdigest(), card_set_digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class ParsedDocument:
+    document_sha256: str
+    card_set_sha256: str
+    # None when a digest matched, so the cards were never parsed.
+    cards: list[AnimeCandidate | ItemParseError] | None
+
+
+def parse_fingerprinted_document(
+    document_html: str,
+    *,
+    backend: str = "bs4",
+    known_digests: Collection[str] = (),
+) -> ParsedDocument:
+    """Return ``fingerprint_document``'s digests and the page's cards.
+
+    Cards are only parsed when neither digest is in ``known_digests``. The
+    lxml backend reads them from the tree the digests came from; "bs4"
+    builds its own soup.
+    """
+
+    root = lxml.html.document_fromstring(document_html)
+    card_elements = _LXML_CARDS(root)
+    document_sha256, card_set_sha256 = _fingerprint_tree(root, card_elements)
+    cards = None
+    if document_sha256 not in known_digests and card_set_sha256 not in known_digests:
+        cards = (
+            _parse_card_elements(card_elements)
+            if backend == "lxml"
+            else parse_document(document_html, backend=backend)
+        )
+    return ParsedDocument(document_sha256, card_set_sha256, cards)
 
 
 def _stable_id(item: Tag, anime_name: str) -> str:
-    attribute_candidates = (
-        "acgs-bangumi-anime-id",
-        "acgs-bangumi-data-id",
+    return _stable_id_from_values(
+        anime_name,
+        (
+            str(item.get("acgs-bangumi-anime-id", "")),
+            str(item.get("acgs-bangumi-data-id", "")),
+        ),
     )
-    for attribute in attribute_candidates:
-        value = str(item.get(attribute, "")).strip()
-        if value:
-            return value
+
+
+def _stable_id_from_values(anime_name: str, values: tuple[str, ...]) -> str:
+    for value in values:
+        if value.strip():
+            return value.strip()
 
     raise ItemParseError(f"{anime_name}: card is missing acgs-bangumi-anime-id")
 
 
 def _broadcast_details(item: Tag) -> tuple[str, str]:
+    time_element = item.select_one("div.time_today.main_time")
+    return _broadcast_from_values(
+        time_element.get_text(" ", strip=True) if time_element else None,
+        str(item.get("weektoday", "")),
+        str(item.get("weekairtime", "")),
+    )
+
+
+def _broadcast_from_values(
+    time_text: str | None,
+    weektoday: str,
+    weekairtime: str,
+) -> tuple[str, str]:
     premiere_date = "無首播日期"
     premiere_time = "無首播時間"
 
-    time_element = item.select_one("div.time_today.main_time")
-    if time_element:
-        text = time_element.get_text(" ", strip=True)
-        week_match = re.search(r"每週([一二三四五六日天])", text)
+    if time_text is not None:
+        week_match = re.search(r"每週([一二三四五六日天])", time_text)
         if week_match:
             premiere_date = "日" if week_match.group(1) == "天" else week_match.group(1)
-        time_match = re.search(r"(\d{1,2})時(\d{1,2})分", text)
+        time_match = re.search(r"(\d{1,2})時(\d{1,2})分", time_text)
         if time_match:
             premiere_time = (
                 f"{int(time_match.group(1)):02d}:{int(time_match.group(2)):02d}"
             )
 
     if premiere_date == "無首播日期":
-        raw_weekday = str(item.get("weektoday", "")).strip()
+        raw_weekday = weektoday.strip()
         if raw_weekday in {"一", "二", "三", "四", "五", "六", "日", "天"}:
             premiere_date = "日" if raw_weekday == "天" else raw_weekday
 
     if premiere_time == "無首播時間":
-        raw_time = re.sub(r"\D", "", str(item.get("weekairtime", "")))
+        raw_time = re.sub(r"\D", "", weekairtime)
         if len(raw_time) >= 4:
             hour, minute = int(raw_time[-4:-2]), int(raw_time[-2:])
             if 0 <= hour <= 29 and 0 <= minute <= 59:
@@ -72,11 +214,26 @@ def parse_anime_item(item_html: str) -> AnimeCandidate:
     item = BeautifulSoup(item_html, "lxml").find("div", class_="CV-search")
     if not isinstance(item, Tag):
         raise ItemParseError("Anime card root element is missing")
+    return _parse_card(item)
 
-    name_element = item.select_one("h3.entity_localized_name")
-    anime_name = name_element.get_text(" ", strip=True) if name_element else ""
+
+def _required_name(anime_name: str) -> str:
     if not anime_name:
         raise ItemParseError("Anime card is missing its localized name")
+    return anime_name
+
+
+def _source_image_url(anime_name: str, raw_image_url: str) -> str:
+    if not raw_image_url:
+        raise ItemParseError(f"{anime_name}: anime card is missing its cover URL")
+    return urljoin(SOURCE_ORIGIN, raw_image_url)
+
+
+def _parse_card(item: Tag) -> AnimeCandidate:
+    name_element = item.select_one("h3.entity_localized_name")
+    anime_name = _required_name(
+        name_element.get_text(" ", strip=True) if name_element else ""
+    )
 
     image_element = item.select_one("div.anime_cover_image img")
     raw_image_url = ""
@@ -87,9 +244,7 @@ def parse_anime_item(item_html: str) -> AnimeCandidate:
             or image_element.get("data-src")
             or ""
         ).strip()
-    if not raw_image_url:
-        raise ItemParseError(f"{anime_name}: anime card is missing its cover URL")
-    source_image_url = urljoin(SOURCE_ORIGIN, raw_image_url)
+    source_image_url = _source_image_url(anime_name, raw_image_url)
 
     story_element = item.select_one("div.anime_story")
     story = story_element.get_text(" ", strip=True) if story_element else "暫無簡介"
@@ -103,3 +258,213 @@ def parse_anime_item(item_html: str) -> AnimeCandidate:
         premiere_time=premiere_time,
         story=story or "暫無簡介",
     )
+
+
+# lxml-native backend. It mirrors the BeautifulSoup reference above and is
+# held to identical output by tests/test_parser_parity.py.
+
+
+def _class_xpath(tag: str, *class_names: str) -> str:
+    conditions = " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+        for name in class_names
+    )
+    return f"{tag}[{conditions}]"
+
+
+_LXML_NAME = etree.XPath(".//" + _class_xpath("h3", "entity_localized_name"))
+_LXML_IMAGE = etree.XPath(".//" + _class_xpath("div", "anime_cover_image") + "//img")
+_LXML_STORY = etree.XPath(".//" + _class_xpath("div", "anime_story"))
+_LXML_TIME = etree.XPath(".//" + _class_xpath("div", "time_today", "main_time"))
+_LXML_CARDS = etree.XPath(CARD_XPATH)
+_NON_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+
+def _lxml_text(element: etree._Element) -> str:
+    """Match BeautifulSoup ``get_text(" ", strip=True)`` for one element."""
+
+    parts: list[str] = []
+    for node in element.iter():
+        if (
+            isinstance(node.tag, str)
+            and node.tag not in _NON_TEXT_TAGS
+            and node.text
+            and node.text.strip()
+        ):
+            parts.append(node.text.strip())
+        if node is not element and node.tail and node.tail.strip():
+            parts.append(node.tail.strip())
+    return " ".join(parts)
+
+
+def _lxml_first(query: etree.XPath, item: etree._Element) -> etree._Element | None:
+    matches = query(item)
+    return matches[0] if matches else None
+
+
+def parse_card_element(item: etree._Element) -> AnimeCandidate:
+    """Parse one card element from an lxml tree."""
+
+    name_element = _lxml_first(_LXML_NAME, item)
+    anime_name = _required_name(
+        _lxml_text(name_element) if name_element is not None else ""
+    )
+
+    image_element = _lxml_first(_LXML_IMAGE, item)
+    raw_image_url = ""
+    if image_element is not None:
+        raw_image_url = str(
+            image_element.get("acgs-img-data-url")
+            or image_element.get("src")
+            or image_element.get("data-src")
+            or ""
+        ).strip()
+    source_image_url = _source_image_url(anime_name, raw_image_url)
+
+    story_element = _lxml_first(_LXML_STORY, item)
+    story = _lxml_text(story_element) if story_element is not None else "暫無簡介"
+    time_element = _lxml_first(_LXML_TIME, item)
+    premiere_date, premiere_time = _broadcast_from_values(
+        _lxml_text(time_element) if time_element is not None else None,
+        item.get("weektoday", ""),
+        item.get("weekairtime", ""),
+    )
+
+    return AnimeCandidate(
+        bangumi_id=_stable_id_from_values(
+            anime_name,
+            (
+                item.get("acgs-bangumi-anime-id", ""),
+                item.get("acgs-bangumi-data-id", ""),
+            ),
+        ),
+        anime_name=anime_name,
+        source_image_url=source_image_url,
+        premiere_date=premiere_date,
+        premiere_time=premiere_time,
+        story=story or "暫無簡介",
+    )
+
+
+def _parse_document_lxml(document_html: str) -> list[AnimeCandidate | ItemParseError]:
+    return _parse_card_elements(
+        _LXML_CARDS(lxml.html.document_fromstring(document_html))
+    )
+
+
+def _parse_card_elements(
+    cards: list[etree._Element],
+) -> list[AnimeCandidate | ItemParseError]:
+    if not cards:
+        raise ItemParseError(
+            f"No anime cards matched the expected selector: {CARD_SELECTOR}"
+        )
+    results: list[AnimeCandidate | ItemParseError] = []
+    for card in cards:
+        try:
+            results.append(parse_card_element(card))
+        except ItemParseError as exc:
+            results.append(exc)
+    return results
+
+
+def _has_classes(element: etree._Element, *class_names: str) -> bool:
+    classes = str(element.get("class", "")).split()
+    return all(name in classes for name in class_names)
+
+
+def _in_card_list(element: etree._Element) -> bool:
+    return any(
+        ancestor.get("id") == "acgs-anime-list"
+        for ancestor in element.iterancestors("div")
+    )
+
+
+class StreamingCardParser:
+    """Parse a quarter page fed as byte chunks, one card at a time.
+
+    Cards are parsed with the lxml backend as soon as their closing tag
+    arrives and are then cleared, so neither the decoded page nor its full
+    tree is kept. ``card_set_sha256`` matches ``fingerprint_document`` once
+    the page is closed. A streamed page has no document digest.
+    """
+
+    def __init__(self) -> None:
+        self._parser = etree.HTMLPullParser(
+            events=("end",),
+            tag="div",
+            encoding="utf-8",
+        )
+        self._card_digests: list[str] = []
+        self._closed = False
+
+    @property
+    def card_count(self) -> int:
+        return len(self._card_digests)
+
+    @property
+    def card_set_sha256(self) -> str:
+        if not self._closed:
+            raise RuntimeError("Card set digest is only known after close()")
+        digests = "\n".join(sorted(self._card_digests))
+        return hashlib.sha256(digests.encode("ascii")).hexdigest()
+
+    def feed(self, chunk: bytes) -> list[AnimeCandidate | ItemParseError]:
+        self._parser.feed(chunk)
+        return self._completed_cards()
+
+    def close(self) -> list[AnimeCandidate | ItemParseError]:
+        self._parser.close()
+        results = self._completed_cards()
+        self._closed = True
+        if not self._card_digests:
+            raise ItemParseError(
+                f"No anime cards matched the expected selector: {CARD_SELECTOR}"
+            )
+        return results
+
+    def _completed_cards(self) -> list[AnimeCandidate | ItemParseError]:
+        results: list[AnimeCandidate | ItemParseError] = []
+        for _event, element in self._parser.read_events():
+            if not (
+                _has_classes(element, "acgs-anime-block", "CV-search")
+                and _in_card_list(element)
+            ):
+                continue
+            self._card_digests.append(
+                hashlib.sha256(_canonical_element(element).encode("utf-8")).hexdigest()
+            )
+            try:
+                results.append(parse_card_element(element))
+            except ItemParseError as exc:
+                results.append(exc)
+            self._release(element)
+        return results
+
+    @staticmethod
+    def _release(card: etree._Element) -> None:
+        # Drop the parsed card and everything before it; its tail may still
+        # be arriving, so the element itself stays attached until next time.
+        card.clear(keep_tail=True)
+        parent = card.getparent()
+        if parent is not None:
+            while card.getprevious() is not None:
+                del parent[0]
+
+
+def iter_streamed_cards(
+    chunks: Iterable[bytes],
+    parser: StreamingCardParser | None = None,
+) -> Iterator[AnimeCandidate | ItemParseError]:
+    """Yield cards in source order while ``chunks`` is still being read."""
+
+    parser = parser or StreamingCardParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+PARSER_BACKENDS: dict[str, Callable[[str], list[AnimeCandidate | ItemParseError]]] = {
+    "bs4": _parse_document_bs4,
+    "lxml": _parse_document_lxml,
+}
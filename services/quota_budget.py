@@ -0,0 +1,121 @@
+"""Run-scoped Cloudinary quota tracking between Admin API usage calls."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from services.errors import ImageStoreError, QuotaExceededError
+
+# Cloudinary bills one credit per GB of storage or per 1,000 transformations.
+BYTES_PER_CREDIT = 1024**3
+# Each upload is assumed to cost one derived f_auto/q_auto delivery variant.
+CREDITS_PER_UPLOAD = 1 / 1000
+
+
+@dataclass(frozen=True)
+class QuotaStats:
+    refreshes: int
+    uploads: int
+    uploaded_bytes: int
+    estimated_percent: float | None
+
+
+class QuotaBudget:
+    """Fetch Cloudinary usage once per run and estimate it locally afterwards.
+
+    ``check`` calls ``usage`` only for the first check and again once
+    ``refresh_after_uploads`` uploads have been recorded since the last
+    snapshot. In between, the uploads and bytes recorded for this run are
+    converted to credits and added to the snapshot. Any usage error or
+    missing field fails closed, and nothing is cached until a fetch succeeds.
+    """
+
+    def __init__(
+        self,
+        usage: Callable[[], Mapping[str, Any]],
+        *,
+        limit_percent: float,
+        refresh_after_uploads: int,
+    ) -> None:
+        self._usage = usage
+        self.limit_percent = limit_percent
+        self.refresh_after_uploads = refresh_after_uploads
+        self._lock = threading.Lock()
+        self._used_percent: float | None = None
+        self._credit_limit: float | None = None
+        self._pending_uploads = 0
+        self._pending_bytes = 0
+        self._refreshes = 0
+        self._uploads = 0
+        self._uploaded_bytes = 0
+
+    def record_upload(self, size_bytes: int) -> None:
+        with self._lock:
+            self._pending_uploads += 1
+            self._pending_bytes += size_bytes
+            self._uploads += 1
+            self._uploaded_bytes += size_bytes
+
+    def stats(self) -> QuotaStats:
+        with self._lock:
+            return QuotaStats(
+                refreshes=self._refreshes,
+                uploads=self._uploads,
+                uploaded_bytes=self._uploaded_bytes,
+                estimated_percent=self._estimated_percent(),
+            )
+
+    def check(self) -> None:
+        """Raise QuotaExceededError once estimated usage reaches the limit."""
+
+        with self._lock:
+            if (
+                self._used_percent is None
+                or self._pending_uploads >= self.refresh_after_uploads
+            ):
+                self._refresh()
+            used_percent = self._estimated_percent()
+        assert used_percent is not None
+        if used_percent >= self.limit_percent:
+            raise QuotaExceededError(
+                "Cloudinary quota is at "
+                f"{used_percent:.2f}%; automatic deletion is disabled. "
+                "Run the manual retention dry-run after reviewing references."
+            )
+
+    def _refresh(self) -> None:
+        try:
+            usage_data = self._usage()
+        except Exception as exc:
+            raise ImageStoreError(
+                f"Unable to verify Cloudinary quota safely: {exc}"
+            ) from exc
+
+        credits = usage_data.get("credits", {})
+        used_percent = credits.get("used_percent")
+        if used_percent is None:
+            raise ImageStoreError(
+                "Cloudinary usage response omitted credits.used_percent"
+            )
+        limit = credits.get("limit")
+        self._used_percent = float(used_percent)
+        self._credit_limit = float(limit) if limit else None
+        self._pending_uploads = 0
+        self._pending_bytes = 0
+        self._refreshes += 1
+
+    def _estimated_percent(self) -> float | None:
+        if self._used_percent is None:
+            return None
+        if not self._credit_limit:
+            # Without a credit limit the snapshot cannot be extrapolated, so
+            # the refresh interval alone bounds how stale it gets.
+            return self._used_percent
+        credits = (
+            self._pending_bytes / BYTES_PER_CREDIT
+            + self._pending_uploads * CREDITS_PER_UPLOAD
+        )
+        return self._used_percent + credits / self._credit_limit * 100
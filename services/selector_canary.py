@@ -9,7 +9,7 @@ from typing import Protocol
 from models import TAIPEI_TZ
 from services.errors import ItemParseError, SelectorCanaryError
 from services.http_client import SourceClient
-from services.parser import extract_item_html, parse_anime_item
+from services.parser import parse_document
 from services.settings import CrawlerSettings
 
 
@@ -51,20 +51,21 @@ def run_selector_canary(
 
     source_url, document_html = client.fetch_quarter_html(year, season)
     try:
-        item_html_list = extract_item_html(document_html)
+        candidates = parse_document(
+            document_html,
+            backend=runtime_settings.parser_backend,
+        )
     except ItemParseError as exc:
         raise SelectorCanaryError(
             "Source card selector matched no anime cards"
         ) from exc
     bangumi_ids: set[str] = set()
 
-    for index, item_html in enumerate(item_html_list):
-        try:
-            candidate = parse_anime_item(item_html)
-        except ItemParseError as exc:
+    for index, candidate in enumerate(candidates):
+        if isinstance(candidate, ItemParseError):
             raise SelectorCanaryError(
-                f"Source selector contract failed at card {index}: {exc}"
-            ) from exc
+                f"Source selector contract failed at card {index}: {candidate}"
+            ) from candidate
         if candidate.bangumi_id in bangumi_ids:
             raise SelectorCanaryError(
                 f"Source selector contract returned a duplicate bangumi_id at card {index}"
@@ -75,5 +76,5 @@ def run_selector_canary(
         year=year,
         season=season,
         source_url=source_url,
-        card_count=len(item_html_list),
+        card_count=len(candidates),
     )
@@ -9,6 +9,9 @@ from pathlib import Path
 from services.errors import ConfigurationError
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# CPU stages gain nothing from more workers than cores, and four is enough
+# to keep parsing and image verification off the critical path.
+DEFAULT_CPU_WORKERS = min(4, os.cpu_count() or 1)
 
 
 def _env_int(name: str, default: int) -> int:
@@ -31,6 +34,23 @@ def _env_float(name: str, default: float) -> float:
         raise ConfigurationError(f"{name} must be a number") from exc
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    value = raw.strip().lower()
+    if value not in {"true", "false"}:
+        raise ConfigurationError(f"{name} must be true or false")
+    return value == "true"
+
+
+def _env_executor(name: str) -> str:
+    value = os.getenv(name, "").strip().lower() or "thread"
+    if value not in {"thread", "process"}:
+        raise ConfigurationError(f"{name} must be thread or process")
+    return value
+
+
 @dataclass(frozen=True)
 class ProjectPaths:
     root: Path
@@ -42,6 +62,27 @@ class ProjectPaths:
     cache_file: Path
     cloudflare_headers_file: Path
 
+    @property
+    def state_dir(self) -> Path:
+        """Untracked local crawler state that is safe to delete at any time."""
+        return self.root / ".crawler-state"
+
+    @property
+    def source_state_file(self) -> Path:
+        return self.state_dir / "source_state.json"
+
+    @property
+    def original_store_dir(self) -> Path:
+        return self.state_dir / "originals"
+
+    @property
+    def cache_database_file(self) -> Path:
+        return self.state_dir / "cloudinary_cache.sqlite3"
+
+    @property
+    def cache_packed_file(self) -> Path:
+        return self.state_dir / "cloudinary_cache.packed"
+
     @classmethod
     def from_environment(cls) -> ProjectPaths:
         root = PROJECT_ROOT
@@ -77,6 +118,34 @@ class CrawlerSettings:
     maximum_parse_failure_ratio: float
     maximum_fallback_id_ratio: float
     cloudinary_quota_limit_percent: float
+    quarter_workers: int = 2
+    source_conditional_fetch: bool = True
+    parser_backend: str = "bs4"
+    source_streaming: bool = False
+    parse_executor: str = "thread"
+    image_cpu_executor: str = "thread"
+    cpu_workers: int = DEFAULT_CPU_WORKERS
+    crawler_engine: str = "threads"
+    async_image_concurrency: int = 64
+    dns_cache_ttl_seconds: float = 300.0
+    dns_negative_ttl_seconds: float = 30.0
+    cloudinary_quota_refresh_uploads: int = 50
+    image_download_workers: int = 8
+    image_upload_workers: int = 4
+    image_inflight_max_bytes: int = 128 * 1024 * 1024
+    image_full_verify_rate: float = 0.1
+    image_normalize: bool = False
+    image_max_edge: int = 1600
+    image_encode_format: str = "webp"
+    image_encode_quality: int = 82
+    image_original_store: bool = False
+    image_original_store_max_bytes: int = 512 * 1024 * 1024
+    cache_backend: str = "json"
+    cache_journal: bool = False
+    cache_journal_compact_operations: int = 5000
+    cache_packed_snapshot: bool = False
+    cache_checkpoint_items: int = 20
+    cache_checkpoint_seconds: float = 30.0
 
     @classmethod
     def from_environment(cls) -> CrawlerSettings:
@@ -102,6 +171,25 @@ class CrawlerSettings:
             image_max_bytes=_env_int("IMAGE_MAX_BYTES", 10 * 1024 * 1024),
             image_max_pixels=_env_int("IMAGE_MAX_PIXELS", 40_000_000),
             image_allowed_hosts=allowed_hosts,
+            image_full_verify_rate=_env_float("IMAGE_FULL_VERIFY_SAMPLE_RATE", 0.1),
+            image_normalize=_env_bool("IMAGE_NORMALIZE", False),
+            image_max_edge=_env_int("IMAGE_MAX_EDGE", 1600),
+            image_encode_format=(
+                os.getenv("IMAGE_ENCODE_FORMAT", "").strip().lower() or "webp"
+            ),
+            image_encode_quality=_env_int("IMAGE_ENCODE_QUALITY", 82),
+            image_original_store=_env_bool("IMAGE_ORIGINAL_STORE", False),
+            image_original_store_max_bytes=_env_int(
+                "IMAGE_ORIGINAL_STORE_MAX_BYTES", 512 * 1024 * 1024
+            ),
+            cache_backend=os.getenv("CACHE_BACKEND", "").strip().lower() or "json",
+            cache_journal=_env_bool("CACHE_JOURNAL", False),
+            cache_journal_compact_operations=_env_int(
+                "CACHE_JOURNAL_COMPACT_OPERATIONS", 5000
+            ),
+            cache_packed_snapshot=_env_bool("CACHE_PACKED_SNAPSHOT", False),
+            cache_checkpoint_items=_env_int("CACHE_CHECKPOINT_ITEMS", 20),
+            cache_checkpoint_seconds=_env_float("CACHE_CHECKPOINT_SECONDS", 30.0),
             minimum_count_ratio=_env_float("QUALITY_MIN_COUNT_RATIO", 0.70),
             maximum_parse_failure_ratio=_env_float(
                 "QUALITY_MAX_PARSE_FAILURE_RATIO", 0.0
@@ -110,9 +198,40 @@ class CrawlerSettings:
             cloudinary_quota_limit_percent=_env_float(
                 "CLOUDINARY_QUOTA_LIMIT_PERCENT", 90.0
             ),
+            cloudinary_quota_refresh_uploads=_env_int(
+                "CLOUDINARY_QUOTA_REFRESH_UPLOADS", 50
+            ),
+            quarter_workers=_env_int("CRAWLER_QUARTER_WORKERS", 2),
+            image_download_workers=_env_int("CRAWLER_DOWNLOAD_WORKERS", 8),
+            image_upload_workers=_env_int("CRAWLER_UPLOAD_WORKERS", 4),
+            image_inflight_max_bytes=_env_int(
+                "IMAGE_INFLIGHT_MAX_BYTES", 128 * 1024 * 1024
+            ),
+            source_conditional_fetch=_env_bool("SOURCE_CONDITIONAL_FETCH", True),
+            parser_backend=os.getenv("PARSER_BACKEND", "bs4").strip().lower() or "bs4",
+            source_streaming=_env_bool("SOURCE_STREAMING", False),
+            parse_executor=_env_executor("CRAWLER_PARSE_EXECUTOR"),
+            image_cpu_executor=_env_executor("CRAWLER_IMAGE_CPU_EXECUTOR"),
+            cpu_workers=_env_int("CRAWLER_CPU_WORKERS", DEFAULT_CPU_WORKERS),
+            crawler_engine=os.getenv("CRAWLER_ENGINE", "").strip().lower() or "threads",
+            async_image_concurrency=_env_int("CRAWLER_ASYNC_IMAGE_CONCURRENCY", 64),
+            dns_cache_ttl_seconds=_env_float("IMAGE_DNS_TTL_SECONDS", 300.0),
+            dns_negative_ttl_seconds=_env_float("IMAGE_DNS_NEGATIVE_TTL_SECONDS", 30.0),
         )
         if settings.max_workers < 1 or settings.max_workers > 8:
             raise ConfigurationError("CRAWLER_MAX_WORKERS must be between 1 and 8")
+        if settings.quarter_workers < 1 or settings.quarter_workers > 4:
+            raise ConfigurationError("CRAWLER_QUARTER_WORKERS must be between 1 and 4")
+        if not 1 <= settings.image_download_workers <= 32:
+            raise ConfigurationError(
+                "CRAWLER_DOWNLOAD_WORKERS must be between 1 and 32"
+            )
+        if not 1 <= settings.image_upload_workers <= 16:
+            raise ConfigurationError("CRAWLER_UPLOAD_WORKERS must be between 1 and 16")
+        if settings.image_inflight_max_bytes < settings.image_max_bytes:
+            raise ConfigurationError(
+                "IMAGE_INFLIGHT_MAX_BYTES must be at least IMAGE_MAX_BYTES"
+            )
         if not 0 < settings.minimum_count_ratio <= 1:
             raise ConfigurationError(
                 "QUALITY_MIN_COUNT_RATIO must be greater than 0 and at most 1"
@@ -125,8 +244,56 @@ class CrawlerSettings:
             raise ConfigurationError(
                 "QUALITY_MAX_FALLBACK_ID_RATIO must be at least 0 and below 1"
             )
+        if settings.cpu_workers < 1 or settings.cpu_workers > 32:
+            raise ConfigurationError("CRAWLER_CPU_WORKERS must be between 1 and 32")
+        if settings.crawler_engine not in {"threads", "asyncio"}:
+            raise ConfigurationError("CRAWLER_ENGINE must be threads or asyncio")
+        if not 1 <= settings.async_image_concurrency <= 512:
+            raise ConfigurationError(
+                "CRAWLER_ASYNC_IMAGE_CONCURRENCY must be between 1 and 512"
+            )
+        if not 1 <= settings.cloudinary_quota_refresh_uploads <= 10_000:
+            raise ConfigurationError(
+                "CLOUDINARY_QUOTA_REFRESH_UPLOADS must be between 1 and 10000"
+            )
+        if not 0 <= settings.dns_cache_ttl_seconds <= 3600:
+            raise ConfigurationError("IMAGE_DNS_TTL_SECONDS must be between 0 and 3600")
+        if not 0 <= settings.dns_negative_ttl_seconds <= 600:
+            raise ConfigurationError(
+                "IMAGE_DNS_NEGATIVE_TTL_SECONDS must be between 0 and 600"
+            )
+        if settings.parser_backend not in {"bs4", "lxml"}:
+            raise ConfigurationError("PARSER_BACKEND must be bs4 or lxml")
         if not settings.image_allowed_hosts:
             raise ConfigurationError("IMAGE_ALLOWED_HOSTS may not be empty")
+        if not 0 <= settings.image_full_verify_rate <= 1:
+            raise ConfigurationError(
+                "IMAGE_FULL_VERIFY_SAMPLE_RATE must be between 0 and 1"
+            )
+        if not 64 <= settings.image_max_edge <= 8192:
+            raise ConfigurationError("IMAGE_MAX_EDGE must be between 64 and 8192")
+        if settings.image_encode_format not in {"webp", "avif", "jpeg"}:
+            raise ConfigurationError("IMAGE_ENCODE_FORMAT must be webp, avif, or jpeg")
+        if not 1 <= settings.image_encode_quality <= 100:
+            raise ConfigurationError("IMAGE_ENCODE_QUALITY must be between 1 and 100")
+        if settings.image_original_store_max_bytes < settings.image_max_bytes:
+            raise ConfigurationError(
+                "IMAGE_ORIGINAL_STORE_MAX_BYTES must be at least IMAGE_MAX_BYTES"
+            )
+        if settings.cache_backend not in {"json", "sqlite"}:
+            raise ConfigurationError("CACHE_BACKEND must be json or sqlite")
+        if not 1 <= settings.cache_journal_compact_operations <= 1_000_000:
+            raise ConfigurationError(
+                "CACHE_JOURNAL_COMPACT_OPERATIONS must be between 1 and 1000000"
+            )
+        if not 0 <= settings.cache_checkpoint_items <= 10_000:
+            raise ConfigurationError(
+                "CACHE_CHECKPOINT_ITEMS must be between 0 and 10000"
+            )
+        if not 0 <= settings.cache_checkpoint_seconds <= 3600:
+            raise ConfigurationError(
+                "CACHE_CHECKPOINT_SECONDS must be between 0 and 3600"
+            )
         if not 1 <= settings.image_max_pixels <= 100_000_000:
             raise ConfigurationError("IMAGE_MAX_PIXELS must be between 1 and 100000000")
         return settings
@@ -0,0 +1,169 @@
+"""Coalesce concurrent calls that would do the same work for the same key."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True)
+class SingleFlightStats:
+    """``leaders`` did the work, ``waits`` joined an in-flight call, and
+    ``hits`` are the joined calls that received the leader's result."""
+
+    leaders: int
+    waits: int
+    hits: int
+
+
+class _Call(Generic[_T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: _T | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight(Generic[_T]):
+    """Let one caller per key run a function while concurrent callers wait.
+
+    Followers share the leader's result or exception; nothing is cached once
+    the call finishes. Thread callers use ``do``, or ``submit`` when the work
+    already completes on a Future. Coroutines use ``do_async``, which only
+    coalesces callers on the same event loop.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call[_T]] = {}
+        self._submitted: dict[str, Future[_T]] = {}
+        self._async_calls: dict[tuple[int, str], asyncio.Future[_T]] = {}
+        self._leaders = 0
+        self._waits = 0
+        self._hits = 0
+
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return SingleFlightStats(self._leaders, self._waits, self._hits)
+
+    def do(self, key: str, function: Callable[[], _T]) -> _T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._leaders += 1
+            else:
+                self._waits += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            with self._lock:
+                self._hits += 1
+            return call.result  # type: ignore[return-value]
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def submit(self, key: str, start: Callable[[], Future[_T]]) -> Future[_T]:
+        """Like ``do`` for work that ``start`` hands off; never waits on it.
+
+        Every caller gets its own Future, so cancelling one leaves the shared
+        work and the other callers alone.
+        """
+
+        with self._lock:
+            shared = self._submitted.get(key)
+            leader = shared is None
+            if shared is None:
+                shared = self._submitted[key] = Future()
+                self._leaders += 1
+            else:
+                self._waits += 1
+
+        caller: Future[_T] = Future()
+
+        def deliver(done: Future[_T]) -> None:
+            if not caller.set_running_or_notify_cancel():
+                return
+            error = done.exception()
+            if error is not None:
+                caller.set_exception(error)
+                return
+            if not leader:
+                with self._lock:
+                    self._hits += 1
+            caller.set_result(done.result())
+
+        shared.add_done_callback(deliver)
+        if not leader:
+            return caller
+
+        def finish(done: Future[_T]) -> None:
+            with self._lock:
+                del self._submitted[key]
+            error = done.exception()
+            if error is not None:
+                shared.set_exception(error)
+            else:
+                shared.set_result(done.result())
+
+        try:
+            started = start()
+        except BaseException as exc:
+            with self._lock:
+                del self._submitted[key]
+            shared.set_exception(exc)
+            raise
+        started.add_done_callback(finish)
+        return caller
+
+    async def do_async(self, key: str, function: Callable[[], Awaitable[_T]]) -> _T:
+        loop = asyncio.get_running_loop()
+        scoped_key = (id(loop), key)
+        with self._lock:
+            future = self._async_calls.get(scoped_key)
+            leader = future is None
+            if future is None:
+                future = self._async_calls[scoped_key] = loop.create_future()
+                self._leaders += 1
+            else:
+                self._waits += 1
+
+        if not leader:
+            result = await asyncio.shield(future)
+            with self._lock:
+                self._hits += 1
+            return result
+
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception retrieved; the leader re-raises it below.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._async_calls[scoped_key]
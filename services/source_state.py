@@ -0,0 +1,83 @@
+"""Persisted per-quarter source fingerprint ledger used to skip unchanged pages.
+
+The ledger is a disposable local optimization. A missing or unreadable file
+only means the next crawl downloads every quarter in full again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from services.atomic_io import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SourceFingerprint:
+    """HTTP validators and digests for one successfully crawled source page.
+
+    ``document_sha256`` covers the normalized card list and ``card_set_sha256``
+    the order-free set of cards, so cosmetic page changes still match.
+    ``data_sha256`` binds the fingerprint to the exact quarterly JSON produced
+    from that page, so a reverted or hand-edited data file is never reused.
+    """
+
+    body_sha256: str
+    etag: str | None = None
+    last_modified: str | None = None
+    document_sha256: str | None = None
+    card_set_sha256: str | None = None
+    data_sha256: str | None = None
+
+
+class SourceStateRepository:
+    """Thread-safe, atomic store of source fingerprints keyed by quarter URL."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.RLock()
+        self._entries = self._load()
+        self._dirty = False
+
+    def _load(self) -> dict[str, SourceFingerprint]:
+        if not self.path.exists():
+            return {}
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+            if not isinstance(raw, dict):
+                raise TypeError("source state must be a JSON object")
+            return {
+                str(url): SourceFingerprint(**values) for url, values in raw.items()
+            }
+        except (OSError, ValueError, TypeError) as exc:
+            logger.warning("Ignoring unreadable source state %s: %s", self.path, exc)
+            return {}
+
+    def get(self, url: str) -> SourceFingerprint | None:
+        with self._lock:
+            return self._entries.get(url)
+
+    def record(self, url: str, fingerprint: SourceFingerprint) -> None:
+        with self._lock:
+            if self._entries.get(url) != fingerprint:
+                self._entries[url] = fingerprint
+                self._dirty = True
+
+    def save_if_changed(self) -> bool:
+        with self._lock:
+            if not self._dirty:
+                return False
+            atomic_write_json(
+                self.path,
+                {
+                    url: asdict(fingerprint)
+                    for url, fingerprint in sorted(self._entries.items())
+                },
+            )
+            self._dirty = False
+            return True
@@ -0,0 +1,211 @@
+"""SQLite-backed Cloudinary cache with the same contract as the JSON repository.
+
+The database is a local working copy under ``.crawler-state``; the committed
+``cloudinary_cache.json`` stays canonical. The database is imported from the
+JSON whenever the JSON changed since the last sync, and ``compact`` exports
+it back in the exact byte layout ``CacheRepository`` writes, so retention
+receipts that hash the cache file are unaffected by the backend choice.
+Entries keep their insertion order through an explicit position column.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+from services.atomic_io import atomic_write_json
+from services.cache_repository import (
+    CacheRepository,
+    cache_journal_path,
+    validated_managed_public_ids,
+)
+from services.errors import DataContractError
+from services.image_placeholder import metadata_key
+from services.retention import cloudinary_public_id_from_url
+from services.settings import ProjectPaths
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    position INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    value TEXT NOT NULL,
+    public_id TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_public_id ON entries (public_id)
+    WHERE public_id IS NOT NULL;
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SqliteCacheRepository:
+    """Cache rows in a WAL-mode SQLite file, indexed by key and public ID.
+
+    ``save_if_changed`` commits the open transaction, so a checkpoint costs
+    the rows written since the previous one. The ``dirty`` marker records
+    rows not yet exported to JSON; opening refuses to discard them when the
+    JSON has also changed underneath.
+    """
+
+    def __init__(self, database_path: Path, json_path: Path) -> None:
+        self.database_path = database_path
+        self.json_path = json_path
+        self._lock = threading.RLock()
+        self._pending = 0
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._synchronize_with_json()
+
+    @classmethod
+    def from_paths(cls, paths: ProjectPaths) -> SqliteCacheRepository:
+        return cls(paths.cache_database_file, paths.cache_file)
+
+    def _meta(self, name: str) -> str | None:
+        row = self._connection.execute(
+            "SELECT value FROM meta WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name: str, value: str) -> None:
+        self._connection.execute(
+            "INSERT INTO meta (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+            (name, value),
+        )
+
+    def _json_signature(self) -> str:
+        """Hash the JSON snapshot and any journal a JSON run left behind."""
+
+        digest = hashlib.sha256()
+        for path in (self.json_path, cache_journal_path(self.json_path)):
+            digest.update(path.read_bytes() if path.exists() else b"")
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _synchronize_with_json(self) -> None:
+        signature = self._json_signature()
+        if self._meta("json_signature") == signature:
+            return
+        if self._meta("dirty") == "1":
+            raise DataContractError(
+                f"{self.database_path} has changes not exported to "
+                f"{self.json_path}, which changed since the last sync; export "
+                "them with a run on the old JSON or delete the database"
+            )
+        self.import_json(CacheRepository(self.json_path).snapshot())
+        self._set_meta("json_signature", signature)
+        self._connection.commit()
+
+    def import_json(self, data: dict[str, str]) -> None:
+        """Replace every row with ``data``, keeping its order."""
+
+        with self._lock:
+            self._connection.execute("DELETE FROM entries")
+            self._connection.executemany(
+                "INSERT INTO entries (key, value, public_id) VALUES (?, ?, ?)",
+                (
+                    (key, value, cloudinary_public_id_from_url(value))
+                    for key, value in data.items()
+                ),
+            )
+            self._set_meta("dirty", "0")
+            self._connection.commit()
+            self._pending = 0
+
+    def export_json(self, path: Path | None = None) -> None:
+        """Write the rows as ``CacheRepository`` would write the same mapping."""
+
+        atomic_write_json(path or self.json_path, self.snapshot())
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            if self.get(key) == value:
+                return
+            # Updating in place keeps the row's position, like a dict does.
+            self._connection.execute(
+                "INSERT INTO entries (key, value, public_id) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "value = excluded.value, public_id = excluded.public_id",
+                (key, value, cloudinary_public_id_from_url(value)),
+            )
+            self._mark_changed(1)
+
+    def _mark_changed(self, count: int) -> None:
+        if not self._pending:
+            self._set_meta("dirty", "1")
+        self._pending += count
+
+    def snapshot(self) -> dict[str, str]:
+        with self._lock:
+            return dict(
+                self._connection.execute(
+                    "SELECT key, value FROM entries ORDER BY position"
+                )
+            )
+
+    def urls_with_public_ids(self, public_ids: Iterable[str]) -> set[str]:
+        """Return cached URLs that still reference any requested public ID."""
+
+        targets = validated_managed_public_ids(public_ids)
+        with self._lock:
+            return {
+                value
+                for public_id in targets
+                for (value,) in self._connection.execute(
+                    "SELECT value FROM entries WHERE public_id = ?", (public_id,)
+                )
+            }
+
+    def remove_urls_with_public_ids(self, public_ids: Iterable[str]) -> int:
+        """Remove entries for the given assets, including their image metadata."""
+
+        targets = validated_managed_public_ids(public_ids)
+        removed = 0
+        with self._lock:
+            for public_id in targets:
+                removed += self._connection.execute(
+                    "DELETE FROM entries WHERE public_id = ? OR key = ?",
+                    (public_id, metadata_key(public_id)),
+                ).rowcount
+            if removed:
+                self._mark_changed(removed)
+            return removed
+
+    def save_if_changed(self) -> bool:
+        """Commit the rows written since the last checkpoint."""
+
+        with self._lock:
+            if not self._pending:
+                return False
+            self._connection.commit()
+            self._pending = 0
+            return True
+
+    def compact(self) -> bool:
+        """Export unexported rows to the canonical JSON and mark them synced."""
+
+        with self._lock:
+            self.save_if_changed()
+            if self._meta("dirty") != "1":
+                return False
+            self.export_json()
+            cache_journal_path(self.json_path).unlink(missing_ok=True)
+            self._set_meta("json_signature", self._json_signature())
+            self._set_meta("dirty", "0")
+            self._connection.commit()
+            return True
@@ -0,0 +1,93 @@
+"""Per-stage choice between in-thread and process-pool execution.
+
+Network work always stays on crawler threads. CPU-bound stages can
+instead hand their pure, picklable work to one shared process pool so they
+scale with cores rather than with the GIL.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from collections.abc import Callable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from typing import ParamSpec, TypeVar
+
+from services.settings import CrawlerSettings
+
+CPU_STAGES = ("parse", "image")
+EXECUTOR_KINDS = ("thread", "process")
+
+_P = ParamSpec("_P")
+_T = TypeVar("_T")
+
+
+class StageExecutor:
+    """Run CPU stage functions inline or in a lazily started process pool.
+
+    ``"thread"`` runs the function on the calling thread, which is already a
+    crawler worker. ``"process"`` submits it to a spawn-context process pool
+    shared by every process stage and blocks that worker until it returns.
+    Functions and arguments for process stages must be picklable, so every
+    stage function is a pure module-level function; memoryview arguments are
+    copied to bytes for the trip to the worker.
+    """
+
+    def __init__(
+        self,
+        stages: Mapping[str, str] | None = None,
+        *,
+        max_workers: int = 1,
+    ) -> None:
+        self.stages = {stage: "thread" for stage in CPU_STAGES}
+        for stage, kind in (stages or {}).items():
+            if stage not in CPU_STAGES:
+                raise ValueError(f"Unknown CPU stage: {stage}")
+            if kind not in EXECUTOR_KINDS:
+                raise ValueError(f"Unsupported executor for {stage}: {kind}")
+            self.stages[stage] = kind
+        self.max_workers = max_workers
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @classmethod
+    def from_settings(cls, settings: CrawlerSettings) -> StageExecutor:
+        return cls(
+            {"parse": settings.parse_executor, "image": settings.image_cpu_executor},
+            max_workers=settings.cpu_workers,
+        )
+
+    def run(
+        self,
+        stage: str,
+        function: Callable[_P, _T],
+        *args: _P.args,
+        **kwargs: _P.kwargs,
+    ) -> _T:
+        if stage not in self.stages:
+            raise ValueError(f"Unknown CPU stage: {stage}")
+        if self.stages[stage] == "thread":
+            return function(*args, **kwargs)
+        args = tuple(  # type: ignore[assignment]
+            bytes(arg) if isinstance(arg, memoryview) else arg for arg in args
+        )
+        return self._process_pool().submit(function, *args, **kwargs).result()
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Stage executor is closed")
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
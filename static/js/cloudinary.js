@@ -0,0 +1,34 @@
+// Cloudinary 寬度變體：寬度清單由 services/cloudinary_urls.py 經 #app-config 提供
+const CLOUDINARY_UPLOAD_PATH = /\/image\/upload\/(?:c_limit,w_\d+\/)?/;
+
+function isCloudinaryUpload(url) {
+    if (typeof url !== 'string') return false;
+    let parsed;
+    try {
+        parsed = new URL(url);
+    } catch (e) {
+        return false;
+    }
+    return parsed.protocol === 'https:' &&
+        parsed.host === 'res.cloudinary.com' &&
+        parsed.pathname.includes('/image/upload/');
+}
+
+function cloudinaryVariant(url, width) {
+    if (!isCloudinaryUpload(url)) return url;
+    const parsed = new URL(url);
+    parsed.pathname = parsed.pathname.replace(
+        CLOUDINARY_UPLOAD_PATH,
+        `/image/upload/c_limit,w_${width}/`
+    );
+    return parsed.toString();
+}
+
+function cloudinarySrcset(url, widths) {
+    if (!isCloudinaryUpload(url)) return '';
+    return widths.map(width => `${cloudinaryVariant(url, width)} ${width}w`).join(', ');
+}
+
+if (typeof module !== 'undefined') {
+    module.exports = { isCloudinaryUpload, cloudinaryVariant, cloudinarySrcset };
+}
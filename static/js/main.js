@@ -7,6 +7,7 @@ function readAppConfig() {
         defaultYear: element.dataset.defaultYear,
         defaultSeason: element.dataset.defaultSeason,
         buildVersion: element.dataset.buildVersion,
+        imageVariants: JSON.parse(element.dataset.imageVariants),
         availableData: JSON.parse(element.dataset.availableData)
     };
 }
@@ -19,6 +20,7 @@ function animeApp() {
         defaultYear: appConfig.defaultYear,
         defaultSeason: appConfig.defaultSeason,
         buildVersion: appConfig.buildVersion,
+        imageVariants: appConfig.imageVariants,
         years: [],
         seasons: [],
         
@@ -158,6 +160,29 @@ function animeApp() {
             return `https://ani.gamer.com.tw/search.php?keyword=${encodeURIComponent(name)}`;
         },
 
+        hasCoverImage(anime) {
+            return Boolean(anime.anime_image_url && anime.anime_image_url !== '無圖片');
+        },
+
+        cardImage(anime) {
+            if (!this.hasCoverImage(anime)) {
+                return 'https://placehold.co/300x450/333/999?text=No+Image';
+            }
+            return cloudinaryVariant(anime.anime_image_url, this.imageVariants.cardWidths[1]);
+        },
+
+        // 依欄寬讓瀏覽器挑選尺寸，手機不再下載原圖
+        cardSrcset(anime) {
+            if (!this.hasCoverImage(anime)) return '';
+            return cloudinarySrcset(anime.anime_image_url, this.imageVariants.cardWidths);
+        },
+
+        // 建置時產生的模糊預覽圖，封面載入前先顯示
+        cardPlaceholderStyle(anime) {
+            if (!anime.image_placeholder) return {};
+            return { backgroundImage: `url("${anime.image_placeholder}")` };
+        },
+
         // 🟢 修改：增加 shouldRestoreScroll 參數
         async loadData(shouldRestoreScroll = false) {
             if (!this.year || !this.season) return;
@@ -275,9 +300,13 @@ function animeApp() {
                 Swal.fire({toast: true, position: 'top', icon: 'warning', title: '已在清單中', timer: 1000, showConfirmButton: false, background: '#2b2b2b', color: '#fff'});
                 return;
             }
+            const hasImage = this.hasCoverImage(anime);
             this.shareList.push({
                 name: anime.anime_name,
-                img: (anime.anime_image_url && anime.anime_image_url !== '無圖片') ? anime.anime_image_url : 'https://placehold.co/50x50',
+                img: hasImage ? anime.anime_image_url : 'https://placehold.co/50x50',
+                thumb: hasImage
+                    ? cloudinaryVariant(anime.anime_image_url, this.imageVariants.thumbnailWidth)
+                    : 'https://placehold.co/50x50',
                 date: anime.premiere_date || '?',
                 time: anime.premiere_time || '?'
             });
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import io
 from collections.abc import Callable
 from pathlib import Path
 
 import pytest
+from PIL import Image
 
-from services.settings import ProjectPaths
+from services.settings import CrawlerSettings, ProjectPaths
 
 
 @pytest.fixture
@@ -51,3 +53,48 @@ def project_paths(tmp_path: Path) -> ProjectPaths:
         cache_file=root / "cloudinary_cache.json",
         cloudflare_headers_file=root / "_headers",
     )
+
+
+@pytest.fixture
+def crawler_settings() -> Callable[..., CrawlerSettings]:
+    def factory(**overrides: object) -> CrawlerSettings:
+        values: dict[str, object] = {
+            "source_base_url": "https://acgsecrets.hk/bangumi",
+            "source_user_agent": "crawler-tests/1.0",
+            "max_workers": 1,
+            "request_timeout_seconds": 3,
+            "image_timeout_seconds": 3,
+            "image_max_bytes": 1024 * 1024,
+            "image_max_pixels": 1_000_000,
+            "image_allowed_hosts": ("static.acgsecrets.hk",),
+            "minimum_count_ratio": 0.7,
+            "maximum_parse_failure_ratio": 0.0,
+            "maximum_fallback_id_ratio": 0.0,
+            "cloudinary_quota_limit_percent": 90.0,
+        }
+        values.update(overrides)
+        return CrawlerSettings(**values)  # type: ignore[arg-type]
+
+    return factory
+
+
+@pytest.fixture
+def encoded_image() -> Callable[..., bytes]:
+    """Save ``image``, or a solid ``mode`` image of ``size``, as bytes."""
+
+    def encode(
+        image: Image.Image | None = None,
+        image_format: str = "PNG",
+        *,
+        mode: str = "RGB",
+        size: tuple[int, int] = (8, 8),
+        color: object = "red",
+        **params: object,
+    ) -> bytes:
+        if image is None:
+            image = Image.new(mode, size, color)  # type: ignore[arg-type]
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, **params)
+        return buffer.getvalue()
+
+    return encode
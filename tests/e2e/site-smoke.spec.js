@@ -62,6 +62,7 @@ test('homepage loads data, filters records, and renders healthy images', async (
   const images = page.locator('.card-img');
   const imageCount = await images.count();
   expect(imageCount).toBeGreaterThan(0);
+  await expect(images.first()).toHaveAttribute('srcset', /c_limit,w_\d+\/.* \d+w/);
   for (let index = 0; index < Math.min(imageCount, 6); index += 1) {
     const image = images.nth(index);
     await image.scrollIntoViewIfNeeded();
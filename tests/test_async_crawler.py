@@ -0,0 +1,562 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+
+import services.async_crawler as async_crawler_module
+import services.image_store as image_store_module
+from benchmarks.parser_benchmark import synthetic_page
+from services.anime_service import AnimeCrawlerService
+from services.async_crawler import MAX_RETRY_AFTER_SECONDS, AsyncQuarterCrawler
+from services.async_http import (
+    AsyncHttpClient,
+    AsyncHttpError,
+    AsyncResponse,
+    ResponseHeaders,
+)
+from services.cache_repository import CacheRepository
+from services.errors import ImageStoreError
+from services.http_client import DownloadedImage, SessionPool, SourceClient
+from services.image_store import CloudinaryImageStore
+from services.settings import CrawlerSettings
+
+PUBLIC_ADDRESS = "93.184.216.34"
+UNREACHABLE = "93.184.216.35"
+
+
+@dataclass
+class _StandIn:
+    page: str
+    oversized: bool = False
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    paths: list[str] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _handler(
+    state: _StandIn,
+    encoded_image: Callable[..., bytes],
+) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            path = urlsplit(self.path).path
+            with state.lock:
+                state.paths.append(path)
+            if path == "/bangumi/202604/":
+                self._send(
+                    200,
+                    state.page.encode("utf-8"),
+                    {"Content-Type": "text/html; charset=utf-8", "ETag": '"q1"'},
+                )
+            elif path == "/img/bench/10000.jpg":
+                self._send(302, b"", {"Location": "/img/bench/moved-10000.jpg"})
+            elif path.startswith("/img/bench/"):
+                with state.lock:
+                    state.in_flight += 1
+                    state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+                time.sleep(0.02)
+                with state.lock:
+                    state.in_flight -= 1
+                seed = int(path.rsplit("-", 1)[-1].rsplit("/", 1)[-1].split(".")[0])
+                body = (
+                    b"\0" * (128 * 1024)
+                    if state.oversized
+                    else encoded_image(
+                        size=(2, 2), color=(seed % 256, seed // 256 % 256, 7)
+                    )
+                )
+                self._send(200, body, {"Content-Type": "image/png"})
+            else:
+                self._send(404, b"missing", {"Content-Type": "text/plain"})
+
+        def _send(self, status: int, body: bytes, headers: dict[str, str]) -> None:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+@pytest.fixture
+def stand_in(
+    encoded_image: Callable[..., bytes],
+) -> Iterator[tuple[_StandIn, int]]:
+    state = _StandIn(page=synthetic_page(12))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(state, encoded_image))
+    thread = threading.Thread(
+        target=server.serve_forever,
+        kwargs={"poll_interval": 0.05},
+        daemon=True,
+    )
+    thread.start()
+    try:
+        yield state, server.server_port
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def settings_for(
+    crawler_settings: Callable[..., CrawlerSettings],
+) -> Callable[..., CrawlerSettings]:
+    """Settings for crawling the stand-in listening on ``port``."""
+
+    def factory(port: int, **overrides: object) -> CrawlerSettings:
+        values: dict[str, object] = {
+            "source_base_url": f"http://127.0.0.1:{port}/bangumi",
+            "max_workers": 2,
+            "request_timeout_seconds": 5,
+            "image_timeout_seconds": 5,
+            "image_max_bytes": 64 * 1024,
+            "async_image_concurrency": 4,
+        }
+        values.update(overrides)
+        return crawler_settings(**values)
+
+    return factory
+
+
+@pytest.fixture(autouse=True)
+def _fake_cloudinary(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CLOUDINARY_CLOUD_NAME", "test-cloud")
+    monkeypatch.setenv("CLOUDINARY_API_KEY", "test-key")
+    monkeypatch.setenv("CLOUDINARY_API_SECRET", "test-secret")
+    monkeypatch.setattr(image_store_module.cloudinary, "config", lambda **kwargs: None)
+    monkeypatch.setattr(
+        image_store_module.cloudinary.api,
+        "usage",
+        lambda: {"credits": {"used_percent": 1}},
+    )
+    monkeypatch.setattr(
+        image_store_module.cloudinary.uploader,
+        "upload",
+        lambda payload, **kwargs: {"public_id": kwargs["public_id"]},
+    )
+    monkeypatch.setattr(
+        image_store_module.cloudinary.utils,
+        "cloudinary_url",
+        lambda public_id, **kwargs: (
+            f"https://res.cloudinary.com/test-cloud/image/upload/{public_id}.webp",
+            {},
+        ),
+    )
+
+
+class _LocalDownloader:
+    """Threaded-engine stand-in for SafeImageDownloader on plain local HTTP."""
+
+    def __init__(self, settings: CrawlerSettings, port: int) -> None:
+        self.port = port
+        self.sessions = SessionPool(settings)
+
+    def download(self, url: str) -> DownloadedImage:
+        response = requests.get(
+            f"http://127.0.0.1:{self.port}{urlsplit(url).path}", timeout=5
+        )
+        response.raise_for_status()
+        return DownloadedImage(
+            content=response.content,
+            content_type=response.headers["Content-Type"],
+            final_url=url,
+        )
+
+    def close(self) -> None:
+        self.sessions.close()
+
+
+def _service(
+    tmp_path: Path,
+    settings: CrawlerSettings,
+    name: str,
+    downloader: object | None = None,
+) -> AnimeCrawlerService:
+    cache = CacheRepository(tmp_path / f"{name}-cache.json")
+    return AnimeCrawlerService(
+        settings=settings,
+        source_client=SourceClient(settings),
+        image_store=CloudinaryImageStore(
+            settings,
+            cache,
+            downloader=downloader,  # type: ignore[arg-type]
+        ),
+        cache=cache,
+    )
+
+
+def _async_engine(
+    service: AnimeCrawlerService,
+    port: int,
+    *,
+    address: str = PUBLIC_ADDRESS,
+    unreachable: tuple[str, ...] = (),
+) -> tuple[AsyncQuarterCrawler, list[str]]:
+    connected: list[str] = []
+
+    async def open_local(
+        host: str, port_: int, **kwargs: object
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        connected.append(host)
+        if host in unreachable:
+            raise ConnectionRefusedError(f"{host} refused the connection")
+        return await asyncio.open_connection("127.0.0.1", port, limit=kwargs["limit"])
+
+    async def resolve(host: str) -> list[str]:
+        return [*unreachable, address]
+
+    engine = AsyncQuarterCrawler(
+        service,
+        http=AsyncHttpClient(
+            user_agent="crawler-tests/1.0", open_connection=open_local
+        ),
+        resolve=resolve,
+    )
+    return engine, connected
+
+
+def test_async_engine_matches_the_threaded_crawl_result(
+    tmp_path: Path,
+    stand_in: tuple[_StandIn, int],
+    settings_for: Callable[..., CrawlerSettings],
+) -> None:
+    state, port = stand_in
+    settings = settings_for(port)
+    threaded = _service(tmp_path, settings, "threads", _LocalDownloader(settings, port))
+    with threaded:
+        expected = threaded.fetch_quarter("2026", "春")
+    state.peak_in_flight = 0
+
+    service = _service(tmp_path, settings, "asyncio")
+    engine, connected = _async_engine(service, port)
+    with service:
+        result = engine.fetch_quarter("2026", "春")
+
+    assert result == expected
+    assert len(result.anime_list) == 12
+    assert result.fingerprint is not None and result.fingerprint.etag == '"q1"'
+    assert "/img/bench/moved-10000.jpg" in state.paths
+    assert connected.count(PUBLIC_ADDRESS) == 13
+    assert 1 < state.peak_in_flight <= settings.async_image_concurrency
+    assert service.cache.snapshot() == threaded.cache.snapshot()
+
+
+def test_service_dispatches_to_the_asyncio_engine(
+    tmp_path: Path,
+    stand_in: tuple[_StandIn, int],
+    settings_for: Callable[..., CrawlerSettings],
+) -> None:
+    _state, port = stand_in
+    settings = settings_for(port, crawler_engine="asyncio")
+    service = _service(tmp_path, settings, "dispatch")
+    service._async_engine, _connected = _async_engine(service, port)
+
+    with service:
+        result = service.fetch_quarter("2026", "春")
+
+    assert len(result.anime_list) == 12
+
+
+def test_async_engine_shares_the_image_downloader_dns_cache(
+    tmp_path: Path,
+    settings_for: Callable[..., CrawlerSettings],
+) -> None:
+    service = _service(tmp_path, settings_for(9), "dns")
+
+    with service:
+        assert service._async_engine.dns is service.image_store.downloader.dns
+
+
+def test_threaded_engine_keeps_downloading_while_uploads_stall(
+    tmp_path: Path,
+    stand_in: tuple[_StandIn, int],
+    monkeypatch: pytest.MonkeyPatch,
+    settings_for: Callable[..., CrawlerSettings],
+) -> None:
+    _state, port = stand_in
+    settings = settings_for(
+        port,
+        max_workers=1,
+        image_download_workers=4,
+        image_upload_workers=1,
+    )
+    service = _service(tmp_path, settings, "stalled", _LocalDownloader(settings, port))
+    uploads_released = threading.Event()
+
+    def stalled_upload(payload: object, **kwargs: object) -> dict[str, object]:
+        uploads_released.wait(timeout=10)
+        return {"public_id": kwargs["public_id"]}
+
+    monkeypatch.setattr(
+        image_store_module.cloudinary.uploader, "upload", stalled_upload
+    )
+    results: list[object] = []
+    crawl = threading.Thread(
+        target=lambda: results.append(service.fetch_quarter("2026", "春"))
+    )
+
+    with service:
+        crawl.start()
+        deadline = time.monotonic() + 5
+        pipeline = service.image_store.pipeline
+        while (
+            pipeline.stats().downloads <= settings.max_workers
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+        downloads_while_stalled = pipeline.stats().downloads
+        uploads_while_stalled = pipeline.stats().uploads
+        uploads_released.set()
+        crawl.join(timeout=10)
+
+    assert uploads_while_stalled == 0
+    assert downloads_while_stalled > settings.max_workers
+    assert len(results[0].anime_list) == 12  # type: ignore[attr-defined]
+
+
+@pytest.mark.parametrize(
+    ("address", "oversized", "message"),
+    [
+        ("127.0.0.1", False, "blocked address: 127.0.0.1"),
+        (PUBLIC_ADDRESS, True, "exceeds the configured size limit"),
+    ],
+)
+def test_async_engine_keeps_image_safety_limits(
+    tmp_path: Path,
+    stand_in: tuple[_StandIn, int],
+    address: str,
+    oversized: bool,
+    message: str,
+    settings_for: Callable[..., CrawlerSettings],
+) -> None:
+    state, port = stand_in
+    state.oversized = oversized
+    service = _service(tmp_path, settings_for(port), "x")
+    engine, _connected = _async_engine(service, port, address=address)
+
+    with service, pytest.raises(ImageStoreError, match=message):
+        engine.fetch_quarter("2026", "春")
+
+    assert service.cache.snapshot() == {}
+
+
+def test_async_engine_falls_back_to_the_next_validated_address(
+    tmp_path: Path,
+    stand_in: tuple[_StandIn, int],
+    settings_for: Callable[..., CrawlerSettings],
+) -> None:
+    _state, port = stand_in
+    service = _service(tmp_path, settings_for(port), "dial")
+    engine, connected = _async_engine(service, port, unreachable=(UNREACHABLE,))
+
+    with service:
+        result = engine.fetch_quarter("2026", "春")
+
+    assert len(result.anime_list) == 12
+    # The source page, then twelve covers plus one redirect hop.
+    assert connected == ["127.0.0.1", *[UNREACHABLE, PUBLIC_ADDRESS] * 13]
+
+
+def test_async_http_client_decodes_chunked_gzip_and_enforces_limits() -> None:
+    payload = gzip.compress(b"<html>" + b"x" * 5000 + b"</html>")
+    chunks = [payload[:100], payload[100:]]
+    chunked = b"".join(
+        f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n" for chunk in chunks
+    )
+    raw_response = (
+        b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n"
+        b"Content-Encoding: gzip\r\n\r\n" + chunked + b"0\r\n\r\n"
+    )
+
+    async def scenario() -> tuple[bytes, str]:
+        async def serve(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(raw_response)
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = AsyncHttpClient(user_agent="crawler-tests/1.0")
+        async with server:
+            response = await client.get(
+                f"http://127.0.0.1:{port}/page",
+                timeout=5,
+                max_bytes=6000,
+            )
+            with pytest.raises(AsyncHttpError, match="size limit"):
+                await client.get(
+                    f"http://127.0.0.1:{port}/page",
+                    timeout=5,
+                    max_bytes=1000,
+                )
+        return response.body, response.headers.get("Content-Encoding") or ""
+
+    body, encoding = asyncio.run(scenario())
+
+    assert body == b"<html>" + b"x" * 5000 + b"</html>"
+    assert encoding == "gzip"
+
+
+def test_async_engine_downloads_a_shared_cover_once(
+    tmp_path: Path,
+    stand_in: tuple[_StandIn, int],
+    settings_for: Callable[..., CrawlerSettings],
+) -> None:
+    state, port = stand_in
+    state.page = synthetic_page(4).replace("bench/10003.jpg", "bench/10002.jpg")
+    service = _service(tmp_path, settings_for(port), "dup")
+    engine, _connected = _async_engine(service, port)
+
+    with service:
+        result = engine.fetch_quarter("2026", "春")
+
+    by_id = {anime.bangumi_id: anime for anime in result.anime_list}
+    assert by_id["anime-10003"].anime_image_url == by_id["anime-10002"].anime_image_url
+    assert state.paths.count("/img/bench/10002.jpg") == 1
+    stats = service.image_store.single_flight_stats()
+    assert (stats.leaders, stats.waits, stats.hits) == (3, 1, 1)
+
+
+def test_async_http_client_quotes_request_targets_like_requests() -> None:
+    url = "http://127.0.0.1:{port}/img/封面 cover%20x.png?name=a b"
+    request_lines: list[bytes] = []
+
+    async def scenario() -> None:
+        async def serve(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            head = await reader.readuntil(b"\r\n\r\n")
+            request_lines.append(head.split(b"\r\n", 1)[0])
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = AsyncHttpClient(user_agent="crawler-tests/1.0")
+        async with server:
+            await client.get(url.format(port=port), timeout=5)
+
+    asyncio.run(scenario())
+
+    prepared = requests.Request("GET", url.format(port=1)).prepare()
+    target = prepared.path_url
+    assert request_lines == [f"GET {target} HTTP/1.1".encode("ascii")]
+    assert target == "/img/%E5%B0%81%E9%9D%A2%20cover%20x.png?name=a%20b"
+
+
+def test_async_retry_after_is_clamped(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    settings_for: Callable[..., CrawlerSettings],
+) -> None:
+    settings = settings_for(1)
+    service = _service(tmp_path, settings, "retry")
+    responses = iter(
+        [
+            AsyncResponse(503, ResponseHeaders({"retry-after": "86400"}), b""),
+            AsyncResponse(200, ResponseHeaders({}), b"ok"),
+        ]
+    )
+
+    class _Http:
+        async def get(self, url: str, **kwargs: object) -> AsyncResponse:
+            return next(responses)
+
+    sleeps: list[float] = []
+
+    async def record_sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    monkeypatch.setattr(async_crawler_module.asyncio, "sleep", record_sleep)
+    engine = AsyncQuarterCrawler(service, http=_Http())  # type: ignore[arg-type]
+
+    with service:
+        response = asyncio.run(
+            engine._get("http://127.0.0.1:1/x", timeout=5, headers={})
+        )
+
+    assert response.body == b"ok"
+    assert sleeps == [MAX_RETRY_AFTER_SECONDS]
+
+
+def test_async_uploads_share_the_pipeline_budget_and_upload_cap(
+    tmp_path: Path,
+    stand_in: tuple[_StandIn, int],
+    monkeypatch: pytest.MonkeyPatch,
+    settings_for: Callable[..., CrawlerSettings],
+) -> None:
+    _state, port = stand_in
+    settings = settings_for(
+        port,
+        image_inflight_max_bytes=2 * 64 * 1024,
+        image_upload_workers=1,
+    )
+    active = peak = 0
+    lock = threading.Lock()
+
+    def upload(payload: object, **kwargs: object) -> dict[str, object]:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return {"public_id": kwargs["public_id"]}
+
+    monkeypatch.setattr(image_store_module.cloudinary.uploader, "upload", upload)
+    service = _service(tmp_path, settings, "budget")
+    engine, _connected = _async_engine(service, port)
+
+    with service:
+        result = engine.fetch_quarter("2026", "春")
+        stats = service.image_store.pipeline.stats()
+
+    assert len(result.anime_list) == 12
+    assert peak == 1
+    assert stats.uploads == 12
+    assert 0 < stats.peak_inflight_bytes <= settings.image_inflight_max_bytes
+
+
+def test_async_downloads_reserve_their_content_length(
+    tmp_path: Path,
+    stand_in: tuple[_StandIn, int],
+    settings_for: Callable[..., CrawlerSettings],
+) -> None:
+    state, port = stand_in
+    settings = settings_for(
+        port,
+        image_inflight_max_bytes=2 * 64 * 1024,
+        async_image_concurrency=4,
+    )
+    service = _service(tmp_path, settings, "content-length")
+    engine, _connected = _async_engine(service, port)
+
+    with service:
+        result = engine.fetch_quarter("2026", "春")
+        stats = service.image_store.pipeline.stats()
+
+    assert len(result.anime_list) == 12
+    # Reserving IMAGE_MAX_BYTES per download would allow only two at once.
+    assert state.peak_in_flight > 2
+    assert stats.peak_inflight_bytes < settings.image_max_bytes
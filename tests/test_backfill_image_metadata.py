@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+import io
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+
+from backfill_image_metadata import (
+    apply_quarter_updates,
+    covers_missing_metadata,
+    describe_cached_covers,
+    plan_quarter_updates,
+)
+from models import TAIPEI_TZ
+from services.cache_repository import CacheRepository
+from services.data_repository import DataQualityPolicy, DataRepository
+from services.errors import ImageStoreError
+from services.http_client import DownloadedImage
+from services.original_store import OriginalImageStore
+
+GENERATED_AT = datetime(2026, 7, 10, 12, 0, tzinfo=TAIPEI_TZ)
+
+
+class _CoverDownloader:
+    def __init__(self, failing: set[str]) -> None:
+        self.failing = failing
+        self.calls: list[str] = []
+
+    def download(self, url: str) -> DownloadedImage:
+        self.calls.append(url)
+        if url in self.failing:
+            raise ImageStoreError("Image request failed: 404")
+        buffer = io.BytesIO()
+        Image.new("RGB", (150, 210), (10, 120, 200)).save(buffer, format="PNG")
+        return DownloadedImage(
+            content=buffer.getvalue(),
+            content_type="image/png",
+            final_url=url,
+        )
+
+
+def test_backfill_describes_cached_covers_and_fills_quarters(
+    tmp_path: Path,
+    anime_record_factory: Callable[..., dict[str, str]],
+) -> None:
+    repository = DataRepository(tmp_path / "data", DataQualityPolicy())
+    records = [anime_record_factory(1), anime_record_factory(2)]
+    repository.write_quarter(
+        year="2026",
+        season="夏",
+        records=records,
+        source_url="https://acgsecrets.hk/bangumi/202607/",
+        source_count=2,
+        parse_failure_count=0,
+        generated_at=GENERATED_AT,
+    )
+    cache = CacheRepository(tmp_path / "cache.json")
+    for record in records:
+        cache.set(f"source_{record['bangumi_id']}", record["anime_image_url"])
+    # A second key for the same cover must not be described twice.
+    cache.set("cloudinary_sha256_dup", records[0]["anime_image_url"])
+    downloader = _CoverDownloader(failing={records[1]["anime_image_url"]})
+
+    covers = covers_missing_metadata(cache)
+    described, failures = describe_cached_covers(
+        cache,
+        downloader,  # type: ignore[arg-type]
+        covers,
+        max_pixels=1_000_000,
+        delay_seconds=0,
+    )
+    plans = plan_quarter_updates(repository, cache)
+    apply_quarter_updates(repository, plans)
+
+    assert len(covers) == 2
+    assert described == 1
+    assert len(failures) == 1 and "404" in failures[0]
+    assert sorted(downloader.calls) == sorted(
+        record["anime_image_url"] for record in records
+    )
+    assert list(covers_missing_metadata(cache).values()) == [
+        records[1]["anime_image_url"]
+    ]
+    assert [(plan.year, plan.season, plan.filled_count) for plan in plans] == [
+        ("2026", "夏", 1)
+    ]
+    dataset = repository.load_quarter("2026", "夏")
+    assert dataset is not None
+    assert dataset.schema_version == 2
+    assert dataset.generated_at == GENERATED_AT
+    filled, missing = dataset.anime_list
+    assert (filled.image_width, filled.image_height) == (150, 210)
+    assert not missing.has_image_metadata
+    assert plan_quarter_updates(repository, cache) == []
+
+
+def test_backfill_reads_raw_uploads_from_the_original_store(tmp_path: Path) -> None:
+    buffer = io.BytesIO()
+    Image.new("RGB", (60, 90), (1, 2, 3)).save(buffer, format="PNG")
+    content = buffer.getvalue()
+    digest = hashlib.sha256(content).hexdigest()
+    originals = OriginalImageStore(tmp_path / "originals", max_bytes=1024 * 1024)
+    originals.put(digest, content)
+    cache = CacheRepository(tmp_path / "cache.json")
+    cache.set(
+        "source_a",
+        f"https://res.cloudinary.com/demo/image/upload/v1/anime_covers/{digest}",
+    )
+    downloader = _CoverDownloader(failing=set())
+
+    described, failures = describe_cached_covers(
+        cache,
+        downloader,  # type: ignore[arg-type]
+        covers_missing_metadata(cache),
+        max_pixels=1_000_000,
+        delay_seconds=0,
+        originals=originals,
+    )
+
+    assert (described, failures, downloader.calls) == (1, [], [])
+    assert covers_missing_metadata(cache) == {}
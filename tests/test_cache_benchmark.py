@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from benchmarks.cache_benchmark import main, synthetic_cache
+from services.retention import cloudinary_public_id_from_url
+
+
+def test_synthetic_cache_matches_the_committed_shape() -> None:
+    entries = synthetic_cache(14)
+
+    assert len(entries) == 14
+    assert sum(key.startswith("source_") for key in entries) == 2
+    assert all(cloudinary_public_id_from_url(url) for url in entries.values())
+
+
+def test_benchmark_writes_machine_readable_results(tmp_path: Path) -> None:
+    output = tmp_path / "results" / "cache.json"
+
+    exit_code = main(
+        [
+            "--cache",
+            str(tmp_path / "missing.json"),
+            "--synthetic",
+            "50",
+            "--repeat",
+            "1",
+            "--output",
+            str(output),
+        ]
+    )
+
+    assert exit_code == 0
+    document = json.loads(output.read_text(encoding="utf-8"))
+    assert document["benchmark"] == "cache"
+    rows = {row["representation"]: row for row in document["results"]}
+    assert set(rows) == {"strings", "compact", "packed"}
+    assert all(row["entries"] == 50 for row in rows.values())
+    assert rows["strings"]["memory_reduction"] == 1
+    assert rows["compact"]["resident_bytes"] < rows["strings"]["resident_bytes"]
+
+
+def test_benchmark_fails_without_corpora(tmp_path: Path) -> None:
+    assert main(["--cache", str(tmp_path / "missing.json"), "--synthetic"]) == 1
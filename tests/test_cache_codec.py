@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+from services.cache_codec import MAX_AFFIXES, CompactStrings
+
+DIGEST = "0123456789abcdef" * 2
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        f"cloudinary_{DIGEST}",
+        f"source_{DIGEST * 2}",
+        f"https://res.cloudinary.com/demo/image/upload/v1/anime_covers/{DIGEST}",
+        f"https://res.cloudinary.com/demo/image/upload/v1/anime_covers/{DIGEST}.webp",
+        f"anime_covers/{DIGEST * 2}",
+        f"{DIGEST}",
+        f"cafe{DIGEST}",
+        f"upper_{DIGEST.upper()}",
+        "225x320 data:image/webp;base64,UklGRg==",
+        "",
+    ],
+)
+def test_packing_round_trips_every_string(text: str) -> None:
+    codec = CompactStrings()
+
+    packed = codec.pack(text)
+
+    assert codec.unpack(packed) == text
+    assert codec.pack(text, add=False) == packed
+
+
+def test_digest_strings_share_interned_affixes() -> None:
+    codec = CompactStrings()
+    prefix = "https://res.cloudinary.com/demo/image/upload/v1/anime_covers/"
+
+    first = codec.pack(prefix + DIGEST)
+    second = codec.pack(prefix + DIGEST[::-1])
+
+    assert isinstance(first, bytes) and len(first) == 17
+    assert first[0] == second[0] and len(codec.affixes) == 1
+    assert codec.pack(f"uncached_{DIGEST}", add=False) == f"uncached_{DIGEST}"
+
+
+def test_full_affix_table_leaves_new_shapes_as_text() -> None:
+    codec = CompactStrings([(f"p{index}_", "") for index in range(MAX_AFFIXES)])
+
+    assert isinstance(codec.pack(f"p0_{DIGEST}"), bytes)
+    assert codec.pack(f"new_{DIGEST}") == f"new_{DIGEST}"
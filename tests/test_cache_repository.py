@@ -6,7 +6,7 @@ from pathlib import Path
 import pytest
 
 import services.cache_repository as cache_repository_module
-from services.cache_repository import CacheRepository
+from services.cache_repository import CacheCheckpoints, CacheRepository
 from services.errors import DataContractError
 
 SHARED_PUBLIC_ID = f"anime_covers/{'a' * 64}"
@@ -145,3 +145,230 @@ def test_cache_rejects_public_ids_outside_exact_uploader_contract(
 
     with pytest.raises(DataContractError, match="exact managed Cloudinary public IDs"):
         cache.urls_with_public_ids({"anime_covers/nested/asset"})
+
+
+def _live_index(cache: CacheRepository) -> dict[str, set[str]]:
+    unpack = cache._codec.unpack
+    return {
+        unpack(public_id): {unpack(key) for key in keys}
+        for public_id, keys in cache._public_id_index().items()
+    }
+
+
+def _scanned_index(cache: CacheRepository) -> dict[str, set[str]]:
+    from services.retention import cloudinary_public_id_from_url
+
+    index: dict[str, set[str]] = {}
+    for key, value in cache.snapshot().items():
+        public_id = cloudinary_public_id_from_url(value)
+        if public_id is not None:
+            index.setdefault(public_id, set()).add(key)
+    return index
+
+
+def test_public_id_index_matches_a_full_scan_through_every_mutation(
+    tmp_path: Path,
+) -> None:
+    shared = f"https://res.cloudinary.com/demo/image/upload/v1/{SHARED_PUBLIC_ID}.webp"
+    other = f"https://res.cloudinary.com/demo/image/upload/v1/{OTHER_PUBLIC_ID}"
+    path = tmp_path / "cache.json"
+    path.write_text(
+        json.dumps({"source-a": shared, "meta": "225x320 data:image/webp;base64,"}),
+        encoding="utf-8",
+    )
+    cache = CacheRepository(path)
+    assert _live_index(cache) == _scanned_index(cache)
+
+    cache.set("content-a", shared.replace("/upload/", "/upload/f_auto/"))
+    cache.set("other", other)
+    cache.set("source-a", other)
+    cache.set("source-a", other)
+    cache.set("other", "https://placehold.co/50x50")
+    assert _live_index(cache) == _scanned_index(cache)
+    assert cache.urls_with_public_ids({OTHER_PUBLIC_ID}) == {other}
+
+    assert cache.remove_urls_with_public_ids({SHARED_PUBLIC_ID, OTHER_PUBLIC_ID}) == 2
+    assert _live_index(cache) == _scanned_index(cache) == {}
+    assert set(cache.snapshot()) == {"meta", "other"}
+
+
+def test_public_id_index_is_built_on_first_use(tmp_path: Path) -> None:
+    shared = f"https://res.cloudinary.com/demo/image/upload/v1/{SHARED_PUBLIC_ID}"
+    path = tmp_path / "cache.json"
+    path.write_text(json.dumps({"source-a": shared}), encoding="utf-8")
+    cache = CacheRepository(path)
+    cache.set("content-a", shared)
+
+    assert cache._keys_by_public_id is None
+    assert cache.urls_with_public_ids({SHARED_PUBLIC_ID}) == {shared}
+    assert _live_index(cache) == _scanned_index(cache)
+
+
+def test_journaled_checkpoints_append_only_changes_and_replay_after_crash(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "cache.json"
+    path.write_text('{"kept": "a", "dropped": "b"}', encoding="utf-8")
+    cache = CacheRepository(path, journal=True, compact_operations=100)
+    cache.set("added", "c")
+    assert cache.save_if_changed() is True
+    first_size = cache.journal_path.stat().st_size
+    cache.set("kept", "a")
+    assert cache.save_if_changed() is False
+    cache.set("kept", "a2")
+    assert cache.save_if_changed() is True
+
+    assert json.loads(path.read_text(encoding="utf-8")) == {
+        "kept": "a",
+        "dropped": "b",
+    }
+    assert cache.journal_path.read_bytes().splitlines() == [
+        b'["set", "added", "c"]',
+        b'["set", "kept", "a2"]',
+    ]
+    assert cache.journal_path.stat().st_size > first_size
+    # No compaction happened: a fresh process must recover from the journal.
+    recovered = CacheRepository(path)
+    assert recovered.snapshot() == {"kept": "a2", "dropped": "b", "added": "c"}
+
+
+def test_journal_replays_removals_and_drops_a_torn_final_append(
+    tmp_path: Path,
+) -> None:
+    shared = f"https://res.cloudinary.com/demo/image/upload/v1/{SHARED_PUBLIC_ID}"
+    path = tmp_path / "cache.json"
+    path.write_text(json.dumps({"source-a": shared}), encoding="utf-8")
+    cache = CacheRepository(path, journal=True)
+    cache.remove_urls_with_public_ids({SHARED_PUBLIC_ID})
+    cache.save_if_changed()
+    with cache.journal_path.open("ab") as handle:
+        handle.write(b'["set", "torn", "val')
+
+    recovered = CacheRepository(path, journal=True)
+    assert recovered.snapshot() == {}
+    assert recovered.urls_with_public_ids({SHARED_PUBLIC_ID}) == set()
+    recovered.set("next", "value")
+    recovered.save_if_changed()
+
+    assert recovered.journal_path.read_bytes().splitlines() == [
+        b'["remove", "source-a"]',
+        b'["set", "next", "value"]',
+    ]
+
+
+def test_journal_compacts_into_the_snapshot_after_enough_operations(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "cache.json"
+    cache = CacheRepository(path, journal=True, compact_operations=3)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.save_if_changed()
+    assert not path.exists()
+
+    cache.set("c", "3")
+    cache.save_if_changed()
+
+    assert json.loads(path.read_text(encoding="utf-8")) == {
+        "a": "1",
+        "b": "2",
+        "c": "3",
+    }
+    assert not cache.journal_path.exists()
+    assert cache.compact() is False
+
+
+def test_unjournaled_save_folds_a_leftover_journal_into_the_snapshot(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "cache.json"
+    journaled = CacheRepository(path, journal=True)
+    journaled.set("a", "1")
+    journaled.save_if_changed()
+
+    cache = CacheRepository(path)
+    assert cache.get("a") == "1"
+    cache.set("b", "2")
+    assert cache.save_if_changed() is True
+
+    assert json.loads(path.read_text(encoding="utf-8")) == {"a": "1", "b": "2"}
+    assert not cache.journal_path.exists()
+
+
+def test_corrupt_journal_entries_are_rejected(tmp_path: Path) -> None:
+    path = tmp_path / "cache.json"
+    (tmp_path / "cache.json.journal").write_bytes(
+        b'["set", "a", "1"]\n["rename", "a", "b"]\n'
+    )
+
+    with pytest.raises(DataContractError, match="journal .* line 2"):
+        CacheRepository(path)
+
+
+def test_checkpoints_are_due_by_item_count_or_elapsed_time() -> None:
+    now = [0.0]
+    checkpoints = CacheCheckpoints(
+        every_items=3, every_seconds=10, clock=lambda: now[0]
+    )
+
+    assert [checkpoints.record_item() for _ in range(4)] == [
+        False,
+        False,
+        True,
+        False,
+    ]
+    now[0] = 9.9
+    assert checkpoints.record_item() is False
+    now[0] = 10.0
+    assert checkpoints.record_item() is True
+    assert checkpoints.checkpoints == 2
+
+    disabled = CacheCheckpoints(every_items=0, every_seconds=0, clock=lambda: now[0])
+    now[0] = 1_000.0
+    assert not any(disabled.record_item() for _ in range(100))
+
+
+def test_packed_snapshot_reloads_the_same_cache_until_the_json_changes(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "cache.json"
+    packed = tmp_path / "state" / "cache.packed"
+    shared = f"https://res.cloudinary.com/demo/image/upload/v1/{SHARED_PUBLIC_ID}.webp"
+    path.write_text(
+        json.dumps({"source_封面": shared, "plain": "value"}), encoding="utf-8"
+    )
+    cache = CacheRepository(path, packed_path=packed)
+    assert cache.compact() is False
+    assert packed.exists()
+    original_json = path.read_bytes()
+
+    reloaded = CacheRepository(path, packed_path=packed)
+    assert reloaded._packed_fresh is True
+    assert reloaded.snapshot() == cache.snapshot()
+    assert reloaded.urls_with_public_ids({SHARED_PUBLIC_ID}) == {shared}
+    assert path.read_bytes() == original_json
+
+    # Another writer (retention, the SQLite export) replaced the JSON.
+    path.write_text(json.dumps({"plain": "changed"}), encoding="utf-8")
+    stale = CacheRepository(path, packed_path=packed)
+    assert stale._packed_fresh is False
+    assert stale.snapshot() == {"plain": "changed"}
+
+    packed.write_bytes(packed.read_bytes()[:-1])
+    assert CacheRepository(path, packed_path=packed).snapshot() == {"plain": "changed"}
+
+
+def test_checkpoints_leave_the_packed_snapshot_to_close(tmp_path: Path) -> None:
+    path = tmp_path / "cache.json"
+    packed = tmp_path / "state" / "cache.packed"
+    cache = CacheRepository(path, packed_path=packed)
+
+    cache.set("a", "1")
+    assert cache.save_if_changed() is True
+    assert not packed.exists()
+
+    assert cache.compact() is False
+    assert CacheRepository(path, packed_path=packed)._packed_fresh is True
+    cache.set("b", "2")
+    cache.save_if_changed()
+    assert CacheRepository(path, packed_path=packed)._packed_fresh is False
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from services.cloudinary_urls import (
+    CARD_IMAGE_WIDTHS,
+    THUMBNAIL_WIDTH,
+    responsive_image_config,
+)
+
+ROOT = Path(__file__).parents[1]
+HELPER = ROOT / "static" / "js" / "cloudinary.js"
+STORED_URL = (
+    "https://res.cloudinary.com/demo/image/upload/f_auto,q_auto:best/v1/"
+    "anime_covers/" + "a" * 32
+)
+
+requires_node = pytest.mark.skipif(
+    shutil.which("node") is None, reason="node is not installed"
+)
+
+
+def _helper(name: str, *args: object) -> object:
+    """Call a function exported by the frontend variant helper."""
+
+    script = (
+        "const helper = require(process.argv[1]);"
+        "const [name, args] = JSON.parse(process.argv[2]);"
+        "console.log(JSON.stringify(helper[name](...args)));"
+    )
+    result = subprocess.run(
+        ["node", "-e", script, str(HELPER), json.dumps([name, args])],
+        check=True,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    return json.loads(result.stdout)
+
+
+@requires_node
+def test_variant_chains_width_limit_before_stored_transformation() -> None:
+    assert _helper("cloudinaryVariant", STORED_URL, 240) == (
+        "https://res.cloudinary.com/demo/image/upload/c_limit,w_240/"
+        "f_auto,q_auto:best/v1/anime_covers/" + "a" * 32
+    )
+
+
+@requires_node
+def test_variant_replaces_existing_width_limit() -> None:
+    narrow = _helper("cloudinaryVariant", STORED_URL, THUMBNAIL_WIDTH)
+    widened = _helper("cloudinaryVariant", narrow, 480)
+
+    assert widened == _helper("cloudinaryVariant", STORED_URL, 480)
+    assert str(widened).count("c_limit") == 1
+
+
+@requires_node
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://placehold.co/300x450/333/999?text=No+Image",
+        "http://res.cloudinary.com/demo/image/upload/v1/anime_covers/x",
+        "https://res.cloudinary.com/demo/video/upload/v1/clip",
+        "無圖片",
+    ],
+)
+def test_variant_leaves_other_urls_unchanged(url: str) -> None:
+    assert _helper("cloudinaryVariant", url, 240) == url
+    assert _helper("cloudinarySrcset", url, list(CARD_IMAGE_WIDTHS)) == ""
+
+
+@requires_node
+def test_srcset_lists_every_configured_card_width() -> None:
+    config = responsive_image_config()
+    srcset = _helper("cloudinarySrcset", STORED_URL, config["cardWidths"])
+    candidates = str(srcset).split(", ")
+
+    assert [candidate.rsplit(" ", 1)[1] for candidate in candidates] == [
+        f"{width}w" for width in CARD_IMAGE_WIDTHS
+    ]
+    assert candidates[0] == (
+        "https://res.cloudinary.com/demo/image/upload/c_limit,w_160/"
+        "f_auto,q_auto:best/v1/anime_covers/" + "a" * 32 + " 160w"
+    )
+
+
+def test_templates_load_variant_helper_before_main_script() -> None:
+    base_template = (ROOT / "templates" / "base.html").read_text(encoding="utf-8")
+    index_template = (ROOT / "templates" / "index.html").read_text(encoding="utf-8")
+
+    assert base_template.index("static/js/cloudinary.js") < base_template.index(
+        "static/js/main.js"
+    )
+    assert 'data-image-variants="{{ image_variants_json }}"' in index_template
+    assert ':srcset="cardSrcset(anime)"' in index_template
+    assert ':src="item.thumb"' in index_template
@@ -121,6 +121,27 @@ def test_identical_records_do_not_rewrite_json(
     assert first.path.read_bytes() == original
 
 
+def test_new_writes_use_schema_version_2_without_empty_image_fields(
+    tmp_path: Path,
+    anime_record_factory: Callable[..., dict[str, str]],
+) -> None:
+    repository = _repository(tmp_path)
+    described = {
+        **anime_record_factory(2),
+        "image_width": 225,
+        "image_height": 320,
+        "image_placeholder": "data:image/webp;base64,UklGRg==",
+    }
+
+    result = _write(repository, [anime_record_factory(1), described])
+
+    payload = json.loads(result.path.read_text(encoding="utf-8"))
+    assert payload["schema_version"] == 2
+    assert payload["anime_list"][0] == anime_record_factory(1)
+    assert payload["anime_list"][1] == described
+    assert repository.load_path(result.path).anime_list[1].has_image_metadata
+
+
 def test_generated_at_is_written_with_asia_taipei_offset(
     tmp_path: Path,
     anime_record_factory: Callable[..., dict[str, str]],
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from services.dns_cache import DnsCache
+from services.errors import ImageStoreError
+
+PUBLIC_ADDRESS = "93.184.216.34"
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Resolver:
+    def __init__(self, *answers: list[str] | OSError) -> None:
+        self.answers = list(answers)
+        self.calls: list[str] = []
+
+    def __call__(self, host: str) -> list[str]:
+        self.calls.append(host)
+        answer = self.answers.pop(0) if len(self.answers) > 1 else self.answers[0]
+        if isinstance(answer, OSError):
+            raise answer
+        return answer
+
+
+def test_answers_are_reused_until_their_ttl_expires() -> None:
+    clock = _Clock()
+    resolver = _Resolver([PUBLIC_ADDRESS], ["93.184.216.35"])
+    dns = DnsCache(ttl_seconds=60, resolver=resolver, clock=clock)
+
+    first = dns.resolve("Static.acgsecrets.hk")
+    clock.now = 59.9
+    second = dns.resolve("static.acgsecrets.hk")
+    clock.now = 60.0
+    third = dns.resolve("static.acgsecrets.hk")
+
+    assert first == second == (PUBLIC_ADDRESS,)
+    assert third == ("93.184.216.35",)
+    assert resolver.calls == ["static.acgsecrets.hk"] * 2
+    assert (dns.stats().hits, dns.stats().misses) == (1, 2)
+
+
+def test_failed_lookups_are_cached_for_the_negative_ttl() -> None:
+    clock = _Clock()
+    resolver = _Resolver(OSError("no such host"), [PUBLIC_ADDRESS])
+    dns = DnsCache(negative_ttl_seconds=5, resolver=resolver, clock=clock)
+
+    for _ in range(3):
+        with pytest.raises(ImageStoreError, match="Unable to resolve image host"):
+            dns.resolve("static.acgsecrets.hk")
+    clock.now = 5.0
+
+    assert dns.resolve("static.acgsecrets.hk") == (PUBLIC_ADDRESS,)
+    assert len(resolver.calls) == 2
+    assert dns.stats().negative_hits == 2
+
+
+def test_cached_answers_still_fail_the_blocked_address_check() -> None:
+    resolver = _Resolver([PUBLIC_ADDRESS, "10.0.0.8"])
+    dns = DnsCache(resolver=resolver)
+
+    for _ in range(2):
+        with pytest.raises(ImageStoreError, match="blocked address: 10.0.0.8"):
+            dns.resolve("static.acgsecrets.hk")
+
+    assert len(resolver.calls) == 1
+
+
+def test_zero_ttl_disables_caching() -> None:
+    resolver = _Resolver([PUBLIC_ADDRESS])
+    dns = DnsCache(ttl_seconds=0, resolver=resolver)
+
+    dns.resolve("static.acgsecrets.hk")
+    dns.resolve("static.acgsecrets.hk")
+
+    assert len(resolver.calls) == 2
+
+
+def test_concurrent_misses_share_one_lookup() -> None:
+    release = threading.Event()
+    calls: list[str] = []
+
+    def slow_resolver(host: str) -> list[str]:
+        calls.append(host)
+        release.wait(5)
+        return [PUBLIC_ADDRESS]
+
+    dns = DnsCache(resolver=slow_resolver)
+    results: list[tuple[str, ...]] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(dns.resolve("static.hk")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [(PUBLIC_ADDRESS,)] * 4
+    assert calls == ["static.hk"]
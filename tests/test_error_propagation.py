@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import hashlib
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
 from datetime import datetime
 from pathlib import Path
 from types import SimpleNamespace
@@ -8,12 +11,29 @@ from types import SimpleNamespace
 import pytest
 
 import generate_static
-from models import TAIPEI_TZ, Anime
+from config import Config
+from models import TAIPEI_TZ, Anime, AnimeCandidate
 from services import anime_service as anime_service_module
-from services.anime_service import AnimeCrawlerService, parse_date_time
+from services.anime_service import (
+    AnimeCrawlerService,
+    CrawlResult,
+    parse_date_time,
+)
 from services.data_repository import DataQualityPolicy, DataRepository
-from services.errors import CrawlerError, ImageStoreError, ItemParseError
+from services.errors import (
+    CrawlerError,
+    DataContractError,
+    ImageStoreError,
+    ItemParseError,
+    SourceNotFoundError,
+)
+from services.http_client import SessionPoolStats, SourceDocument, SourceStream
+from services.image_pipeline import ImagePipelineStats
+from services.parser import PARSER_BACKENDS, fingerprint_document
+from services.quota_budget import QuotaStats
 from services.settings import ProjectPaths
+from services.single_flight import SingleFlightStats
+from services.source_state import SourceFingerprint
 
 
 class _CacheSpy:
@@ -24,24 +44,115 @@ class _CacheSpy:
         self.save_count += 1
         return False
 
+    def compact(self) -> bool:
+        return False
+
 
 class _ImageStoreSpy:
     def __init__(self) -> None:
         self.quota_checked = False
+        self.closed = False
+
+    def session_stats(self) -> SessionPoolStats:
+        return SessionPoolStats(
+            sessions_created=1,
+            leases=2,
+            connections_opened=1,
+            requests_sent=2,
+        )
+
+    def single_flight_stats(self) -> SingleFlightStats:
+        return SingleFlightStats(leaders=2, waits=1, hits=1)
+
+    def pipeline_stats(self) -> ImagePipelineStats:
+        return ImagePipelineStats(downloads=0, uploads=0, peak_inflight_bytes=0)
+
+    def quota_stats(self) -> QuotaStats:
+        return QuotaStats(
+            refreshes=1, uploads=0, uploaded_bytes=0, estimated_percent=12.5
+        )
+
+    def original_stats(self) -> None:
+        return None
+
+    def close(self) -> None:
+        self.closed = True
 
     def assert_quota_available(self) -> None:
         self.quota_checked = True
 
-    def store(self, source_url: str, anime_name: str) -> str:
+    def submit(self, source_url: str, anime_name: str) -> Future[str]:
         raise AssertionError("invalid parser data must not reach image storage")
 
 
 class _StaticSourceClient:
-    def __init__(self, document: str) -> None:
+    def __init__(
+        self,
+        document: str,
+        known: SourceFingerprint | None = None,
+    ) -> None:
         self.document = document
+        self.known = known
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+    def fetch_quarter_document(
+        self,
+        year: str,
+        season: str,
+        *,
+        current_data_sha256: str | None = None,
+        stream: bool = False,
+    ) -> SourceDocument:
+        return SourceDocument(
+            url="https://acgsecrets.hk/bangumi/202607/",
+            html=self.document,
+            fingerprint=SourceFingerprint(body_sha256="0" * 64),
+            unchanged=self.document == "unchanged",
+            known=self.known,
+        )
 
-    def fetch_quarter_html(self, year: str, season: str) -> tuple[str, str]:
-        return "https://acgsecrets.hk/bangumi/202607/", self.document
+
+class _ChunkedResponse:
+    def __init__(self, chunks: Callable[[], Iterator[bytes]]) -> None:
+        self.chunks = chunks
+        self.headers: dict[str, str] = {}
+        self.closed = False
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        return self.chunks()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _StreamingSourceClient:
+    def __init__(self, response: _ChunkedResponse) -> None:
+        self.response = response
+        self.stream_requested = False
+
+    def close(self) -> None:
+        pass
+
+    def fetch_quarter_document(
+        self,
+        year: str,
+        season: str,
+        *,
+        current_data_sha256: str | None = None,
+        stream: bool = False,
+    ) -> SourceDocument:
+        self.stream_requested = stream
+        url = "https://acgsecrets.hk/bangumi/202604/"
+        return SourceDocument(
+            url=url,
+            html=None,
+            fingerprint=None,
+            unchanged=False,
+            stream=SourceStream(url, self.response),  # type: ignore[arg-type]
+        )
 
 
 def _managed_image_url(seed: str) -> str:
@@ -49,6 +160,43 @@ def _managed_image_url(seed: str) -> str:
     return f"https://res.cloudinary.com/test/image/upload/anime_covers/{public_id}.webp"
 
 
+def _service_settings(**overrides: object) -> SimpleNamespace:
+    values: dict[str, object] = {
+        "max_workers": 1,
+        "parser_backend": "bs4",
+        "source_streaming": False,
+        "crawler_engine": "threads",
+        "cache_checkpoint_items": 20,
+        "cache_checkpoint_seconds": 30.0,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _candidate(name: str) -> AnimeCandidate:
+    return AnimeCandidate(
+        bangumi_id="anime-2200",
+        anime_name=name,
+        source_image_url="https://static.acgsecrets.hk/img/test/cover.jpg",
+    )
+
+
+def _submitted(
+    process: Callable[[AnimeCandidate], Anime],
+) -> Callable[[AnimeCandidate], Future[Anime]]:
+    """Run ``process`` inline and hand back its outcome as a finished Future."""
+
+    def submit(candidate: AnimeCandidate) -> Future[Anime]:
+        future: Future[Anime] = Future()
+        try:
+            future.set_result(process(candidate))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    return submit
+
+
 def _valid_anime(bangumi_id: str = "anime-2200") -> Anime:
     return Anime(
         bangumi_id=bangumi_id,
@@ -74,7 +222,7 @@ def test_all_item_failures_raise_instead_of_returning_an_error_list(
     cache = _CacheSpy()
     image_store = _ImageStoreSpy()
     crawler = AnimeCrawlerService(
-        settings=SimpleNamespace(max_workers=1),
+        settings=_service_settings(),
         source_client=_StaticSourceClient(document),
         image_store=image_store,
         cache=cache,
@@ -93,24 +241,23 @@ def test_only_item_parse_errors_may_be_recorded_as_partial_failures(
     cache = _CacheSpy()
     image_store = _ImageStoreSpy()
     crawler = AnimeCrawlerService(
-        settings=SimpleNamespace(max_workers=1),
+        settings=_service_settings(),
         source_client=_StaticSourceClient("unused"),
         image_store=image_store,
         cache=cache,
     )
+    monkeypatch.setitem(
+        PARSER_BACKENDS,
+        "bs4",
+        lambda document: [
+            ItemParseError("known card format problem"),
+            _candidate("good-card"),
+        ],
+    )
     monkeypatch.setattr(
-        anime_service_module,
-        "extract_item_html",
-        lambda document: ["bad-card", "good-card"],
+        crawler, "_submit_item", _submitted(lambda candidate: _valid_anime())
     )
 
-    def process(item_html: str) -> Anime:
-        if item_html == "bad-card":
-            raise ItemParseError("known card format problem")
-        return _valid_anime()
-
-    monkeypatch.setattr(crawler, "_process_item", process)
-
     result = crawler.fetch_quarter("2026", "夏")
 
     assert [record.bangumi_id for record in result.anime_list] == ["anime-2200"]
@@ -125,23 +272,26 @@ def test_system_errors_always_abort_the_crawl(
     cache = _CacheSpy()
     image_store = _ImageStoreSpy()
     crawler = AnimeCrawlerService(
-        settings=SimpleNamespace(max_workers=1),
+        settings=_service_settings(),
         source_client=_StaticSourceClient("unused"),
         image_store=image_store,
         cache=cache,
     )
-    monkeypatch.setattr(
-        anime_service_module,
-        "extract_item_html",
-        lambda document: ["good-card", "image-store-error"],
+    monkeypatch.setitem(
+        PARSER_BACKENDS,
+        "bs4",
+        lambda document: [
+            _candidate("good-card"),
+            _candidate("image-store-error"),
+        ],
     )
 
-    def process(item_html: str) -> Anime:
-        if item_html == "image-store-error":
+    def process(candidate: AnimeCandidate) -> Anime:
+        if candidate.anime_name == "image-store-error":
             raise ImageStoreError("simulated system failure")
         return _valid_anime()
 
-    monkeypatch.setattr(crawler, "_process_item", process)
+    monkeypatch.setattr(crawler, "_submit_item", _submitted(process))
 
     with pytest.raises(ImageStoreError, match="simulated system failure"):
         crawler.fetch_quarter("2026", "夏")
@@ -149,6 +299,277 @@ def test_system_errors_always_abort_the_crawl(
     assert cache.save_count == 1
 
 
+def test_finished_items_checkpoint_the_cache_before_the_quarter_ends(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cache = _CacheSpy()
+    crawler = AnimeCrawlerService(
+        settings=_service_settings(cache_checkpoint_items=2),
+        source_client=_StaticSourceClient("unused"),
+        image_store=_ImageStoreSpy(),
+        cache=cache,
+    )
+    monkeypatch.setitem(
+        PARSER_BACKENDS,
+        "bs4",
+        lambda document: [_candidate(f"card-{n}") for n in range(5)],
+    )
+    monkeypatch.setattr(
+        crawler, "_submit_item", _submitted(lambda candidate: _valid_anime())
+    )
+
+    crawler.fetch_quarter("2026", "夏")
+
+    # Two mid-quarter checkpoints (after items 2 and 4) plus the final save.
+    assert cache.save_count == 3
+
+
+def test_closing_the_service_releases_its_clients(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    image_store = _ImageStoreSpy()
+    source_client = _StaticSourceClient("unused")
+    crawler = AnimeCrawlerService(
+        settings=_service_settings(),
+        source_client=source_client,
+        image_store=image_store,
+        cache=_CacheSpy(),
+    )
+    monkeypatch.setitem(
+        PARSER_BACKENDS,
+        "bs4",
+        lambda document: [_candidate("card")],
+    )
+    monkeypatch.setattr(
+        crawler, "_submit_item", _submitted(lambda candidate: _valid_anime())
+    )
+
+    with crawler:
+        crawler.fetch_quarter("2026", "夏")
+        crawler.fetch_quarter("2026", "秋")
+
+    assert image_store.closed is True
+    assert source_client.closed is True
+
+
+def test_unchanged_source_skips_quota_items_and_cache_writes() -> None:
+    cache = _CacheSpy()
+    image_store = _ImageStoreSpy()
+    crawler = AnimeCrawlerService(
+        settings=_service_settings(),
+        source_client=_StaticSourceClient("unchanged"),
+        image_store=image_store,
+        cache=cache,
+    )
+
+    result = crawler.fetch_quarter("2026", "夏", current_data_sha256="1" * 64)
+
+    assert result.unchanged is True
+    assert result.anime_list == []
+    assert image_store.quota_checked is False
+    assert cache.save_count == 0
+
+
+def test_semantically_identical_source_skips_the_item_pipeline(
+    fixture_dir: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    document = (fixture_dir / "acgsecrets_202607_minimal.html").read_text(
+        encoding="utf-8"
+    )
+    _, card_set_sha256 = fingerprint_document(document)
+    reordered_chrome = document.replace(
+        "<body>",
+        "<body><!-- rotated banner --><p>今日廣告</p>",
+    )
+    image_store = _ImageStoreSpy()
+    crawler = AnimeCrawlerService(
+        settings=_service_settings(),
+        source_client=_StaticSourceClient(
+            reordered_chrome,
+            known=SourceFingerprint(
+                body_sha256="0" * 64,
+                card_set_sha256=card_set_sha256,
+            ),
+        ),
+        image_store=image_store,
+        cache=_CacheSpy(),
+    )
+    monkeypatch.setitem(
+        PARSER_BACKENDS,
+        "bs4",
+        lambda document: pytest.fail("unchanged cards must not be parsed"),
+    )
+
+    result = crawler.fetch_quarter("2026", "夏", current_data_sha256="1" * 64)
+
+    assert result.unchanged is True
+    assert image_store.quota_checked is False
+
+
+def test_streamed_quarter_processes_cards_before_the_page_finishes(
+    fixture_dir: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    document = (fixture_dir / "acgsecrets_202604_variants.html").read_bytes()
+    first_card_end = document.index(b"<!-- 02:")
+    first_item_started = threading.Event()
+
+    def chunks() -> Iterator[bytes]:
+        yield document[:first_card_end]
+        assert first_item_started.wait(timeout=5)
+        yield document[first_card_end:]
+
+    response = _ChunkedResponse(chunks)
+    source_client = _StreamingSourceClient(response)
+    image_store = _ImageStoreSpy()
+    crawler = AnimeCrawlerService(
+        settings=_service_settings(source_streaming=True),
+        source_client=source_client,
+        image_store=image_store,
+        cache=_CacheSpy(),
+    )
+    monkeypatch.setattr(
+        anime_service_module,
+        "parse_fingerprinted_document",
+        lambda document, **options: pytest.fail("streamed pages are never buffered"),
+    )
+
+    def process(candidate: AnimeCandidate) -> Anime:
+        first_item_started.set()
+        return _valid_anime(candidate.bangumi_id)
+
+    monkeypatch.setattr(crawler, "_submit_item", _submitted(process))
+
+    result = crawler.fetch_quarter("2026", "春")
+    crawler.close()
+
+    assert source_client.stream_requested is True
+    assert image_store.quota_checked is True
+    assert response.closed is True
+    assert result.source_count == 9
+    assert len(result.anime_list) == 6
+    assert [failure.index for failure in result.failures] == [5, 6, 7]
+    assert result.fingerprint == SourceFingerprint(
+        body_sha256=hashlib.sha256(document).hexdigest(),
+        card_set_sha256=fingerprint_document(document.decode("utf-8"))[1],
+    )
+
+
+def test_unchanged_quarter_keeps_existing_data_in_summary(
+    project_paths: ProjectPaths,
+    anime_record_factory: Callable[..., dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    repository = DataRepository(project_paths.data_dir, DataQualityPolicy())
+    repository.write_quarter(
+        year="2026",
+        season="夏",
+        records=[anime_record_factory(1), anime_record_factory(2)],
+        source_url="https://acgsecrets.hk/bangumi/202607/",
+        source_count=2,
+        parse_failure_count=0,
+    )
+    data_path = repository.quarter_path("2026", "夏")
+    expected_digest = hashlib.sha256(data_path.read_bytes()).hexdigest()
+    before = data_path.read_bytes()
+    seen_digests: dict[str, str | None] = {}
+
+    class UnchangedCrawler:
+        settings = SimpleNamespace(quarter_workers=1)
+
+        def close(self) -> None:
+            pass
+
+        def fetch_quarter(
+            self,
+            year: str,
+            season: str,
+            *,
+            current_data_sha256: str | None = None,
+        ) -> CrawlResult:
+            seen_digests[f"{year}_{season}"] = current_data_sha256
+            if (year, season) != ("2026", "夏"):
+                raise SourceNotFoundError("not part of this test")
+            return CrawlResult(
+                year=year,
+                season=season,
+                source_url="https://acgsecrets.hk/bangumi/202607/",
+                source_count=0,
+                anime_list=[],
+                failures=(),
+                unchanged=True,
+            )
+
+    monkeypatch.setattr(
+        anime_service_module.AnimeCrawlerService,
+        "from_environment",
+        classmethod(lambda cls: UnchangedCrawler()),
+    )
+    monkeypatch.setattr(
+        generate_static,
+        "target_quarters",
+        lambda now, full_crawl: [("2026", "夏"), ("2026", "秋")],
+    )
+
+    summary = generate_static.crawl_quarters(
+        project_paths,
+        repository,
+        datetime(2026, 7, 10, 12, 0, tzinfo=TAIPEI_TZ),
+    )
+
+    assert seen_digests["2026_夏"] == expected_digest
+    assert seen_digests["2026_秋"] is None
+    assert data_path.read_bytes() == before
+    assert summary == generate_static.CrawlSummary(
+        processed_quarters=1,
+        changed_quarters=0,
+        total_records=2,
+        parse_failures=0,
+        unchanged_quarters=1,
+    )
+
+
+def test_unchanged_quarter_without_data_is_a_contract_error(
+    project_paths: ProjectPaths,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class UnchangedCrawler:
+        settings = SimpleNamespace(quarter_workers=1)
+
+        def close(self) -> None:
+            pass
+
+        def fetch_quarter(
+            self, year: str, season: str, *, current_data_sha256: str | None = None
+        ) -> CrawlResult:
+            return CrawlResult(
+                year=year,
+                season=season,
+                source_url="https://acgsecrets.hk/bangumi/202607/",
+                source_count=0,
+                anime_list=[],
+                failures=(),
+                unchanged=True,
+            )
+
+    monkeypatch.setattr(
+        anime_service_module.AnimeCrawlerService,
+        "from_environment",
+        classmethod(lambda cls: UnchangedCrawler()),
+    )
+    monkeypatch.setattr(
+        generate_static, "target_quarters", lambda now, full_crawl: [("2026", "夏")]
+    )
+
+    with pytest.raises(DataContractError, match="unchanged without data"):
+        generate_static.crawl_quarters(
+            project_paths,
+            DataRepository(project_paths.data_dir, DataQualityPolicy()),
+            datetime(2026, 7, 10, 12, 0, tzinfo=TAIPEI_TZ),
+        )
+
+
 def test_static_crawl_orchestrator_re_raises_crawler_failure(
     project_paths: ProjectPaths,
     monkeypatch: pytest.MonkeyPatch,
@@ -156,9 +577,21 @@ def test_static_crawl_orchestrator_re_raises_crawler_failure(
     failure = CrawlerError("simulated crawler failure")
 
     class FailingCrawler:
-        def fetch_quarter(self, year: str, season: str) -> None:
+        settings = SimpleNamespace(quarter_workers=2)
+        closed = False
+
+        def fetch_quarter(
+            self,
+            year: str,
+            season: str,
+            *,
+            current_data_sha256: str | None = None,
+        ) -> None:
             raise failure
 
+        def close(self) -> None:
+            FailingCrawler.closed = True
+
     monkeypatch.setattr(
         anime_service_module.AnimeCrawlerService,
         "from_environment",
@@ -176,6 +609,83 @@ def test_static_crawl_orchestrator_re_raises_crawler_failure(
             datetime(2026, 7, 10, 12, 0, tzinfo=TAIPEI_TZ),
         )
 
+    assert FailingCrawler.closed is True
+
+
+def test_concurrent_quarter_crawl_writes_in_target_order(
+    project_paths: ProjectPaths,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    second_quarter_fetched = threading.Event()
+    fetch_order: list[tuple[str, str]] = []
+    recorded: list[str] = []
+
+    class ConcurrentCrawler:
+        settings = SimpleNamespace(quarter_workers=3)
+
+        def close(self) -> None:
+            pass
+
+        def record_written_quarter(self, result: CrawlResult, path: Path) -> None:
+            recorded.append(path.name)
+
+        def fetch_quarter(
+            self,
+            year: str,
+            season: str,
+            *,
+            current_data_sha256: str | None = None,
+        ) -> CrawlResult:
+            if (year, season) == ("2025", "夏"):
+                assert second_quarter_fetched.wait(timeout=5)
+            fetch_order.append((year, season))
+            if (year, season) == ("2025", "秋"):
+                second_quarter_fetched.set()
+            if (year, season) == ("2026", "秋"):
+                raise SourceNotFoundError("not published")
+            month = Config.SEASON_TO_MONTH[season]
+            return CrawlResult(
+                year=year,
+                season=season,
+                source_url=f"https://acgsecrets.hk/bangumi/{year}{month:02d}/",
+                source_count=1,
+                anime_list=[_valid_anime(f"anime-{year}{month:02d}")],
+                failures=(),
+            )
+
+    monkeypatch.setattr(
+        anime_service_module.AnimeCrawlerService,
+        "from_environment",
+        classmethod(lambda cls: ConcurrentCrawler()),
+    )
+    project_paths.data_dir.mkdir(parents=True)
+    (project_paths.data_dir / "existing.json").write_text("{}", encoding="utf-8")
+    repository = DataRepository(project_paths.data_dir, DataQualityPolicy())
+    written: list[str] = []
+    real_write = repository.write_quarter
+
+    def record_write(**kwargs: object) -> object:
+        written.append(f"{kwargs['year']}_{kwargs['season']}")
+        return real_write(**kwargs)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(repository, "write_quarter", record_write)
+
+    summary = generate_static.crawl_quarters(
+        project_paths,
+        repository,
+        datetime(2026, 7, 10, 12, 0, tzinfo=TAIPEI_TZ),
+    )
+
+    assert fetch_order.index(("2025", "秋")) < fetch_order.index(("2025", "夏"))
+    assert written == ["2025_夏", "2025_秋", "2026_冬", "2026_春", "2026_夏"]
+    assert recorded == [f"{name}.json" for name in written]
+    assert summary == generate_static.CrawlSummary(
+        processed_quarters=5,
+        changed_quarters=5,
+        total_records=5,
+        parse_failures=0,
+    )
+
 
 def test_crawl_summary_is_published_only_after_the_full_build_succeeds(
     project_paths: ProjectPaths,
@@ -187,12 +697,15 @@ def test_crawl_summary_is_published_only_after_the_full_build_succeeds(
         changed_quarters=2,
         total_records=321,
         parse_failures=4,
+        unchanged_quarters=3,
     )
     repository = SimpleNamespace(validate_all=lambda: [])
     github_output = tmp_path / "github-output.txt"
+    step_summary = tmp_path / "step-summary.md"
 
     monkeypatch.setenv("BUILD_ONLY", "false")
     monkeypatch.setenv("GITHUB_OUTPUT", str(github_output))
+    monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(step_summary))
     monkeypatch.setattr(generate_static, "load_dotenv", lambda: None)
     monkeypatch.setattr(generate_static, "configure_runtime", lambda: None)
     monkeypatch.setattr(
@@ -232,6 +745,7 @@ def test_crawl_summary_is_published_only_after_the_full_build_succeeds(
         generate_static.generate_static_files()
 
     assert not github_output.exists()
+    assert not step_summary.exists()
 
     monkeypatch.setattr(
         generate_static,
@@ -244,9 +758,13 @@ def test_crawl_summary_is_published_only_after_the_full_build_succeeds(
     assert github_output.read_bytes() == (
         b"processed_quarters=6\n"
         b"changed_quarters=2\n"
+        b"unchanged_quarters=3\n"
         b"record_count=321\n"
         b"parse_failures=4\n"
     )
+    assert "- Unchanged quarters skipped: 3\n" in step_summary.read_text(
+        encoding="utf-8"
+    )
 
 
 def test_same_times_have_a_stable_id_and_name_tie_breaker() -> None:
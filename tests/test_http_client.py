@@ -1,14 +1,27 @@
 from __future__ import annotations
 
+import hashlib
+import shutil
+import socket
 from collections.abc import Iterable
+from pathlib import Path
 
 import pytest
 import requests
+import urllib3.util.connection
 
 import services.http_client as http_client_module
+from services.dns_cache import DnsCache
 from services.errors import ImageStoreError, SourceFetchError, SourceNotFoundError
-from services.http_client import SafeImageDownloader, SourceClient
-from services.settings import CrawlerSettings
+from services.http_client import (
+    ImageBuffer,
+    SafeImageDownloader,
+    SessionPool,
+    SourceClient,
+    create_retry_session,
+)
+from services.settings import CrawlerSettings, ProjectPaths
+from services.source_state import SourceFingerprint, SourceStateRepository
 
 
 def _settings(**overrides: object) -> CrawlerSettings:
@@ -65,6 +78,7 @@ class _Session:
     def __init__(self, *responses: _Response | Exception) -> None:
         self.responses = list(responses)
         self.calls: list[tuple[str, dict[str, object]]] = []
+        self.closed = False
 
     def get(self, url: str, **kwargs: object) -> _Response:
         self.calls.append((url, kwargs))
@@ -73,6 +87,14 @@ class _Session:
             raise result
         return result
 
+    def close(self) -> None:
+        self.closed = True
+
+
+def _pool(*sessions: _Session) -> SessionPool:
+    created = list(sessions)
+    return SessionPool(_settings(), factory=lambda: created.pop(0))
+
 
 @pytest.mark.parametrize(
     ("url", "message"),
@@ -134,8 +156,7 @@ def test_image_download_follows_one_approved_redirect(
         chunks=(b"abc", b"", b"def"),
     )
     session = _Session(redirect, final)
-    downloader = SafeImageDownloader(_settings())
-    downloader._thread_local.session = session
+    downloader = SafeImageDownloader(_settings(), sessions=_pool(session))
 
     downloaded = downloader.download("https://static.acgsecrets.hk/start.jpg")
 
@@ -149,14 +170,160 @@ def test_image_download_follows_one_approved_redirect(
     ]
 
 
+def test_image_download_hashes_into_one_preallocated_buffer(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        http_client_module.socket,
+        "getaddrinfo",
+        lambda *args, **kwargs: [
+            (2, 1, 6, "", ("93.184.216.34", 443)),
+        ],
+    )
+    response = _Response(
+        headers={"Content-Type": "image/png", "Content-Length": "8"},
+        chunks=(b"abc", b"defg"),
+    )
+    downloader = SafeImageDownloader(_settings(), sessions=_pool(_Session(response)))
+
+    downloaded = downloader.download("https://static.acgsecrets.hk/short.png")
+
+    assert isinstance(downloaded.content, memoryview)
+    assert downloaded.content == b"abcdefg"
+    assert downloaded.sha256 == hashlib.sha256(b"abcdefg").hexdigest()
+    assert downloaded.md5 == hashlib.md5(b"abcdefg").hexdigest()
+
+
+@pytest.mark.parametrize("expected_size", [None, 4, 6, 100])
+def test_image_buffer_grows_past_its_estimate_and_keeps_the_limit(
+    expected_size: int | None,
+) -> None:
+    buffer = ImageBuffer(6, expected_size)
+
+    assert buffer.capacity == min(expected_size or 0, 6)
+    buffer.append(b"abc")
+    buffer.append(b"def")
+    with pytest.raises(ImageStoreError, match="size limit"):
+        buffer.append(b"g")
+    downloaded = buffer.finish("image/png", "https://static.acgsecrets.hk/a.png")
+
+    assert bytes(downloaded.content) == b"abcdef"
+    assert downloaded.sha256 == hashlib.sha256(b"abcdef").hexdigest()
+
+
+def test_pinned_session_connects_to_the_validated_address(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    lookups: list[str] = []
+    dialed: list[tuple[str, int]] = []
+    peers: list[socket.socket] = []
+
+    def resolver(host: str) -> list[str]:
+        lookups.append(host)
+        return ["93.184.216.34"]
+
+    def create_connection(address: tuple[str, int], *args: object, **kwargs: object):
+        dialed.append(address)
+        client, server = socket.socketpair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        peers.append(server)
+        return client
+
+    monkeypatch.setattr(urllib3.util.connection, "create_connection", create_connection)
+    session = create_retry_session(_settings(), DnsCache(resolver=resolver))
+
+    try:
+        response = session.get("http://static.acgsecrets.hk/a.png", timeout=3)
+        request = peers[0].recv(4096)
+    finally:
+        session.close()
+        for peer in peers:
+            peer.close()
+
+    assert response.text == "ok"
+    assert dialed == [("93.184.216.34", 80)]
+    assert b"Host: static.acgsecrets.hk\r\n" in request
+    assert lookups == ["static.acgsecrets.hk"]
+
+
+def _dial(
+    monkeypatch: pytest.MonkeyPatch,
+    resolved: list[str],
+    *,
+    unreachable: tuple[str, ...] = (),
+    proxies: dict[str, str] | None = None,
+) -> tuple[list[tuple[str, int]], list[str], str]:
+    lookups: list[str] = []
+    dialed: list[tuple[str, int]] = []
+    peers: list[socket.socket] = []
+
+    def resolver(host: str) -> list[str]:
+        lookups.append(host)
+        return resolved
+
+    def create_connection(address: tuple[str, int], *args: object, **kwargs: object):
+        dialed.append(address)
+        if address[0] in unreachable:
+            raise ConnectionRefusedError(f"{address[0]} refused the connection")
+        client, server = socket.socketpair()
+        server.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        peers.append(server)
+        return client
+
+    monkeypatch.setattr(urllib3.util.connection, "create_connection", create_connection)
+    session = create_retry_session(_settings(), DnsCache(resolver=resolver))
+    try:
+        text = session.get(
+            "http://static.acgsecrets.hk/a.png", timeout=3, proxies=proxies
+        ).text
+    finally:
+        session.close()
+        for peer in peers:
+            peer.close()
+    return dialed, lookups, text
+
+
+def test_pinned_session_falls_back_to_the_next_validated_address(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    dialed, _lookups, text = _dial(
+        monkeypatch,
+        ["93.184.216.35", "93.184.216.34"],
+        unreachable=("93.184.216.35",),
+    )
+
+    assert text == "ok"
+    assert dialed == [("93.184.216.35", 80), ("93.184.216.34", 80)]
+
+
+def test_pinned_session_never_dials_a_partly_blocked_answer(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    with pytest.raises(ImageStoreError, match="blocked address: 10.0.0.7"):
+        _dial(monkeypatch, ["93.184.216.34", "10.0.0.7"])
+
+
+def test_pinned_session_lets_a_proxy_resolve_the_target(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    dialed, lookups, text = _dial(
+        monkeypatch,
+        ["93.184.216.34"],
+        proxies={"http": "http://10.0.0.8:3128"},
+    )
+
+    assert text == "ok"
+    assert dialed == [("10.0.0.8", 3128)]
+    assert lookups == []
+
+
 def test_image_download_revalidates_redirect_destination() -> None:
     redirect = _Response(
         status_code=302,
         headers={"Location": "https://evil.invalid/stolen.jpg"},
     )
     session = _Session(redirect)
-    downloader = SafeImageDownloader(_settings())
-    downloader._thread_local.session = session
+    downloader = SafeImageDownloader(_settings(), sessions=_pool(session))
 
     with pytest.raises(ImageStoreError, match="host is not allowed"):
         downloader.download("https://static.acgsecrets.hk/start.jpg")
@@ -193,8 +360,7 @@ def test_image_download_rejects_invalid_response_metadata(
     response: _Response,
     message: str,
 ) -> None:
-    downloader = SafeImageDownloader(_settings())
-    downloader._thread_local.session = _Session(response)
+    downloader = SafeImageDownloader(_settings(), sessions=_pool(_Session(response)))
     monkeypatch.setattr(downloader, "_validate_url", lambda url: None)
 
     with pytest.raises(ImageStoreError, match=message):
@@ -210,8 +376,7 @@ def test_image_download_rejects_stream_that_grows_past_limit(
         headers={"Content-Type": "image/png"},
         chunks=(b"123456", b"789012"),
     )
-    downloader = SafeImageDownloader(_settings())
-    downloader._thread_local.session = _Session(response)
+    downloader = SafeImageDownloader(_settings(), sessions=_pool(_Session(response)))
     monkeypatch.setattr(downloader, "_validate_url", lambda url: None)
 
     with pytest.raises(ImageStoreError, match="configured size limit"):
@@ -266,3 +431,203 @@ def test_source_client_returns_nonempty_utf8_document() -> None:
     assert url.endswith("/202607/")
     assert document == "<html>ok</html>"
     assert response.encoding == "utf-8"
+
+
+def test_session_pool_reuses_released_sessions_and_closes_once() -> None:
+    first, second = _Session(), _Session()
+    pool = _pool(first, second)
+
+    with pool.lease() as leased:
+        assert leased is first
+        with pool.lease() as concurrent:
+            assert concurrent is second
+    with pool.lease() as reused:
+        assert reused is first
+
+    stats = pool.stats()
+    assert stats.sessions_created == 2
+    assert stats.leases == 3
+    pool.close()
+    pool.close()
+    assert first.closed and second.closed
+    with pytest.raises(RuntimeError, match="closed"), pool.lease():
+        pass
+
+
+def test_session_pool_reports_connection_reuse_from_urllib3_pools() -> None:
+    session = http_client_module.create_retry_session(_settings())
+    pool = _pool(session)
+    with pool.lease():
+        connection_pool = session.get_adapter(
+            "https://"
+        ).poolmanager.connection_from_host("static.acgsecrets.hk", 443, "https")
+    connection_pool.num_connections = 1
+    connection_pool.num_requests = 5
+
+    stats = pool.stats()
+
+    assert stats.connections_opened == 1
+    assert stats.requests_sent == 5
+    assert stats.reused_requests == 4
+    pool.close()
+
+
+def _known_state(tmp_path: Path, body: str) -> SourceStateRepository:
+    state = SourceStateRepository(tmp_path / "source_state.json")
+    state.record(
+        "https://acgsecrets.hk/bangumi/202607/",
+        SourceFingerprint(
+            body_sha256=hashlib.sha256(body.encode("utf-8")).hexdigest(),
+            etag='"v1"',
+            last_modified="Tue, 14 Jul 2026 00:00:00 GMT",
+            data_sha256="d" * 64,
+        ),
+    )
+    return state
+
+
+def test_source_client_revalidates_only_the_recorded_data_file(
+    tmp_path: Path,
+) -> None:
+    session = _Session(_Response(status_code=304), _Response(text="<html>new</html>"))
+    client = SourceClient(
+        _settings(),
+        session=session,
+        state=_known_state(tmp_path, "<html>old</html>"),
+    )
+
+    unchanged = client.fetch_quarter_document(
+        "2026", "夏", current_data_sha256="d" * 64
+    )
+    edited = client.fetch_quarter_document("2026", "夏", current_data_sha256="e" * 64)
+
+    assert unchanged.unchanged is True
+    assert unchanged.html is None
+    assert session.calls[0][1]["headers"] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Tue, 14 Jul 2026 00:00:00 GMT",
+    }
+    assert edited.unchanged is False
+    assert edited.html == "<html>new</html>"
+    assert session.calls[1][1]["headers"] is None
+
+
+def test_source_client_treats_identical_full_body_as_unchanged(
+    tmp_path: Path,
+) -> None:
+    response = _Response(text="<html>same</html>", headers={"ETag": '"v2"'})
+    client = SourceClient(
+        _settings(),
+        session=_Session(response),
+        state=_known_state(tmp_path, "<html>same</html>"),
+    )
+
+    document = client.fetch_quarter_document("2026", "夏", current_data_sha256="d" * 64)
+
+    assert document.unchanged is True
+    assert document.fingerprint.etag == '"v2"'
+    assert document.html == "<html>same</html>"
+
+
+def test_source_client_streams_only_pages_without_a_usable_fingerprint(
+    tmp_path: Path,
+) -> None:
+    streamed = _Response(chunks=[b"<html>", b"new</html>"], headers={"ETag": '"v3"'})
+    buffered = _Response(text="<html>old</html>")
+    session = _Session(streamed, buffered)
+    client = SourceClient(
+        _settings(),
+        session=session,
+        state=_known_state(tmp_path, "<html>old</html>"),
+    )
+
+    first = client.fetch_quarter_document("2026", "夏", stream=True)
+    second = client.fetch_quarter_document(
+        "2026", "夏", current_data_sha256="d" * 64, stream=True
+    )
+
+    assert first.html is None and first.stream is not None
+    assert session.calls[0][1]["stream"] is True
+    with pytest.raises(RuntimeError, match="read to the end"):
+        first.stream.fingerprint()
+    assert b"".join(first.stream.iter_bytes()) == b"<html>new</html>"
+    first.stream.close()
+    assert streamed.closed is True
+    assert first.stream.fingerprint(card_set_sha256="c" * 64) == SourceFingerprint(
+        body_sha256=hashlib.sha256(b"<html>new</html>").hexdigest(),
+        etag='"v3"',
+        card_set_sha256="c" * 64,
+    )
+    assert second.stream is None and second.unchanged is True
+    assert session.calls[1][1]["stream"] is False
+
+
+def test_source_client_rejects_an_empty_streamed_document() -> None:
+    client = SourceClient(
+        _settings(),
+        session=_Session(_Response(chunks=[b"  ", b"\n"])),
+    )
+    document = client.fetch_quarter_document("2026", "夏", stream=True)
+
+    assert document.stream is not None
+    with pytest.raises(SourceFetchError, match="empty document"):
+        list(document.stream.iter_bytes())
+
+
+def test_source_client_rejects_unsolicited_not_modified() -> None:
+    client = SourceClient(_settings(), session=_Session(_Response(status_code=304)))
+
+    with pytest.raises(SourceFetchError, match="304 to an unconditional request"):
+        client.fetch_quarter_document("2026", "夏", current_data_sha256="d" * 64)
+
+
+def test_source_client_persists_fingerprints_only_when_remembered(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "state" / "source_state.json"
+    client = SourceClient(
+        _settings(),
+        session=_Session(_Response(text="<html>ok</html>")),
+        state=SourceStateRepository(path),
+    )
+    document = client.fetch_quarter_document("2026", "夏")
+    client.close()
+    assert not path.exists()
+
+    client.remember(document.url, document.fingerprint, data_sha256="f" * 64)
+    client.close()
+
+    reloaded = SourceStateRepository(path).get(document.url)
+    assert reloaded == SourceFingerprint(
+        body_sha256=hashlib.sha256(b"<html>ok</html>").hexdigest(),
+        data_sha256="f" * 64,
+    )
+
+
+def test_restored_state_directory_revalidates_the_next_run(
+    tmp_path: Path,
+    project_paths: ProjectPaths,
+) -> None:
+    previous_state = tmp_path / "previous-run" / ".crawler-state"
+    client = SourceClient(
+        _settings(),
+        session=_Session(_Response(text="<html>ok</html>", headers={"ETag": '"v1"'})),
+        state=SourceStateRepository(previous_state / "source_state.json"),
+    )
+    document = client.fetch_quarter_document("2026", "夏")
+    client.remember(document.url, document.fingerprint, data_sha256="f" * 64)
+    client.close()
+
+    # The crawler workflow restores .crawler-state into a fresh checkout.
+    shutil.copytree(previous_state, project_paths.state_dir)
+    session = _Session(_Response(status_code=304))
+    client = SourceClient(
+        _settings(),
+        session=session,
+        state=SourceStateRepository(project_paths.source_state_file),
+    )
+
+    assert client.fetch_quarter_document(
+        "2026", "夏", current_data_sha256="f" * 64
+    ).unchanged
+    assert session.calls[0][1]["headers"] == {"If-None-Match": '"v1"'}
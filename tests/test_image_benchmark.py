@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from benchmarks.image_benchmark import main, synthetic_covers
+
+
+def test_benchmark_compares_both_paths_on_a_corpus(tmp_path: Path) -> None:
+    corpus = tmp_path / "covers"
+    corpus.mkdir()
+    for image in synthetic_covers()[:3]:
+        (corpus / image.name).write_bytes(image.content)
+    (corpus / "notes.txt").write_text("not an image", encoding="utf-8")
+    output = tmp_path / "results" / "images.json"
+
+    exit_code = main(
+        ["--corpus", str(corpus), "--repeat", "1", "--output", str(output)]
+    )
+
+    assert exit_code == 0
+    document = json.loads(output.read_text(encoding="utf-8"))
+    assert document["benchmark"] == "image_verify"
+    rows = document["results"]
+    assert [row["content_type"] for row in rows] == [
+        "image/gif",
+        "image/jpeg",
+        "image/png",
+    ]
+    assert all(row["header_settled"] for row in rows)
+    assert all(row["pillow_microseconds"] > 0 for row in rows)
+
+
+def test_synthetic_covers_span_every_allowed_format() -> None:
+    assert {image.content_type for image in synthetic_covers()} == {
+        "image/avif",
+        "image/gif",
+        "image/jpeg",
+        "image/png",
+        "image/webp",
+    }
+
+
+def test_benchmark_fails_on_an_empty_corpus(tmp_path: Path) -> None:
+    assert main(["--corpus", str(tmp_path)]) == 1
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import io
+from collections.abc import Callable
+
+import pytest
+from PIL import Image
+
+from services.errors import ImageStoreError
+from services.image_normalize import NormalizeProfile, normalize_image
+
+WEBP = NormalizeProfile(max_edge=400, format="webp", quality=80)
+
+
+def _gradient(size: tuple[int, int], mode: str = "RGB") -> Image.Image:
+    gradient = Image.linear_gradient("L").resize(size)
+    image = gradient.convert(mode)
+    if "A" in mode:
+        image.putalpha(gradient)
+    return image
+
+
+def _opened(content: bytes) -> tuple[str | None, tuple[int, int], str]:
+    with Image.open(io.BytesIO(content)) as image:
+        return image.format, image.size, image.mode
+
+
+@pytest.mark.parametrize(
+    ("profile", "mode", "expected"),
+    [
+        (WEBP, "RGB", ("WEBP", (400, 200), "RGB")),
+        (WEBP, "RGBA", ("WEBP", (400, 200), "RGBA")),
+        (
+            NormalizeProfile(max_edge=300, format="jpeg", quality=70),
+            "RGBA",
+            ("JPEG", (300, 150), "RGB"),
+        ),
+    ],
+)
+def test_large_covers_are_capped_and_re_encoded(
+    encoded_image: Callable[..., bytes],
+    profile: NormalizeProfile,
+    mode: str,
+    expected: tuple[str, tuple[int, int], str],
+) -> None:
+    original = encoded_image(_gradient((1600, 800), mode))
+
+    normalized = normalize_image(memoryview(original), profile)
+
+    assert _opened(normalized) == expected
+
+
+def test_small_covers_are_never_enlarged_or_grown(
+    encoded_image: Callable[..., bytes],
+) -> None:
+    tiny = encoded_image(_gradient((40, 60)), "JPEG", quality=20)
+
+    normalized = normalize_image(tiny, WEBP)
+
+    assert _opened(normalized)[1] == (40, 60)
+    assert len(normalized) <= len(tiny)
+
+
+def test_animated_images_are_left_unchanged(
+    encoded_image: Callable[..., bytes],
+) -> None:
+    frames = [Image.new("P", (800, 800), color) for color in (1, 2)]
+    animated = encoded_image(frames[0], "GIF", save_all=True, append_images=frames[1:])
+
+    assert normalize_image(animated, WEBP) == animated
+
+
+def test_undecodable_content_is_an_image_store_error() -> None:
+    with pytest.raises(ImageStoreError, match="Unable to normalize image"):
+        normalize_image(b"not an image", WEBP)
+
+
+def test_profile_key_names_every_setting() -> None:
+    assert WEBP.key == "webp-q80-e400"
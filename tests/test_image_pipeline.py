@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from services.errors import ImageStoreError
+from services.image_pipeline import ByteBudget, ImagePipeline
+
+
+def _pipeline(**overrides: object) -> ImagePipeline[bytes, str]:
+    options: dict[str, object] = {
+        "download": lambda url: url.encode(),
+        "verify": lambda content: content.decode().upper(),
+        "upload": lambda url, name, content, verified: f"{name}:{verified}",
+        "size": len,
+        "download_workers": 2,
+        "verify_workers": 1,
+        "upload_workers": 1,
+        "max_inflight_bytes": 1024,
+        "max_item_bytes": 64,
+    }
+    options.update(overrides)
+    return ImagePipeline(**options)  # type: ignore[arg-type]
+
+
+def test_downloads_continue_while_an_upload_is_blocked() -> None:
+    release = threading.Event()
+    downloaded: list[str] = []
+
+    def download(url: str) -> bytes:
+        downloaded.append(url)
+        return url.encode()
+
+    def upload(url: str, name: str, content: bytes, verified: str) -> str:
+        release.wait(5)
+        return f"{name}:{verified}"
+
+    pipeline = _pipeline(download=download, upload=upload)
+    try:
+        futures = [pipeline.submit(f"u{index}", f"n{index}") for index in range(4)]
+        deadline = time.monotonic() + 5
+        while len(downloaded) < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert sorted(downloaded) == ["u0", "u1", "u2", "u3"]
+        assert not any(future.done() for future in futures)
+        release.set()
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        release.set()
+        pipeline.close()
+
+    assert results == ["n0:U0", "n1:U1", "n2:U2", "n3:U3"]
+    stats = pipeline.stats()
+    assert (stats.downloads, stats.uploads) == (4, 4)
+
+
+def test_inflight_bytes_stay_within_the_budget() -> None:
+    active = 0
+    peak_active = 0
+    lock = threading.Lock()
+
+    def download(url: str) -> bytes:
+        nonlocal active, peak_active
+        with lock:
+            active += 1
+            peak_active = max(peak_active, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return b"x" * 6
+
+    pipeline = _pipeline(
+        download=download,
+        download_workers=4,
+        max_inflight_bytes=16,
+        max_item_bytes=10,
+    )
+    try:
+        futures = [pipeline.submit(f"u{index}", "n") for index in range(8)]
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        pipeline.close()
+
+    # A 10 byte reservation fits next to one finished 6 byte image, not two.
+    assert peak_active == 1
+    assert pipeline.stats().peak_inflight_bytes <= 16
+
+
+def test_stage_failures_reach_the_caller_and_release_their_bytes() -> None:
+    def verify(content: bytes) -> str:
+        raise ImageStoreError("not a valid image")
+
+    pipeline = _pipeline(verify=verify, max_inflight_bytes=64, max_item_bytes=64)
+    try:
+        for _ in range(3):
+            with pytest.raises(ImageStoreError, match="not a valid image"):
+                pipeline.store("https://static.acgsecrets.hk/a.png", "Broken")
+    finally:
+        pipeline.close()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        pipeline.submit("u", "n")
+
+
+def test_byte_budget_clamps_oversized_reservations() -> None:
+    budget = ByteBudget(10)
+
+    assert budget.acquire(50) == 10
+    budget.release(10)
+    assert budget.acquire(4) == 4
+    assert budget.peak == 10
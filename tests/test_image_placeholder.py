@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import base64
+import io
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from models import IMAGE_PLACEHOLDER_PATTERN
+from services.cache_repository import CacheRepository
+from services.errors import ImageStoreError
+from services.image_placeholder import (
+    PLACEHOLDER_EDGE,
+    ImageMetadata,
+    cached_image_metadata,
+    describe_image,
+    metadata_key,
+)
+
+PUBLIC_ID = "anime_covers/" + "b" * 64
+STORED_URL = f"https://res.cloudinary.com/demo/image/upload/f_auto/v1/{PUBLIC_ID}"
+
+
+def _placeholder_image(metadata: ImageMetadata) -> Image.Image:
+    encoded = metadata.placeholder.removeprefix("data:image/webp;base64,")
+    image = Image.open(io.BytesIO(base64.b64decode(encoded)))
+    image.load()
+    return image
+
+
+@pytest.mark.parametrize("image_format", ["JPEG", "PNG", "GIF", "WEBP", "AVIF"])
+def test_describe_image_reports_size_and_tiny_webp_placeholder(
+    encoded_image: Callable[..., bytes],
+    image_format: str,
+) -> None:
+    cover = Image.linear_gradient("L").resize((450, 640)).convert("RGB")
+
+    metadata = describe_image(encoded_image(cover, image_format), 10_000_000)
+
+    assert (metadata.width, metadata.height) == (450, 640)
+    assert IMAGE_PLACEHOLDER_PATTERN.fullmatch(metadata.placeholder)
+    preview = _placeholder_image(metadata)
+    assert preview.format == "WEBP"
+    assert max(preview.size) == PLACEHOLDER_EDGE
+    assert len(metadata.placeholder) < 400
+
+
+def test_describe_image_follows_exif_orientation(
+    encoded_image: Callable[..., bytes],
+) -> None:
+    cover = Image.new("RGB", (300, 200), (200, 30, 30))
+    exif = cover.getexif()
+    exif[0x0112] = 6  # rotate 90° clockwise when displayed
+
+    metadata = describe_image(encoded_image(cover, "JPEG", exif=exif), 10_000_000)
+
+    assert (metadata.width, metadata.height) == (200, 300)
+    assert _placeholder_image(metadata).size == (11, 16)
+
+
+def test_describe_image_flattens_transparency_onto_card_background(
+    encoded_image: Callable[..., bytes],
+) -> None:
+    cover = encoded_image(mode="RGBA", size=(40, 40), color=(255, 0, 0, 0))
+
+    metadata = describe_image(cover, 10_000_000)
+
+    red, green, blue = _placeholder_image(metadata).convert("RGB").getpixel((8, 8))
+    assert max(abs(red - 37), abs(green - 37), abs(blue - 37)) < 8
+
+
+def test_describe_image_rejects_oversized_and_invalid_content(
+    encoded_image: Callable[..., bytes],
+) -> None:
+    cover = encoded_image(size=(100, 100))
+
+    with pytest.raises(ImageStoreError, match="pixel safety limit"):
+        describe_image(cover, 1_000)
+    with pytest.raises(ImageStoreError, match="Unable to describe image"):
+        describe_image(b"not an image", 1_000)
+
+
+def test_cache_value_round_trips_and_rejects_malformed_entries() -> None:
+    metadata = ImageMetadata(225, 320, "data:image/webp;base64,UklGRg==")
+
+    assert ImageMetadata.from_cache_value(metadata.cache_value()) == metadata
+    for value in (
+        None,
+        "",
+        "https://res.cloudinary.com/demo/image/upload/v1/x",
+        "0x320 data:image/webp;base64,UklGRg==",
+        "225x320 data:image/svg+xml;base64,PHN2Zz4=",
+    ):
+        assert ImageMetadata.from_cache_value(value) is None
+
+
+def test_cached_metadata_is_found_through_any_delivery_url(tmp_path: Path) -> None:
+    cache = CacheRepository(tmp_path / "cache.json")
+    metadata = ImageMetadata(225, 320, "data:image/webp;base64,UklGRg==")
+    cache.set(metadata_key(PUBLIC_ID), metadata.cache_value())
+
+    assert cached_image_metadata(cache, STORED_URL) == metadata
+    assert (
+        cached_image_metadata(
+            cache, STORED_URL.replace("/upload/", "/upload/c_limit,w_240/")
+        )
+        == metadata
+    )
+    assert cached_image_metadata(cache, "https://placehold.co/50x50") is None
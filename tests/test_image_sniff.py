@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from collections.abc import Callable
+
+import pytest
+
+from services.errors import ImageStoreError
+from services.image_sniff import ImageHeader, check_image_header, sniff_image
+
+COVER_SIZE = (225, 319)
+
+
+@pytest.mark.parametrize(
+    ("image_format", "mode", "params"),
+    [
+        ("PNG", "RGBA", {}),
+        ("JPEG", "RGB", {}),
+        ("JPEG", "RGB", {"progressive": True}),
+        ("GIF", "P", {}),
+        ("WEBP", "RGB", {}),
+        ("WEBP", "RGBA", {"lossless": True}),
+        ("WEBP", "RGBA", {"exif": b"Exif\0\0"}),
+        ("AVIF", "RGB", {}),
+    ],
+    ids=[
+        "png",
+        "jpeg",
+        "progressive-jpeg",
+        "gif",
+        "webp-lossy",
+        "webp-lossless",
+        "webp-extended",
+        "avif",
+    ],
+)
+def test_sniffed_dimensions_match_pillow(
+    encoded_image: Callable[..., bytes],
+    image_format: str,
+    mode: str,
+    params: dict[str, object],
+) -> None:
+    content = encoded_image(None, image_format, mode=mode, size=COVER_SIZE, **params)
+    served = image_format.lower()
+
+    assert sniff_image(memoryview(content)) == ImageHeader(served, *COVER_SIZE)
+    assert check_image_header(content, f"image/{served}", 100_000) is not None
+
+
+@pytest.mark.parametrize(
+    "content",
+    [b"not an image", b"RIFF\0\0\0\0WEBPVP8Z" + b"\0" * 20],
+    ids=["unknown", "webp"],
+)
+def test_unsure_headers_defer_to_a_full_decode(content: bytes) -> None:
+    assert sniff_image(content) is None
+
+
+@pytest.mark.parametrize(
+    ("image_format", "length"),
+    [("PNG", 20), ("JPEG", 100), ("AVIF", 40)],
+)
+def test_truncated_headers_defer_to_a_full_decode(
+    encoded_image: Callable[..., bytes],
+    image_format: str,
+    length: int,
+) -> None:
+    content = encoded_image(None, image_format, size=COVER_SIZE)
+
+    assert sniff_image(content[:length]) is None
+
+
+def test_magic_bytes_must_match_the_served_content_type(
+    encoded_image: Callable[..., bytes],
+) -> None:
+    with pytest.raises(ImageStoreError, match="is png but was served as image/jpeg"):
+        check_image_header(encoded_image(size=COVER_SIZE), "image/jpeg", 100_000)
+
+
+def test_oversized_dimensions_are_rejected_from_the_header_alone() -> None:
+    ihdr = struct.pack(">IIBBBBB", 50_000, 50_000, 8, 2, 0, 0, 0)
+    content = (
+        b"\x89PNG\r\n\x1a\n"
+        + struct.pack(">I", len(ihdr))
+        + b"IHDR"
+        + ihdr
+        + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+    )
+
+    with pytest.raises(ImageStoreError, match="2500000000 pixels"):
+        check_image_header(content, "image/png", 40_000_000)
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import hashlib
 import io
+import threading
+import time
 from pathlib import Path
 
 import pytest
@@ -10,9 +12,12 @@ from PIL import Image
 import services.image_store as image_store_module
 from services.cache_repository import CacheRepository
 from services.errors import ImageStoreError, QuotaExceededError
-from services.http_client import DownloadedImage
+from services.http_client import DownloadedImage, ImageBuffer
 from services.image_store import CloudinaryImageStore
+from services.original_store import OriginalImageStore, OriginalStoreStats
+from services.retention import is_managed_public_id
 from services.settings import CrawlerSettings
+from services.single_flight import SingleFlight, SingleFlightStats
 
 
 def _settings(**overrides: object) -> CrawlerSettings:
@@ -53,6 +58,9 @@ class _Downloader:
             final_url=source_url,
         )
 
+    def close(self) -> None:
+        pass
+
 
 def _store(
     tmp_path: Path,
@@ -65,6 +73,11 @@ def _store(
     monkeypatch.setenv("CLOUDINARY_API_KEY", "test-key")
     monkeypatch.setenv("CLOUDINARY_API_SECRET", "test-secret")
     monkeypatch.setattr(image_store_module.cloudinary, "config", lambda **kwargs: None)
+    monkeypatch.setattr(
+        image_store_module.cloudinary.api,
+        "usage",
+        lambda: {"credits": {"used_percent": 1}},
+    )
     return CloudinaryImageStore(
         settings or _settings(),
         CacheRepository(tmp_path / "cache.json"),
@@ -84,6 +97,7 @@ def test_quota_check_allows_safe_usage_and_rejects_limit(
     )
     store.assert_quota_available()
 
+    store = _store(tmp_path, monkeypatch)
     monkeypatch.setattr(
         image_store_module.cloudinary.api,
         "usage",
@@ -188,6 +202,150 @@ def test_upload_success_caches_content_and_source_keys(
     assert store.cache.get(source_key) == cloud_url
 
 
+def test_streamed_download_uploads_its_buffer_with_precomputed_digests(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    content = _png_bytes()
+    buffer = ImageBuffer(len(content), len(content))
+    buffer.append(content)
+    downloaded = buffer.finish("image/png", "https://static.acgsecrets.hk/a.png")
+    store = _store(tmp_path, monkeypatch)
+    uploaded: list[object] = []
+
+    def upload(payload: object, **kwargs: object) -> dict[str, str]:
+        uploaded.append(payload)
+        return {"public_id": str(kwargs["public_id"])}
+
+    monkeypatch.setattr(image_store_module.cloudinary.uploader, "upload", upload)
+    monkeypatch.setattr(
+        image_store_module.cloudinary.utils,
+        "cloudinary_url",
+        lambda public_id, **kwargs: (f"https://res.cloudinary.com/{public_id}", {}),
+    )
+    monkeypatch.setattr(
+        image_store_module.hashlib,
+        "md5",
+        lambda *args, **kwargs: pytest.fail("digests must not be recomputed"),
+    )
+
+    store.store_downloaded(downloaded.final_url, "Streamed", downloaded)
+
+    assert uploaded == [downloaded.content]
+    assert uploaded[0] is downloaded.content
+    digest = hashlib.sha256(content).hexdigest()
+    assert store.cache.get(f"cloudinary_sha256_{digest}")
+
+
+def test_normalized_uploads_are_keyed_by_original_digest_and_profile(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    buffer = io.BytesIO()
+    Image.new("RGB", (900, 300), (255, 0, 0)).save(buffer, format="PNG")
+    content = buffer.getvalue()
+    store = _store(
+        tmp_path,
+        monkeypatch,
+        downloader=_Downloader(content),
+        settings=_settings(image_normalize=True, image_max_edge=300),
+    )
+    uploads: list[tuple[bytes, object]] = []
+
+    def upload(payload: bytes, **kwargs: object) -> dict[str, str]:
+        uploads.append((payload, kwargs["public_id"]))
+        return {"public_id": str(kwargs["public_id"])}
+
+    monkeypatch.setattr(image_store_module.cloudinary.uploader, "upload", upload)
+    monkeypatch.setattr(
+        image_store_module.cloudinary.utils,
+        "cloudinary_url",
+        lambda public_id, **kwargs: (f"https://res.cloudinary.com/{public_id}", {}),
+    )
+
+    first = store.store("https://static.acgsecrets.hk/a.png", "A")
+    second = store.store("https://static.acgsecrets.hk/b.png", "B")
+
+    digest = hashlib.sha256(content).hexdigest()
+    asset = hashlib.sha256(f"{digest}_webp-q82-e300".encode()).hexdigest()
+    assert first == second == f"https://res.cloudinary.com/anime_covers/{asset}"
+    assert [public_id for _payload, public_id in uploads] == [f"anime_covers/{asset}"]
+    assert is_managed_public_id(uploads[0][1])
+    with Image.open(io.BytesIO(uploads[0][0])) as uploaded:
+        assert (uploaded.format, uploaded.size) == ("WEBP", (300, 100))
+    assert store.cache.get(f"cloudinary_sha256_{digest}_webp-q82-e300") == first
+
+
+def test_upload_caches_dimensions_and_placeholder_for_the_stored_cover(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    buffer = io.BytesIO()
+    Image.new("RGB", (90, 128), (0, 0, 255)).save(buffer, format="PNG")
+    store = _store(tmp_path, monkeypatch, downloader=_Downloader(buffer.getvalue()))
+    monkeypatch.setattr(
+        image_store_module.cloudinary.uploader,
+        "upload",
+        lambda payload, **kwargs: {"public_id": kwargs["public_id"]},
+    )
+    monkeypatch.setattr(
+        image_store_module.cloudinary.utils,
+        "cloudinary_url",
+        lambda public_id, **kwargs: (
+            f"https://res.cloudinary.com/demo/image/upload/f_auto/v1/{public_id}",
+            {},
+        ),
+    )
+
+    url = store.store("https://static.acgsecrets.hk/a.png", "A")
+
+    metadata = store.image_metadata(url)
+    assert metadata is not None
+    assert (metadata.width, metadata.height) == (90, 128)
+    assert metadata.placeholder.startswith("data:image/webp;base64,")
+    assert store.image_metadata("https://placehold.co/50x50") is None
+
+
+def test_kept_original_is_reused_after_the_url_cache_is_lost(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    originals = OriginalImageStore(tmp_path / "originals", max_bytes=1024 * 1024)
+    first_downloader = _Downloader(_png_bytes())
+    first = _store(tmp_path, monkeypatch, downloader=first_downloader)
+    first.originals = originals
+    uploads: list[object] = []
+
+    def upload(payload: bytes, **kwargs: object) -> dict[str, object]:
+        uploads.append(kwargs["public_id"])
+        return {"public_id": kwargs["public_id"]}
+
+    monkeypatch.setattr(image_store_module.cloudinary.uploader, "upload", upload)
+    monkeypatch.setattr(
+        image_store_module.cloudinary.utils,
+        "cloudinary_url",
+        lambda public_id, **kwargs: (f"https://res.cloudinary.com/{public_id}", {}),
+    )
+    url = first.store("https://static.acgsecrets.hk/a.png", "A")
+    first.close()
+
+    second_downloader = _Downloader(b"unused")
+    second = CloudinaryImageStore(
+        _settings(),
+        CacheRepository(tmp_path / "empty-cache.json"),
+        downloader=second_downloader,  # type: ignore[arg-type]
+        originals=OriginalImageStore(tmp_path / "originals", max_bytes=1024 * 1024),
+    )
+
+    assert second.store("https://static.acgsecrets.hk/a.png", "A") == url
+    assert first_downloader.calls == ["https://static.acgsecrets.hk/a.png"]
+    assert second_downloader.calls == []
+    assert len(uploads) == 2
+    assert second.original_stats() == OriginalStoreStats(
+        hits=1, misses=0, writes=0, evictions=0, stored_bytes=len(_png_bytes())
+    )
+
+
 def test_upload_failure_is_raised_without_cache_mutation(
     tmp_path: Path,
     monkeypatch: pytest.MonkeyPatch,
@@ -248,3 +406,117 @@ def test_oversized_pixel_dimensions_never_reach_upload(
 
     with pytest.raises(ImageStoreError, match="110 pixels.*100 pixel safety limit"):
         store.store("https://static.acgsecrets.hk/oversized.png", "Oversized")
+
+
+@pytest.mark.parametrize(("rate", "decoded"), [(0.0, False), (1.0, True)])
+def test_full_decode_runs_only_for_sampled_or_unsure_images(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    rate: float,
+    decoded: bool,
+) -> None:
+    content = bytearray(_png_bytes())
+    # Corrupt the IDAT chunk; only a full Pillow verify notices.
+    content[content.index(b"IDAT") + 6] ^= 0xFF
+    store = _store(
+        tmp_path,
+        monkeypatch,
+        settings=_settings(image_full_verify_rate=rate),
+    )
+
+    def verify(image: DownloadedImage) -> object:
+        return store._verify_downloaded(image)
+
+    corrupt = DownloadedImage(bytes(content), "image/png", "https://a/x.png")
+    unsure = DownloadedImage(b"not an image", "image/png", "https://a/y.png")
+    if decoded:
+        with pytest.raises(ImageStoreError, match="not a valid image"):
+            verify(corrupt)
+    else:
+        assert verify(corrupt).sha256 == hashlib.sha256(content).hexdigest()
+    with pytest.raises(ImageStoreError, match="not a valid image"):
+        verify(unsure)
+
+
+def test_concurrent_stores_of_one_source_share_a_single_download(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    release = threading.Event()
+
+    class _SlowDownloader(_Downloader):
+        def download(self, source_url: str) -> DownloadedImage:
+            assert release.wait(timeout=5)
+            return super().download(source_url)
+
+    downloader = _SlowDownloader(_png_bytes())
+    store = _store(tmp_path, monkeypatch, downloader=downloader)
+    uploads: list[str] = []
+
+    def upload(payload: bytes, **kwargs: object) -> dict[str, str]:
+        uploads.append(str(kwargs["public_id"]))
+        return {"public_id": str(kwargs["public_id"])}
+
+    cloud_url = "https://res.cloudinary.com/test-cloud/image/upload/shared.webp"
+    monkeypatch.setattr(image_store_module.cloudinary.uploader, "upload", upload)
+    monkeypatch.setattr(
+        image_store_module.cloudinary.utils,
+        "cloudinary_url",
+        lambda public_id, **kwargs: (cloud_url, {}),
+    )
+    results: list[str] = []
+    callers = [
+        threading.Thread(
+            target=lambda: results.append(
+                store.store("https://static.acgsecrets.hk/shared.png", "Shared")
+            )
+        )
+        for _ in range(3)
+    ]
+    for caller in callers:
+        caller.start()
+    while store.single_flight_stats().waits < 2:
+        time.sleep(0.001)
+    release.set()
+    for caller in callers:
+        caller.join(timeout=5)
+
+    assert results == [cloud_url] * 3
+    assert downloader.calls == ["https://static.acgsecrets.hk/shared.png"]
+    assert len(uploads) == 1
+    assert store.single_flight_stats() == SingleFlightStats(leaders=1, waits=2, hits=2)
+    assert store.store("https://static.acgsecrets.hk/shared.png", "Shared") == cloud_url
+    assert store.single_flight_stats().leaders == 1
+
+
+def test_single_flight_followers_share_the_leader_failure() -> None:
+    flights: SingleFlight[str] = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors: list[BaseException] = []
+
+    def failing() -> str:
+        started.set()
+        assert release.wait(timeout=5)
+        raise ImageStoreError("download failed once")
+
+    def call() -> None:
+        try:
+            flights.do("source_key", failing)
+        except ImageStoreError as exc:
+            errors.append(exc)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(timeout=5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    while flights.stats().waits < 1:
+        time.sleep(0.001)
+    release.set()
+    leader.join(timeout=5)
+    follower.join(timeout=5)
+
+    assert [str(error) for error in errors] == ["download failed once"] * 2
+    assert flights.stats() == SingleFlightStats(leaders=1, waits=1, hits=0)
+    assert flights.do("source_key", lambda: "retried") == "retried"
@@ -117,3 +117,65 @@ def test_quarter_dataset_rejects_invalid_source_urls(source_url: str) -> None:
             generated_at=datetime(2026, 7, 14, tzinfo=TAIPEI_TZ),
             source_url=source_url,
         )
+
+
+PLACEHOLDER = "data:image/webp;base64,UklGRg=="
+
+
+def test_anime_accepts_complete_image_metadata() -> None:
+    anime = Anime.model_validate(
+        {
+            **_anime_payload(),
+            "image_width": 225,
+            "image_height": 320,
+            "image_placeholder": PLACEHOLDER,
+        }
+    )
+
+    assert anime.has_image_metadata
+
+
+@pytest.mark.parametrize(
+    "metadata",
+    (
+        {"image_width": 225},
+        {"image_width": 225, "image_height": 320},
+        {"image_width": 0, "image_height": 320, "image_placeholder": PLACEHOLDER},
+        {
+            "image_width": 225,
+            "image_height": 320,
+            "image_placeholder": "https://example.com/a.webp",
+        },
+        {
+            "image_width": 225,
+            "image_height": 320,
+            "image_placeholder": "data:image/svg+xml;base64,PHN2Zz4=",
+        },
+    ),
+)
+def test_anime_rejects_partial_or_unsafe_image_metadata(
+    metadata: dict[str, object],
+) -> None:
+    with pytest.raises(ValidationError):
+        Anime.model_validate({**_anime_payload(), **metadata})
+
+
+def test_image_metadata_requires_schema_version_2() -> None:
+    anime = Anime.model_validate(
+        {
+            **_anime_payload(),
+            "image_width": 225,
+            "image_height": 320,
+            "image_placeholder": PLACEHOLDER,
+        }
+    )
+    generated_at = datetime(2026, 7, 14, tzinfo=TAIPEI_TZ)
+
+    with pytest.raises(ValidationError, match="requires schema_version 2"):
+        QuarterDataset(anime_list=[anime], generated_at=generated_at)
+    assert (
+        QuarterDataset(
+            schema_version=2, anime_list=[anime], generated_at=generated_at
+        ).schema_version
+        == 2
+    )
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+import services.original_store as original_store_module
+from services.atomic_io import atomic_write_bytes
+from services.original_store import OriginalImageStore
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def test_stored_original_is_found_by_source_url_after_restart(
+    tmp_path: Path,
+    encoded_image: Callable[..., bytes],
+) -> None:
+    content = encoded_image(color=(255, 0, 0))
+    store = OriginalImageStore(tmp_path, max_bytes=1024 * 1024)
+    store.put(_digest(content), content, source_url="https://static.example/a.png")
+    assert store.save_if_changed() is True
+    assert store.save_if_changed() is False
+
+    reopened = OriginalImageStore(tmp_path, max_bytes=1024 * 1024)
+    original = reopened.get_source("https://static.example/a.png")
+
+    assert original is not None
+    assert original.content == content
+    assert original.content_type == "image/png"
+    assert original.sha256 == _digest(content)
+    assert original.md5 == hashlib.md5(content).hexdigest()
+    assert reopened.get_source("https://static.example/b.png") is None
+    stats = reopened.stats()
+    assert (stats.hits, stats.misses, stats.stored_bytes) == (1, 1, len(content))
+
+
+def test_byte_budget_evicts_least_recently_used_originals(
+    tmp_path: Path,
+    encoded_image: Callable[..., bytes],
+) -> None:
+    first, second, third = (
+        encoded_image(color=color) for color in ((1, 0, 0), (0, 1, 0), (0, 0, 1))
+    )
+    store = OriginalImageStore(tmp_path, max_bytes=len(first) + len(second) + 1)
+    store.put(_digest(first), first, source_url="https://static.example/1.png")
+    store.put(_digest(second), second)
+    assert store.get(_digest(first)) == first
+
+    store.put(_digest(third), third)
+
+    assert store.get(_digest(second)) is None
+    assert store.get(_digest(first)) == first
+    assert store.get(_digest(third)) == third
+    assert store.stats().evictions == 1
+    assert not (tmp_path / _digest(second)[:2] / _digest(second)).exists()
+
+
+def test_evicted_sources_are_dropped_from_the_saved_index(
+    tmp_path: Path,
+    encoded_image: Callable[..., bytes],
+) -> None:
+    first, second = encoded_image(color=(1, 0, 0)), encoded_image(color=(0, 1, 0))
+    store = OriginalImageStore(tmp_path, max_bytes=max(len(first), len(second)))
+    store.put(_digest(first), first, source_url="https://static.example/1.png")
+    store.put(_digest(second), second, source_url="https://static.example/2.png")
+    store.save_if_changed()
+
+    reopened = OriginalImageStore(tmp_path, max_bytes=1024 * 1024)
+
+    assert reopened.get_source("https://static.example/1.png") is None
+    assert reopened.get_source("https://static.example/2.png") is not None
+    assert "1.png" not in store.index_path.read_text(encoding="utf-8")
+
+
+def test_corrupt_and_oversized_originals_are_never_returned(
+    tmp_path: Path,
+    encoded_image: Callable[..., bytes],
+) -> None:
+    content = encoded_image(color=(9, 9, 9))
+    store = OriginalImageStore(tmp_path, max_bytes=len(content))
+    store.put(_digest(content), content, source_url="https://static.example/a.png")
+    path = tmp_path / _digest(content)[:2] / _digest(content)
+    path.write_bytes(content[:-1] + b"\x00")
+
+    assert store.get_source("https://static.example/a.png") is None
+    assert not path.exists()
+    assert store.stats().stored_bytes == 0
+
+    large = encoded_image(color=(1, 2, 3), size=(64, 64))
+    store.put(_digest(large), large)
+    assert store.get(_digest(large)) is None
+    assert store.stats().writes == 1
+
+
+def test_put_never_rewrites_an_existing_digest_file(
+    tmp_path: Path,
+    encoded_image: Callable[..., bytes],
+) -> None:
+    content = encoded_image(color=(4, 5, 6))
+    store = OriginalImageStore(tmp_path, max_bytes=1024 * 1024)
+    # Another store over the same directory wrote the file after this opened.
+    OriginalImageStore(tmp_path, max_bytes=1024 * 1024).put(_digest(content), content)
+
+    store.put(_digest(content), content, source_url="https://static.example/a.png")
+    original = store.get_source("https://static.example/a.png")
+    assert original is not None
+    store.put(_digest(content), original.content, source_url=original.final_url)
+
+    assert store.stats().writes == 0
+    assert store.stats().stored_bytes == len(content)
+
+
+def test_file_io_runs_without_holding_the_store_lock(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    encoded_image: Callable[..., bytes],
+) -> None:
+    store = OriginalImageStore(tmp_path, max_bytes=1024 * 1024)
+    unlocked: list[bool] = []
+
+    def lock_is_free() -> None:
+        probe = threading.Thread(target=store.stats)
+        probe.start()
+        probe.join(timeout=1)
+        unlocked.append(not probe.is_alive())
+
+    def write(path: Path, content: bytes) -> None:
+        lock_is_free()
+        atomic_write_bytes(path, content)
+
+    def read(path: Path) -> bytes:
+        lock_is_free()
+        return real_read(path)
+
+    real_read = Path.read_bytes
+    monkeypatch.setattr(original_store_module, "atomic_write_bytes", write)
+    content = encoded_image(color=(7, 8, 9))
+    store.put(_digest(content), content)
+    monkeypatch.setattr(Path, "read_bytes", read)
+
+    assert store.get(_digest(content)) == content
+    assert unlocked == [True, True]
@@ -5,7 +5,12 @@ from pathlib import Path
 import pytest
 
 from services.errors import ItemParseError
-from services.parser import extract_item_html, parse_anime_item
+from services.parser import (
+    extract_item_html,
+    fingerprint_document,
+    parse_anime_item,
+    parse_document,
+)
 
 SOURCE_ID = 'acgs-bangumi-anime-id="anime-2200"'
 NORMAL_TIME = '<div class="time_today main_time">7月5日起／每週日／23時0分</div>'
@@ -91,3 +96,48 @@ def test_parser_uses_explicit_missing_time_values(fixture_dir: Path) -> None:
 def test_extract_items_rejects_changed_card_structure() -> None:
     with pytest.raises(ItemParseError, match="No anime cards matched"):
         extract_item_html('<div id="acgs-anime-list"></div>')
+
+
+def test_fingerprint_ignores_page_chrome_and_card_order(fixture_dir: Path) -> None:
+    document = _document(fixture_dir)
+    item_html = _single_item(document)
+    second = item_html.replace("anime-2200", "anime-2201").replace("測試動畫", "第二部")
+    first_order = f'<div id="acgs-anime-list">{item_html}{second}</div>'
+    swapped = f'<p>廣告</p><div id="acgs-anime-list">\n{second}\n{item_html}</div>'
+
+    document_digest, card_set_digest = fingerprint_document(first_order)
+    swapped_document, swapped_cards = fingerprint_document(swapped)
+
+    assert swapped_cards == card_set_digest
+    assert swapped_document != document_digest
+    assert fingerprint_document(
+        document.replace("<body>", "<body><!-- nonce --><script>x=1</script>")
+    ) == fingerprint_document(document)
+
+
+def test_fingerprint_tracks_parsed_card_content(fixture_dir: Path) -> None:
+    document = _document(fixture_dir)
+    edited_story = _replace_once(document, STORY, STORY.replace("第一段", "第 一段"))
+
+    assert fingerprint_document(edited_story)[1] != fingerprint_document(document)[1]
+
+
+def test_parse_document_matches_per_card_parsing_and_isolates_failures(
+    fixture_dir: Path,
+) -> None:
+    item_html = _single_item(_document(fixture_dir))
+    broken = item_html.replace(SOURCE_ID, "")
+    second = item_html.replace("anime-2200", "anime-2201").replace("測試動畫", "第二部")
+    document = f'<div id="acgs-anime-list">{item_html}{broken}{second}</div>'
+
+    results = parse_document(document)
+
+    assert results[0] == parse_anime_item(item_html)
+    assert isinstance(results[1], ItemParseError)
+    assert "missing acgs-bangumi-anime-id" in str(results[1])
+    assert results[2] == parse_anime_item(second)
+
+
+def test_parse_document_rejects_changed_card_structure() -> None:
+    with pytest.raises(ItemParseError, match="No anime cards matched"):
+        parse_document('<div id="acgs-anime-list"></div>')
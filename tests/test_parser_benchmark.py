@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from benchmarks.parser_benchmark import main, synthetic_page
+from services.parser import parse_document
+
+
+def test_synthetic_page_cards_are_valid_and_exercise_fallbacks() -> None:
+    candidates = parse_document(synthetic_page(8))
+
+    assert len(candidates) == 8
+    assert all(not isinstance(candidate, Exception) for candidate in candidates)
+    fallback = candidates[3]
+    assert (fallback.premiere_date, fallback.premiere_time) == ("四", "21:03")
+
+
+def test_benchmark_writes_machine_readable_results(
+    fixture_dir: Path,
+    tmp_path: Path,
+) -> None:
+    output = tmp_path / "results" / "parser.json"
+
+    exit_code = main(
+        [
+            "--fixtures",
+            str(fixture_dir),
+            "--synthetic",
+            "12",
+            "--repeat",
+            "1",
+            "--output",
+            str(output),
+        ]
+    )
+
+    assert exit_code == 0
+    document = json.loads(output.read_text(encoding="utf-8"))
+    assert document["benchmark"] == "parser"
+    stages = {(row["page"], row["stage"]) for row in document["results"]}
+    assert ("synthetic_12", "parse_date_time") in stages
+    assert ("acgsecrets_202607_minimal", "extract_item_html") in stages
+    synthetic = [row for row in document["results"] if row["page"] == "synthetic_12"]
+    assert {row["cards"] for row in synthetic} == {12}
+    assert all(row["peak_memory_bytes"] > 0 for row in synthetic)
+
+
+def test_benchmark_fails_without_pages(tmp_path: Path) -> None:
+    assert main(["--fixtures", str(tmp_path), "--synthetic"]) == 1
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from pathlib import Path
+
+import pytest
+
+from services.errors import ItemParseError
+from services.parser import (
+    PARSER_BACKENDS,
+    StreamingCardParser,
+    fingerprint_document,
+    iter_streamed_cards,
+    parse_document,
+    parse_fingerprinted_document,
+)
+
+FIXTURES = sorted(
+    (Path(__file__).parent / "fixtures").glob("acgsecrets_*.html"),
+    key=lambda path: path.name,
+)
+
+
+def _normalized(entries: Iterable[object]) -> list[object]:
+    return [
+        (type(entry).__name__, str(entry))
+        if isinstance(entry, ItemParseError)
+        else entry
+        for entry in entries
+    ]
+
+
+def _outcomes(document: str, backend: str) -> list[object]:
+    return _normalized(parse_document(document, backend=backend))
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.stem)
+@pytest.mark.parametrize("backend", sorted(set(PARSER_BACKENDS) - {"bs4"}))
+def test_parser_backends_match_the_reference_backend(
+    fixture: Path,
+    backend: str,
+) -> None:
+    document = fixture.read_text(encoding="utf-8")
+
+    expected = _outcomes(document, "bs4")
+
+    assert expected
+    assert _outcomes(document, backend) == expected
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.stem)
+@pytest.mark.parametrize("chunk_size", [1, 97, 1 << 20])
+def test_streamed_cards_match_the_reference_backend(
+    fixture: Path,
+    chunk_size: int,
+) -> None:
+    body = fixture.read_bytes()
+    parser = StreamingCardParser()
+
+    streamed = _normalized(
+        iter_streamed_cards(
+            (
+                body[start : start + chunk_size]
+                for start in range(0, len(body), chunk_size)
+            ),
+            parser,
+        )
+    )
+
+    document = body.decode("utf-8")
+    assert streamed == _outcomes(document, "bs4")
+    assert parser.card_set_sha256 == fingerprint_document(document)[1]
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.stem)
+@pytest.mark.parametrize("backend", sorted(PARSER_BACKENDS))
+def test_fingerprinted_parse_matches_separate_fingerprint_and_parse(
+    fixture: Path,
+    backend: str,
+) -> None:
+    document = fixture.read_text(encoding="utf-8")
+    digests = fingerprint_document(document)
+
+    parsed = parse_fingerprinted_document(document, backend=backend)
+    unchanged = parse_fingerprinted_document(
+        document, backend=backend, known_digests={digests[1]}
+    )
+
+    assert (parsed.document_sha256, parsed.card_set_sha256) == digests
+    assert parsed.cards is not None
+    assert _normalized(parsed.cards) == _outcomes(document, "bs4")
+    assert unchanged.cards is None
+
+
+def test_streamed_page_without_cards_is_rejected() -> None:
+    with pytest.raises(ItemParseError, match="No anime cards"):
+        list(iter_streamed_cards([b"<html><body><p>maintenance</p></body></html>"]))
+
+
+def test_variant_fixture_covers_fallbacks_and_failures() -> None:
+    fixture = Path(__file__).parent / "fixtures" / "acgsecrets_202604_variants.html"
+    outcomes = _outcomes(fixture.read_text(encoding="utf-8"), "lxml")
+
+    candidates = [entry for entry in outcomes if not isinstance(entry, tuple)]
+    failures = [entry for entry in outcomes if isinstance(entry, tuple)]
+    assert len(candidates) == 6
+    assert {name for name, _message in failures} == {"ItemParseError"}
+    assert [candidate.bangumi_id for candidate in candidates][:2] == [
+        "anime-3001",
+        "anime-3002",
+    ]
+
+
+def test_unknown_parser_backend_is_rejected() -> None:
+    with pytest.raises(ValueError, match="Unsupported parser backend"):
+        parse_document("<html></html>", backend="regex")
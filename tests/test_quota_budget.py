@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import pytest
+
+from services.errors import ImageStoreError, QuotaExceededError
+from services.quota_budget import BYTES_PER_CREDIT, QuotaBudget
+
+
+class _Usage:
+    def __init__(self, *responses: dict[str, object] | Exception) -> None:
+        self.responses = list(responses)
+        self.calls = 0
+
+    def __call__(self) -> dict[str, object]:
+        self.calls += 1
+        response = (
+            self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        )
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def _usage(used_percent: float, limit: float | None = 100.0) -> dict[str, object]:
+    return {"credits": {"used_percent": used_percent, "limit": limit}}
+
+
+def test_usage_is_fetched_once_and_refreshed_after_n_uploads() -> None:
+    usage = _Usage(_usage(10), _usage(12))
+    budget = QuotaBudget(usage, limit_percent=90, refresh_after_uploads=3)
+
+    for _ in range(5):
+        budget.check()
+    for _ in range(2):
+        budget.record_upload(1024)
+        budget.check()
+    assert usage.calls == 1
+    budget.record_upload(1024)
+    budget.check()
+
+    stats = budget.stats()
+    assert usage.calls == 2
+    assert (stats.refreshes, stats.uploads, stats.uploaded_bytes) == (2, 3, 3072)
+    assert stats.estimated_percent == 12
+
+
+def test_local_estimate_fails_closed_before_the_next_refresh() -> None:
+    usage = _Usage(_usage(89.0, limit=10))
+    budget = QuotaBudget(usage, limit_percent=90, refresh_after_uploads=1000)
+    budget.check()
+
+    # 0.1 credit of storage on a 10 credit plan is 1% of the quota.
+    budget.record_upload(BYTES_PER_CREDIT // 10)
+
+    with pytest.raises(QuotaExceededError, match="90.01%"):
+        budget.check()
+    assert usage.calls == 1
+
+
+def test_missing_credit_limit_keeps_the_snapshot_until_refresh() -> None:
+    usage = _Usage(_usage(50, limit=None))
+    budget = QuotaBudget(usage, limit_percent=90, refresh_after_uploads=2)
+    budget.check()
+    budget.record_upload(BYTES_PER_CREDIT * 100)
+
+    budget.check()
+
+    assert budget.stats().estimated_percent == 50
+    assert usage.calls == 1
+
+
+def test_usage_errors_fail_closed_and_are_retried() -> None:
+    usage = _Usage(RuntimeError("cloud unavailable"), {}, _usage(1))
+    budget = QuotaBudget(usage, limit_percent=90, refresh_after_uploads=2)
+
+    with pytest.raises(ImageStoreError, match="verify Cloudinary quota"):
+        budget.check()
+    with pytest.raises(ImageStoreError, match="omitted credits.used_percent"):
+        budget.check()
+    budget.check()
+
+    assert usage.calls == 3
+    assert budget.stats().refreshes == 1
@@ -7,7 +7,9 @@ from pathlib import Path
 import pytest
 
 import services.retention as retention_module
+from services.cache_repository import CacheRepository
 from services.errors import DataContractError, RetentionError
+from services.image_placeholder import metadata_key
 from services.retention import (
     CONFIRMATION_PHRASE,
     CloudinaryRetentionService,
@@ -18,6 +20,7 @@ from services.retention import (
     is_managed_public_id,
     referenced_public_ids,
 )
+from services.sqlite_cache import SqliteCacheRepository
 
 SHARED_DIGEST = "a" * 64
 SHARED_PUBLIC_ID = f"anime_covers/{SHARED_DIGEST}"
@@ -448,6 +451,48 @@ def test_retention_prepare_never_deletes_and_invalidates_cache_separately(
     assert cache.saved is True
 
 
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_cache_invalidation_drops_image_metadata_of_deleted_assets(
+    tmp_path: Path,
+    backend: str,
+) -> None:
+    url = f"https://res.cloudinary.com/demo/image/upload/v1/{SHARED_PUBLIC_ID}.webp"
+    kept = f"https://res.cloudinary.com/demo/image/upload/v1/{INVENTORY_ONE}.webp"
+    json_path = tmp_path / "cache.json"
+    json_path.write_text(
+        json.dumps(
+            {
+                "source_a": url,
+                metadata_key(SHARED_PUBLIC_ID): "225x320 data:image/webp;base64,",
+                "source_b": kept,
+                metadata_key(INVENTORY_ONE): "100x100 data:image/webp;base64,",
+            }
+        ),
+        encoding="utf-8",
+    )
+    cache = (
+        CacheRepository(json_path)
+        if backend == "json"
+        else SqliteCacheRepository(tmp_path / "cache.sqlite3", json_path)
+    )
+    service = _service(cache)  # type: ignore[arg-type]
+
+    removed = service.invalidate_prepared_cache(
+        PreparedDeletion(
+            minimum_age_days=30,
+            inventory_count=100,
+            delete_candidates=(SHARED_PUBLIC_ID,),
+        )
+    )
+    cache.compact()
+
+    assert removed == 2
+    assert CacheRepository(json_path).snapshot() == {
+        "source_b": kept,
+        metadata_key(INVENTORY_ONE): "100x100 data:image/webp;base64,",
+    }
+
+
 def test_retention_execute_prepared_returns_confirmed_delete(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
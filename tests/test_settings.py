@@ -7,6 +7,7 @@ import pytest
 import services.settings as settings_module
 from services.errors import ConfigurationError
 from services.settings import (
+    DEFAULT_CPU_WORKERS,
     CrawlerSettings,
     ProjectPaths,
     required_cloudinary_credentials,
@@ -25,6 +26,34 @@ ENV_NAMES = (
     "QUALITY_MAX_PARSE_FAILURE_RATIO",
     "QUALITY_MAX_FALLBACK_ID_RATIO",
     "CLOUDINARY_QUOTA_LIMIT_PERCENT",
+    "CLOUDINARY_QUOTA_REFRESH_UPLOADS",
+    "CRAWLER_QUARTER_WORKERS",
+    "SOURCE_CONDITIONAL_FETCH",
+    "PARSER_BACKEND",
+    "SOURCE_STREAMING",
+    "CRAWLER_PARSE_EXECUTOR",
+    "CRAWLER_IMAGE_CPU_EXECUTOR",
+    "CRAWLER_CPU_WORKERS",
+    "CRAWLER_ENGINE",
+    "CRAWLER_ASYNC_IMAGE_CONCURRENCY",
+    "IMAGE_DNS_TTL_SECONDS",
+    "CRAWLER_DOWNLOAD_WORKERS",
+    "CRAWLER_UPLOAD_WORKERS",
+    "IMAGE_INFLIGHT_MAX_BYTES",
+    "IMAGE_FULL_VERIFY_SAMPLE_RATE",
+    "IMAGE_NORMALIZE",
+    "IMAGE_MAX_EDGE",
+    "IMAGE_ENCODE_FORMAT",
+    "IMAGE_ENCODE_QUALITY",
+    "IMAGE_ORIGINAL_STORE",
+    "IMAGE_ORIGINAL_STORE_MAX_BYTES",
+    "CACHE_BACKEND",
+    "CACHE_JOURNAL",
+    "CACHE_JOURNAL_COMPACT_OPERATIONS",
+    "CACHE_PACKED_SNAPSHOT",
+    "CACHE_CHECKPOINT_ITEMS",
+    "CACHE_CHECKPOINT_SECONDS",
+    "IMAGE_DNS_NEGATIVE_TTL_SECONDS",
 )
 
 
@@ -41,11 +70,38 @@ def test_crawler_settings_defaults_are_safe(
     settings = CrawlerSettings.from_environment()
 
     assert settings.max_workers == 4
+    assert settings.quarter_workers == 2
+    assert (settings.image_download_workers, settings.image_upload_workers) == (8, 4)
+    assert settings.image_inflight_max_bytes == 128 * 1024 * 1024
     assert settings.image_allowed_hosts == ("static.acgsecrets.hk",)
     assert settings.image_max_pixels == 40_000_000
+    assert settings.image_full_verify_rate == 0.1
+    assert settings.image_normalize is False
+    assert (settings.image_max_edge, settings.image_encode_format) == (1600, "webp")
+    assert settings.image_original_store is False
+    assert settings.image_original_store_max_bytes == 512 * 1024 * 1024
+    assert settings.cache_backend == "json"
+    assert settings.cache_journal is False
+    assert settings.cache_journal_compact_operations == 5000
+    assert settings.cache_packed_snapshot is False
+    assert settings.cache_checkpoint_items == 20
+    assert settings.cache_checkpoint_seconds == 30
+    assert settings.cpu_workers == DEFAULT_CPU_WORKERS
+    assert CrawlerSettings.cpu_workers == DEFAULT_CPU_WORKERS
     assert settings.maximum_parse_failure_ratio == 0
     assert settings.maximum_fallback_id_ratio == 0
     assert settings.cloudinary_quota_limit_percent == 90
+    assert settings.cloudinary_quota_refresh_uploads == 50
+    assert settings.parser_backend == "bs4"
+    assert settings.source_streaming is False
+    assert (settings.parse_executor, settings.image_cpu_executor) == (
+        "thread",
+        "thread",
+    )
+    assert (settings.dns_cache_ttl_seconds, settings.dns_negative_ttl_seconds) == (
+        300,
+        30,
+    )
 
 
 @pytest.mark.parametrize(
@@ -54,12 +110,36 @@ def test_crawler_settings_defaults_are_safe(
         ("CRAWLER_MAX_WORKERS", "not-int", "must be an integer"),
         ("QUALITY_MIN_COUNT_RATIO", "not-float", "must be a number"),
         ("CRAWLER_MAX_WORKERS", "0", "between 1 and 8"),
+        ("CRAWLER_QUARTER_WORKERS", "5", "between 1 and 4"),
+        ("CRAWLER_DOWNLOAD_WORKERS", "33", "between 1 and 32"),
+        ("CRAWLER_UPLOAD_WORKERS", "0", "between 1 and 16"),
+        ("IMAGE_INFLIGHT_MAX_BYTES", "1024", "at least IMAGE_MAX_BYTES"),
         ("QUALITY_MIN_COUNT_RATIO", "0", "greater than 0"),
         ("QUALITY_MAX_PARSE_FAILURE_RATIO", "1", "below 1"),
         ("QUALITY_MAX_FALLBACK_ID_RATIO", "-0.1", "at least 0"),
         ("IMAGE_MAX_PIXELS", "0", "between 1 and 100000000"),
+        ("IMAGE_FULL_VERIFY_SAMPLE_RATE", "1.5", "between 0 and 1"),
+        ("IMAGE_MAX_EDGE", "32", "between 64 and 8192"),
+        ("IMAGE_ENCODE_FORMAT", "heic", "webp, avif, or jpeg"),
+        ("IMAGE_ENCODE_QUALITY", "0", "between 1 and 100"),
+        ("IMAGE_ORIGINAL_STORE", "yes", "true or false"),
+        ("IMAGE_ORIGINAL_STORE_MAX_BYTES", "1024", "at least IMAGE_MAX_BYTES"),
+        ("CACHE_BACKEND", "redis", "json or sqlite"),
+        ("CACHE_JOURNAL", "on", "true or false"),
+        ("CACHE_JOURNAL_COMPACT_OPERATIONS", "0", "between 1 and 1000000"),
+        ("CACHE_PACKED_SNAPSHOT", "1", "true or false"),
+        ("CACHE_CHECKPOINT_ITEMS", "-1", "between 0 and 10000"),
+        ("CACHE_CHECKPOINT_SECONDS", "3601", "between 0 and 3600"),
         ("IMAGE_MAX_PIXELS", "100000001", "between 1 and 100000000"),
         ("IMAGE_ALLOWED_HOSTS", " , ", "may not be empty"),
+        ("PARSER_BACKEND", "html5lib", "bs4 or lxml"),
+        ("CRAWLER_PARSE_EXECUTOR", "fiber", "thread or process"),
+        ("CRAWLER_CPU_WORKERS", "33", "between 1 and 32"),
+        ("CRAWLER_ENGINE", "gevent", "threads or asyncio"),
+        ("CRAWLER_ASYNC_IMAGE_CONCURRENCY", "0", "between 1 and 512"),
+        ("IMAGE_DNS_TTL_SECONDS", "-1", "between 0 and 3600"),
+        ("CLOUDINARY_QUOTA_REFRESH_UPLOADS", "0", "between 1 and 10000"),
+        ("IMAGE_DNS_NEGATIVE_TTL_SECONDS", "601", "between 0 and 600"),
     ],
 )
 def test_crawler_settings_reject_invalid_values(
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from services.source_state import SourceFingerprint, SourceStateRepository
+
+URL = "https://acgsecrets.hk/bangumi/202607/"
+
+
+@pytest.mark.parametrize("content", ["{not-json", "[]", '{"url": {"bad": 1}}'])
+def test_unreadable_source_state_falls_back_to_full_fetches(
+    tmp_path: Path,
+    content: str,
+) -> None:
+    path = tmp_path / "source_state.json"
+    path.write_text(content, encoding="utf-8")
+
+    state = SourceStateRepository(path)
+
+    assert state.get(URL) is None
+    assert state.save_if_changed() is False
+    assert path.read_text(encoding="utf-8") == content
+
+
+def test_source_state_saves_only_new_fingerprints(tmp_path: Path) -> None:
+    path = tmp_path / "source_state.json"
+    state = SourceStateRepository(path)
+    fingerprint = SourceFingerprint(body_sha256="a" * 64, etag='"v1"')
+
+    state.record(URL, fingerprint)
+    assert state.save_if_changed() is True
+    state.record(URL, fingerprint)
+    assert state.save_if_changed() is False
+    assert SourceStateRepository(path).get(URL) == fingerprint
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from services.atomic_io import atomic_write_json
+from services.cache_repository import CacheRepository
+from services.errors import DataContractError
+from services.sqlite_cache import SqliteCacheRepository
+
+SHARED_PUBLIC_ID = f"anime_covers/{'a' * 64}"
+OTHER_PUBLIC_ID = f"anime_covers/{'b' * 64}"
+SHARED = f"https://res.cloudinary.com/demo/image/upload/v1/{SHARED_PUBLIC_ID}.webp"
+OTHER = f"https://res.cloudinary.com/demo/image/upload/v1/{OTHER_PUBLIC_ID}"
+INITIAL = {
+    "source_封面": SHARED,
+    "meta": "225x320 data:image/webp;base64,",
+    f"image_meta_{SHARED_PUBLIC_ID}": "225x320 data:image/webp;base64,",
+}
+
+
+def _apply_operations(cache: CacheRepository | SqliteCacheRepository) -> list[object]:
+    results: list[object] = []
+    cache.set("content-a", SHARED.replace("/upload/", "/upload/f_auto/"))
+    cache.set("other", OTHER)
+    cache.set("source_封面", OTHER)
+    results.append(cache.urls_with_public_ids({OTHER_PUBLIC_ID}))
+    results.append(cache.remove_urls_with_public_ids({SHARED_PUBLIC_ID}))
+    cache.set("content-a", SHARED)
+    results.append((cache.get("content-a"), cache.get("missing")))
+    results.append(cache.snapshot())
+    results.append(cache.save_if_changed())
+    results.append(cache.save_if_changed())
+    return results
+
+
+def test_sqlite_cache_matches_json_cache_contract_and_bytes(tmp_path: Path) -> None:
+    json_cache_path = tmp_path / "json" / "cache.json"
+    sqlite_json_path = tmp_path / "sqlite" / "cache.json"
+    for path in (json_cache_path, sqlite_json_path):
+        atomic_write_json(path, INITIAL)
+    json_cache = CacheRepository(json_cache_path)
+    sqlite_cache = SqliteCacheRepository(tmp_path / "cache.sqlite3", sqlite_json_path)
+
+    assert _apply_operations(sqlite_cache) == _apply_operations(json_cache)
+    assert sqlite_cache.compact() is True
+    assert sqlite_cache.compact() is False
+    assert sqlite_json_path.read_bytes() == json_cache_path.read_bytes()
+    with pytest.raises(DataContractError, match="exact managed"):
+        sqlite_cache.urls_with_public_ids({"anime_covers/nested/asset"})
+
+
+def test_import_and_export_are_lossless(tmp_path: Path) -> None:
+    json_path = tmp_path / "cache.json"
+    atomic_write_json(json_path, {"b": "2", "a": "1", "ключ": "значение"})
+    original = json_path.read_bytes()
+
+    cache = SqliteCacheRepository(tmp_path / "cache.sqlite3", json_path)
+    cache.export_json(tmp_path / "exported.json")
+
+    assert cache.compact() is False
+    assert json_path.read_bytes() == original
+    assert (tmp_path / "exported.json").read_bytes() == original
+
+
+def test_checkpointed_rows_survive_a_crash_before_export(tmp_path: Path) -> None:
+    json_path = tmp_path / "cache.json"
+    atomic_write_json(json_path, INITIAL)
+    database = tmp_path / "cache.sqlite3"
+    cache = SqliteCacheRepository(database, json_path)
+    cache.set("added", OTHER)
+    cache.save_if_changed()
+
+    recovered = SqliteCacheRepository(database, json_path)
+
+    assert recovered.get("added") == OTHER
+    assert recovered.urls_with_public_ids({OTHER_PUBLIC_ID}) == {OTHER}
+    assert recovered.compact() is True
+    assert CacheRepository(json_path).snapshot() == {**INITIAL, "added": OTHER}
+
+
+def test_json_changes_are_reimported_unless_rows_are_unexported(
+    tmp_path: Path,
+) -> None:
+    json_path = tmp_path / "cache.json"
+    atomic_write_json(json_path, INITIAL)
+    database = tmp_path / "cache.sqlite3"
+    SqliteCacheRepository(database, json_path)
+
+    atomic_write_json(json_path, {"merged": SHARED})
+    cache = SqliteCacheRepository(database, json_path)
+    assert cache.snapshot() == {"merged": SHARED}
+
+    cache.set("local", OTHER)
+    cache.save_if_changed()
+    atomic_write_json(json_path, {})
+    with pytest.raises(DataContractError, match="not exported"):
+        SqliteCacheRepository(database, json_path)
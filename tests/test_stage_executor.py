@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from services.errors import ImageStoreError
+from services.image_placeholder import describe_image
+from services.image_store import verify_image
+from services.parser import parse_document
+from services.stage_executor import StageExecutor
+
+
+def test_thread_stages_run_inline_and_never_start_processes() -> None:
+    stages = StageExecutor()
+
+    ident = stages.run("parse", threading.get_ident)
+
+    assert ident == threading.get_ident()
+    assert stages._pool is None
+    stages.close()
+
+
+def test_process_stages_share_one_pool_and_match_inline_results(
+    fixture_dir: Path,
+    encoded_image: Callable[..., bytes],
+) -> None:
+    document = (fixture_dir / "acgsecrets_202604_variants.html").read_text(
+        encoding="utf-8"
+    )
+    png = encoded_image(size=(2, 2))
+    stages = StageExecutor({"parse": "process", "image": "process"}, max_workers=1)
+    try:
+        parse_pid = stages.run("parse", os.getpid)
+        image_pid = stages.run("image", os.getpid)
+        parsed = stages.run("parse", parse_document, document, backend="lxml")
+        stages.run("image", verify_image, memoryview(png), 100)
+        metadata = stages.run("image", describe_image, memoryview(png), 100)
+        with pytest.raises(ImageStoreError, match="exceed the 3 pixel"):
+            stages.run("image", verify_image, png, 3)
+    finally:
+        stages.close()
+
+    assert parse_pid == image_pid != os.getpid()
+    assert [str(entry) for entry in parsed] == [
+        str(entry) for entry in parse_document(document, backend="lxml")
+    ]
+    assert metadata == describe_image(png, 100)
+    with pytest.raises(RuntimeError, match="closed"):
+        stages.run("image", os.getpid)
+
+
+@pytest.mark.parametrize(
+    ("stages", "message"),
+    [
+        ({"upload": "thread"}, "Unknown CPU stage"),
+        ({"parse": "fiber"}, "Unsupported executor for parse"),
+    ],
+)
+def test_stage_executor_rejects_unknown_configuration(
+    stages: dict[str, str],
+    message: str,
+) -> None:
+    with pytest.raises(ValueError, match=message):
+        StageExecutor(stages)
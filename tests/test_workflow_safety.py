@@ -116,6 +116,21 @@ def test_crawler_has_an_always_running_final_notification_job() -> None:
     assert "SENTRY_" not in crawler
 
 
+def test_crawler_restores_local_state_before_crawling() -> None:
+    crawl_job = _job_section(_workflow("crawler.yml"), "crawl-and-prepare")
+    reference = re.search(r"uses: actions/cache@([0-9a-f]+) ", crawl_job)
+
+    assert reference is not None and len(reference.group(1)) == 40
+    assert "path: .crawler-state\n" in crawl_job
+    assert (
+        "key: crawler-state-${{ github.run_id }}-${{ github.run_attempt }}" in crawl_job
+    )
+    assert "restore-keys: crawler-state-\n" in crawl_job
+    assert crawl_job.index("actions/cache@") < crawl_job.index(
+        "run: python generate_static.py"
+    )
+
+
 def test_selector_canary_is_read_only_and_alerts_only_on_failure() -> None:
     workflow = _workflow("selector-canary.yml")
     canary_job = _job_section(workflow, "selector-canary")